@@ -0,0 +1,220 @@
+# BatchTransects.py
+# Created: 10/17/2026
+# Draws random, nonoverlapping, nonparallel sampling transects within every
+# polygon of a polygon layer in one job, e.g. the field units of a season.
+#
+# InputPolygons is read once and OutputTransects is written once. Each
+# polygon is a separate job for a process pool: with max_iterations = 1 it
+# gets one LinearTransects run, otherwise the best of max_iterations trials
+# as in MaximizeNTransects. Both use the in-memory engine
+# (TransectGeometry.py). Each transect has a PolygonID field holding the
+# IDField value of its polygon, and a Trial field holding the trial of that
+# polygon it was drawn in.
+#
+# Each polygon has its own seed derived from Seed and its index
+# (TransectSeed.PolygonSeed), and trial i of a polygon draws from the stream
+# of (polygon seed, i), as the trials of MaximizeNTransects do. A job gives
+# the same transects for any number of Workers, and the best trial of a
+# polygon can be drawn again on its own with RegenerateTrial. The Seed of
+# the job and the seed of each polygon are reported.
+#
+# Requires Python 3.7+ and NumPy 1.17+ (ArcGIS Pro 2.8+). Main runs the
+# tool, from this script or from RandomTransectGenerator.pyt.
+# -----------------------------------------------------------------------------
+
+# Imports
+import concurrent.futures
+import csv
+import multiprocessing
+
+import numpy as np
+
+import TransectCache
+import TransectIO
+import TransectSeed
+
+# State of the current worker process, set by the pool initializer
+_Worker = {}
+
+
+# ------------------------------ Worker side -------------------------------- #
+
+def _InitWorker(transect_length, max_transects, TargetSamplingProportion,
+                max_iterations, BatchSize, Sampler):
+    """Stores the run parameters in the worker."""
+
+    _Worker.update(transect_length=transect_length,
+                   max_transects=max_transects,
+                   TargetSamplingProportion=TargetSamplingProportion,
+                   max_iterations=max_iterations, BatchSize=BatchSize,
+                   Sampler=Sampler)
+
+
+def _RunPolygon(Index, Rings, Seed):
+    """
+    Runs the trials of one polygon, trial i from the stream of (Seed, i).
+
+    Returns Index, the transects of the best trial and the count of each
+    trial.
+    """
+
+    Polygon = TransectCache.PreparedPolygon(Rings)
+    max_transects = _Worker["max_transects"]
+
+    Counts = []
+    Best = np.empty((0, 5))
+    for Trial in range(_Worker["max_iterations"]):
+        Transects, Stats = TransectSeed.DrawTrial(
+            Polygon, _Worker["transect_length"], max_transects, Seed, Trial,
+            _Worker["TargetSamplingProportion"], _Worker["BatchSize"],
+            _Worker["Sampler"])
+        Counts.append(len(Transects))
+        if Trial == 0 or len(Transects) > len(Best):
+            Best = Transects
+        if len(Transects) == max_transects:
+            break
+
+    return Index, Best, Counts
+
+
+# ------------------------------ Parent side -------------------------------- #
+
+def BatchTransects(InputPolygons, transect_length, max_transects,
+                   OutputTransects, IDField="", max_iterations=1,
+                   TargetSamplingProportion=1.0, Workers=None, BatchSize=0,
+                   Sampler="uniform", Seed=None):
+    """
+    Draws transects within every polygon of InputPolygons and writes them
+    all to OutputTransects.
+
+    InputPolygons = polygon feature class or layer
+                    (a polygon shapefile when arcpy is not available)
+    transect_length, max_transects, TargetSamplingProportion,
+    BatchSize, Sampler = as for LinearTransects, for every polygon
+    OutputTransects = output line feature class
+    IDField = field of InputPolygons written to PolygonID (the ObjectID, or
+              the record number without arcpy, if "")
+    max_iterations = trials per polygon; the trial with the most transects
+                     is kept
+    Workers = number of worker processes (all CPUs if None; 1 runs the
+              polygons in this process)
+    Seed = seed of the job (fresh entropy if None), from which each
+           polygon's seed is derived (TransectSeed.PolygonSeed)
+
+    Returns OutputTransects and Counts, a list of (ID, best count, trials
+    run, polygon seed) for each polygon; RegenerateTrial with the polygon
+    seed and the Trial field of its transects draws them again.
+
+    Dependencies:
+    import concurrent.futures
+    import multiprocessing
+    import numpy as np
+    import TransectIO
+    import TransectSeed
+    """
+
+    if Workers is None:
+        Workers = multiprocessing.cpu_count()
+
+    TransectIO.AddMessage("Reading InputPolygons...")
+    IDs, Shapes, SpatialReference = TransectIO.ReadPolygons(InputPolygons,
+                                                            IDField)
+    Seed = TransectSeed.RunSeed(Seed)
+    Seeds = [TransectSeed.PolygonSeed(Seed, i) for i in range(len(Shapes))]
+    TransectIO.AddMessage("Seed: {}".format(Seed))
+
+    # Whole-number IDs read from numeric fields are written as integers
+    PolygonIDs = np.asarray(IDs)
+    if PolygonIDs.dtype.kind == "f" and np.all(PolygonIDs ==
+                                               np.round(PolygonIDs)):
+        PolygonIDs = PolygonIDs.astype(np.int64)
+        IDs = PolygonIDs.tolist()
+
+    InitArgs = (transect_length, max_transects, TargetSamplingProportion,
+                max_iterations, BatchSize, Sampler)
+
+    TransectIO.AddMessage("Drawing transects in {0} polygons on {1} workers..."
+                          .format(len(Shapes), Workers))
+    Results = [None] * len(Shapes)
+    if Workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=Workers, initializer=_InitWorker,
+                initargs=InitArgs) as Pool:
+            Futures = [Pool.submit(_RunPolygon, i, Rings, PolygonSeed)
+                       for i, (Rings, PolygonSeed) in enumerate(zip(Shapes,
+                                                                    Seeds))]
+            for Future in concurrent.futures.as_completed(Futures):
+                Index, Best, Counts = Future.result()
+                Results[Index] = (Best, Counts)
+                TransectIO.AddMessage("\tPolygon {0}: {1} transects"
+                                      .format(IDs[Index], len(Best)) )
+    else:
+        _InitWorker(*InitArgs)
+        for i, (Rings, PolygonSeed) in enumerate(zip(Shapes, Seeds)):
+            Index, Best, Counts = _RunPolygon(i, Rings, PolygonSeed)
+            Results[Index] = (Best, Counts)
+            TransectIO.AddMessage("\tPolygon {0}: {1} transects"
+                                  .format(IDs[Index], len(Best)) )
+
+    TransectIO.AddMessage("Writing transects to OutputTransects...")
+    Transects = np.concatenate([np.empty((0, 5))] +
+                               [Best for Best, Counts in Results])
+    Sizes = [len(Best) for Best, Counts in Results]
+    PolygonID = np.repeat(PolygonIDs, Sizes)
+    Trial = np.repeat([int(np.argmax(Counts)) for Best, Counts in Results],
+                      Sizes)
+    TransectIO.WriteTransects(OutputTransects, Transects, transect_length,
+                              SpatialReference, [("PolygonID", PolygonID)],
+                              Trial)
+    TransectIO.AddMessage("Total number of transects drawn: {}"
+                          .format(len(Transects)) )
+
+    return OutputTransects, [(ID, len(Best), len(Counts), PolygonSeed)
+                             for ID, (Best, Counts), PolygonSeed
+                             in zip(IDs, Results, Seeds)]
+
+
+def Main():
+    """
+    Runs Batch Transects with the tool parameters
+    (TransectIO.GetParameterAsText), from this script or from
+    RandomTransectGenerator.pyt.
+    """
+
+    # Inputs
+    InputPolygons = TransectIO.GetParameterAsText(0)
+    transect_length = float( TransectIO.GetParameterAsText(1) )
+    max_transects = int( TransectIO.GetParameterAsText(2) )
+    max_iterations = int( TransectIO.GetParameterAsText(3) )
+    OutputTransects = TransectIO.GetParameterAsText(4)
+    IDField = TransectIO.GetParameterAsText(5) # Optional
+    Workers = int( TransectIO.GetParameterAsText(6) or 0 ) or None # Optional
+    CountsCSV = TransectIO.GetParameterAsText(7) # Optional
+
+    # Environments
+    arcpy = TransectIO.GetArcpy()
+    if arcpy is not None:
+        arcpy.env.overwriteOutput = True
+
+    # Processing
+    transects, counts = BatchTransects(InputPolygons, transect_length,
+                                       max_transects, OutputTransects,
+                                       IDField, max_iterations,
+                                       Workers=Workers)
+
+    # Save the best count of each polygon
+    if CountsCSV:
+        TransectIO.AddMessage("\nSaving counts to CSV file...")
+        with open(CountsCSV, 'w', newline='') as f:
+            wr = csv.writer(f, delimiter = ',')
+            wr.writerow(["PolygonID", "Count", "Trials", "Seed"])
+            wr.writerows(counts)
+
+    TransectIO.AddMessage("Done.")
+
+
+# Processing runs only as a script, or from the Python toolbox through
+# Main, so that worker processes can import this module without starting
+# another run
+if __name__ == "__main__":
+    Main()
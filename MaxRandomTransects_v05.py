@@ -14,299 +14,132 @@
 # v04: Buffers each trasect by one transect_length instead of two, allowing
 # for more transects to fit inside InputPolygon.
 # v05: Uses LinearTransects function defition from RandomTransects_v05.py
+# v06: Uses LinearTransects function definition from RandomTransects_v05.py.
+# Engine (new optional input parameter 18) picks how trials are drawn:
+# "gdb", the default, as in v05, "memory" or "raster" (see
+# RandomTransects_v05.py). Without arcpy the default is "memory".
+# v06: Runs without arcpy, reading and writing shapefiles (TransectIO.py).
+# When the maximum number of transects is achieved, that trial is kept as
+# the BestTrial instead of being deleted before the final copy.
+# v06: LinearTransects can draw candidate transects in batches (BatchSize).
+# v06: Workers runs the trials across a process pool (TransectTrials.py);
+# inputs are read and processing runs only when run as a script.
+# v06: Trials reuse the prepared InputPolygon cached by TransectCache.py.
+# v06: Checkpoint records the progress of a run (TransectCheckpoint.py) so
+# that it can be resumed; the in-memory engine keeps the BestTrial in memory
+# and the gdb engine renames it instead of copying. The trial that achieves
+# the maximum number of transects is included in the trial counts.
+# v06: Patience, MinChance and TimeBudget stop a run early once more trials
+# are unlikely to improve the best count (TransectStopping.py).
+# v06: Sampler="freespace" draws candidates only where a whole transect can
+# still fit (TransectRaster.py).
+# v06: Profile saves the time spent in each phase of each trial and the
+# outcome of each candidate transect as JSON (TransectProfile.py).
+# v06: The UnsampledArea of a trial no longer lags one transect behind
+# (LinearTransects reads it after the erase); in memory it is a running
+# total, less the exact unsampled area of each new buffer.
+# v06: Engine="raster" decides most candidates of the trials on a mask of
+# CellSize cells (TransectMask.py); CellSize is the new optional input
+# parameter 13, used with this Engine only.
+# v06: LinearTransects appends transects to OutputTransects as they are
+# accepted, without a feature class per transect or a final Merge. The
+# output carries TransectID and the Trial of the best trial.
+# v06: Seed (new optional input parameter 14) makes a run reproducible.
+# Trial i draws only from the random stream of (Seed, i), whichever worker
+# runs it (TransectSeed.py), so RegenerateTrial draws any trial again on
+# its own, and checkpoints keep the index of the best trial instead of its
+# transects and the RNG state.
+# v06: LinearTransects, RegenerateTrial and MaximizeNTransects live in
+# TransectTools.py, and this script only reads the tool parameters and
+# calls them; arcpy is imported when a function first needs it.
+# v06: Store (new optional input parameter 15) saves the transects of every
+# trial, not only the BestTrial, as NumPy arrays in a directory
+# (TransectStore.py), to be analyzed after the run.
+# v06: Pipeline (new optional input parameter 16) writes checkpoint records
+# and Store appends on a background thread while the next trial runs
+# (TransectPipeline.py); the counts are the same.
+# v06: Cache (new optional input parameter 17) keeps the counts and best
+# trial of seeded runs on disk (TransectCache.py). Running the same
+# InputPolygon with the same parameters and Seed again returns them at
+# once, and a larger max_iterations only runs the trials not cached.
+# v06: Requires Python 3.7+ and NumPy 1.17+ (ArcGIS Pro 2.8+); ArcMap's
+# Python 2.7 is not supported. Main runs the tool, from this script or from
+# RandomTransectGenerator.pyt, which has the v06 parameters.
 # -----------------------------------------------------------------------------
 
 # Imports
-import arcpy
-import os
-import random
 import csv
+import TransectIO
+from TransectTools import (LinearTransects, LinearTransectsInMemory,
+                           MaximizeNTransects, RegenerateTrial)
 
-# Inputs
-InputPolygon = arcpy.GetParameterAsText(0)
-transect_length = float( arcpy.GetParameterAsText(1) )
-max_transects = int( arcpy.GetParameterAsText(2) )
-max_iterations = int( arcpy.GetParameterAsText(3) )
-WorkspaceGDB = arcpy.GetParameterAsText(4)
-OutputTransects = arcpy.GetParameterAsText(5)
-CountsCSV = arcpy.GetParameterAsText(6) # Optional
 
-# Function definitions
-def LinearTransects(InputPolygon, transect_length, max_transects,
-                    TargetSamplingProportion, OutputTransects, WorkspaceGDB):
+def Main():
     """
-    Draws n_transects within InputPolygon and returns OutputTransects.
-
-    InputPolygon = polygon feature class with a single polygon
-    transect_length = desired length of transect segments,
-                    in linear units of the InputPolygon
-    max_transects = desired maximum number of transects to be drawn
-                *** This number may not be reached due to space constraints! ***
-    max_iterations = number to times to attempt drawing transects
-    OutputTransects = output line feature class
-    WorkspaceGDB = any geodatabase that has space for the intermediate files
-
-    Dependencies:
-    import arcpy
-    import os
-    import random
-    """
-
-    # --------------------- Sampling Zone Parameters ------------------------ #
-    
-    BoundaryLyr = os.path.join(WorkspaceGDB, "Boundary") 
-    arcpy.MakeFeatureLayer_management(InputPolygon, BoundaryLyr)
-    with arcpy.da.SearchCursor( BoundaryLyr, ["SHAPE@AREA"] ) as cursor:
-        TotalArea = [ row[0] for row in cursor ][0]
-    
-    # ----------------------Initialize 'while' loops ------------------------ #
-    
-    UnsampledArea = TotalArea
-    UnsampledZone = BoundaryLyr
-    
-    UnsampledProportion = 1.0
-    MaxUnsampledProportion = 1.0 - TargetSamplingProportion
-   
-    n = 0
-    AllTransects = []
-
-    
-
-    while (UnsampledProportion>MaxUnsampledProportion) and (n<max_transects):
-
-        # -------------------- Create Random Transect ----------------------- #
-
-        arcpy.AddMessage( "\tCreating transect {}...".format(n) )
-        
-        # Drop a random point
-        arcpy.AddMessage("\t\tCreating random start point...")
-        arcpy.CreateRandomPoints_management(WorkspaceGDB, "randpt",
-                                            UnsampledZone, "", 1)
-        Vertex = os.path.join(WorkspaceGDB, "randpt")
-
-        # Add fields x, y, distance, and bearing
-        arcpy.AddMessage("\t\tAdding attibutes to the point...")
-        arcpy.AddField_management(Vertex, "x", "DOUBLE")
-        arcpy.AddField_management(Vertex, "y", "DOUBLE")
-        arcpy.AddField_management(Vertex, "distance", "FLOAT")
-        arcpy.AddField_management(Vertex, "bearing", "FLOAT")
-
-        # Update attribute table with data for bearing distance tool
-        arcpy.AddMessage("\t\tGenerating a random bearing...")
-        with arcpy.da.UpdateCursor(Vertex, ["SHAPE@XY",
-                                            "x", "y",
-                                            "distance",
-                                            "bearing"]) as cursor:
-            for row in cursor:
-                row[1] = row[0][0]
-                row[2] = row[0][1]
-                row[3] = transect_length
-                row[4] = random.randint(1,360)
-                cursor.updateRow(row)
-
-        # Create a table to feed to Bearing Distance to line tool
-        arcpy.AddMessage("\t\tSaving attributes as a table...")
-        arcpy.TableToTable_conversion(Vertex, WorkspaceGDB, "RandPtTable")
-        Table = os.path.join(WorkspaceGDB, "RandPtTable")
-
-        # Generate transect
-        arcpy.AddMessage("\t\tDrawing transect line...")
-        Transect = os.path.join(WorkspaceGDB, "Transect{}".format(n) )
-        arcpy.BearingDistanceToLine_management(Table, Transect,
-                                               x_field = 'x', y_field = 'y',
-                                               distance_field = 'distance',
-                                               bearing_field = 'bearing',
-                                               spatial_reference = Vertex )
-
-        # ---------------------- Verify Transect ------------------------ #
-        
-        # Check that Transect is completely contained in UnsampledZone
-        TransectLyr = os.path.join("in_memory", "transect_lyr")
-        arcpy.MakeFeatureLayer_management(Transect, TransectLyr)
-        arcpy.SelectLayerByLocation_management(TransectLyr,
-                                               "COMPLETELY_WITHIN",
-                                               UnsampledZone, '',
-                                               "NEW_SELECTION")
-        Inside = int( arcpy.GetCount_management(TransectLyr).getOutput(0) )
-        
-        if Inside == 1:
-        
-            AllTransects.append(Transect)
-            arcpy.AddMessage("\t\tFinished drawing transect {}".format(n) )
-
-            # ------------------ Update UnsampledZone ------------------- #
-            
-            # Buffer transect by the transect length
-            arcpy.AddMessage("\t\tBuffering transect {}...".format(n) )
-            TransBuffer = os.path.join(WorkspaceGDB,
-                                       "Transect{}Buf".format(n) )
-            arcpy.Buffer_analysis(TransectLyr, TransBuffer, transect_length )
-
-            # Erase buffer from UnsampledZone
-            arcpy.AddMessage(
-                "\t\tErasing transect buffer from unsampled zone..." )
-            UnsampledZone_Erase = os.path.join("in_memory",
-                                               "UnsampledZone{}".format(n))
-            arcpy.Erase_analysis(UnsampledZone, TransBuffer,
-                                 UnsampledZone_Erase, '')
-            arcpy.Delete_management(TransBuffer)
-
-            # Get new UnsampledArea
-            with arcpy.da.SearchCursor( UnsampledZone,
-                                        ["SHAPE@AREA"] ) as cursor:
-                UnsampledArea = [ row[0] for row in cursor ][0]
-
-            # Update 'while' loop conditions
-            UnsampledProportion = UnsampledArea / TotalArea
-            UnsampledZone = UnsampledZone_Erase
-
-            n += 1
-
-        else:
-            arcpy.AddMessage("\t\t---------------------------------")
-            arcpy.AddMessage("\t\tTransect {} exited UnsampledZone.".format(n))
-            arcpy.AddMessage("\t\t---------------------------------")
-            arcpy.Delete_management(Transect)
-
-            # If UnsampledArea is too small, escape the 'while' loop
-            if UnsampledArea < (2.0*transect_length):
-                n = max_transects
-            # Otherwise, try to draw the next transect.
-            else:
-                n += 1
-
-        # Clean up
-        arcpy.AddMessage("\t\tCleaning up workspace..." )
-        arcpy.Delete_management(Vertex)
-        arcpy.Delete_management(Table)
-
-        arcpy.AddMessage(
-            "\t\tUnsampled area: {0:.2f} m".format(UnsampledArea) )
-        arcpy.AddMessage(
-            "\t\tUnsampled proportion: {0:.3f}".format(UnsampledProportion) )
-
-    # ------------------------- END 'WHILE' LOOP ---------------------------- #
-
-
-    # Combine transects into one shapefile
-    arcpy.AddMessage("\tMerging transects into one dataset...")
-    arcpy.Merge_management(AllTransects, OutputTransects, '')
-
-    # Count features
-    Result = int( arcpy.GetCount_management(OutputTransects).getOutput(0) )
-    arcpy.AddMessage("\tTotal number of transects drawn: {}".format(Result) )
-
-    # Clean up
-    arcpy.AddMessage("\tCleaning up...")
-    for t in AllTransects:
-        arcpy.Delete_management(t)
-
-    return OutputTransects
-
-
-def MaximizeNTransects(InputPolygon, transect_length, max_transects,
-                       max_iterations, WorkspaceGDB, OutputTransects):
+    Runs Max Random Transects with the tool parameters
+    (TransectIO.GetParameterAsText), from this script or from
+    RandomTransectGenerator.pyt.
     """
-    Iterates LinearTransects function up to max_iterations times to draw as
-    as close to max_transects within InputPolygon as possible.
-
-    Dependences:
-    import arcpy
-    """
-
-    arcpy.AddMessage("Initializing iterator...")
-    i = 0
-    BestCount = 0
-    BestTrialFC = os.path.join( WorkspaceGDB, "BestTrial" )
-    TrialCounts = ["Counts"]
-
-    while i < max_iterations:
-
-        arcpy.AddMessage("\nIteration {0} of {1}".format(i, max_iterations))
-        
-        # Runs Random Transect Tool
-        TargetSamplingProportion = 1.0
-        Trial = LinearTransects(InputPolygon, transect_length, max_transects,
-                    TargetSamplingProportion, OutputTransects, WorkspaceGDB)
-
-        # Count transects drawn in this trial
-        TrialCount = int( arcpy.GetCount_management(Trial).getOutput(0) )
-        arcpy.AddMessage("\n\tNumber of transects drawn in this iteration: {}"
-                         .format(TrialCount) )
-
-        # If PresentTrial equals maximum transect goal, close the 'while' loop.
-        if TrialCount == max_transects:
-            arcpy.AddMessage("Maximum number of transects achieved!")
-            
-            BestTrial = Trial
-            arcpy.AddMessage("\nWriting to file...")
-            arcpy.CopyFeatures_management( BestTrial, OutputTransects)
-            arcpy.Delete_management( Trial )
-            
-            i = max_iterations
-
-        # Otherwise, compare TrialCount to BestCount
-        else:
-
-            if TrialCount > BestCount:
-                arcpy.AddMessage("\tBest count improved!") 
-
-                # Present trial becomes BestTrial
-                BestCount = TrialCount
-                BestTrial = Trial
-
-                # Replace OutputTransects with new BestTrial
-                if i != 0: 
-                    arcpy.Delete_management( BestTrialFC )
-                    # When i == 0, OutputTransects doesn't exist yet
-                
-                arcpy.AddMessage("\n\tWriting new BestTrial to file...")
-                arcpy.CopyFeatures_management( BestTrial, BestTrialFC )
-                arcpy.Delete_management( Trial )
-                    
-            else:
-                arcpy.AddMessage("\tBest count is unchanged.")
-                arcpy.Delete_management( Trial )
-
-            # Continue 'while' loop
-            arcpy.AddMessage("\n\tCurrent highest count: {}".format(BestCount) )
-            if CountsCSV:
-                TrialCounts.append(TrialCount)
-            i += 1
-
-    # Copy the BestTrial to disc
-    arcpy.CopyFeatures_management( BestTrialFC, OutputTransects )
-    arcpy.Delete_management( BestTrialFC )
-    arcpy.AddMessage("\nFinal transect count: {}".format(BestCount) )
-
-    return OutputTransects, TrialCounts
-
-
-# Environments
-arcpy.env.overwriteOutput = True
-
-# Processing
-transects, counts = MaximizeNTransects(InputPolygon, transect_length,
-                                       max_transects, max_iterations,
-                                       WorkspaceGDB, OutputTransects)
-
-# Create CSV and histogram of trial counts
-if CountsCSV:
-    arcpy.AddMessage("\nSaving frequencies to CSV file...")
-    with open(CountsCSV, 'wb') as f:
-        wr = csv.writer(f, delimiter = ',')
-        wr.writerow(counts)
-
-arcpy.AddMessage("Done.")
-
-
-
-
-
-
-
-
-
-
 
-            
+    # Inputs
+    InputPolygon = TransectIO.GetParameterAsText(0)
+    transect_length = float( TransectIO.GetParameterAsText(1) )
+    max_transects = int( TransectIO.GetParameterAsText(2) )
+    max_iterations = int( TransectIO.GetParameterAsText(3) )
+    WorkspaceGDB = TransectIO.GetParameterAsText(4)
+    OutputTransects = TransectIO.GetParameterAsText(5)
+    CountsCSV = TransectIO.GetParameterAsText(6) # Optional
+    Checkpoint = TransectIO.GetParameterAsText(7) # Optional
+    Resume = TransectIO.GetParameterAsText(8).lower() == "true" # Optional
+    Patience = int( TransectIO.GetParameterAsText(9) or 0 ) # Optional
+    MinChance = float( TransectIO.GetParameterAsText(10) or 0 ) # Optional
+    TimeBudget = float( TransectIO.GetParameterAsText(11) or 0 ) # Optional
+    Profile = TransectIO.GetParameterAsText(12) # Optional
+    CellSize = float( TransectIO.GetParameterAsText(13) or 0 ) # Optional
+    Seed = TransectIO.GetParameterAsText(14) or None # Optional
+    Store = TransectIO.GetParameterAsText(15) # Optional
+    Pipeline = TransectIO.GetParameterAsText(16).lower() == "true" # Optional
+    Cache = TransectIO.GetParameterAsText(17).lower() == "true" # Optional
+    Engine = TransectIO.GetParameterAsText(18) # Optional
+
+    # Environments
+    arcpy = TransectIO.GetArcpy()
+    if arcpy is not None:
+        arcpy.env.overwriteOutput = True
+
+    # The geodatabase engine of v05 stays the default wherever arcpy is
+    if not Engine:
+        Engine = "gdb" if arcpy is not None else "memory"
+
+    # Processing
+    transects, counts = MaximizeNTransects(InputPolygon, transect_length,
+                                           max_transects, max_iterations,
+                                           WorkspaceGDB, OutputTransects,
+                                           Checkpoint=Checkpoint,
+                                           Resume=Resume,
+                                           Patience=Patience,
+                                           MinChance=MinChance,
+                                           TimeBudget=TimeBudget,
+                                           Profile=Profile,
+                                           Engine=Engine,
+                                           CellSize=CellSize,
+                                           Seed=Seed,
+                                           Store=Store,
+                                           Pipeline=Pipeline,
+                                           Cache=Cache)
+
+    # Create CSV and histogram of trial counts
+    if CountsCSV:
+        TransectIO.AddMessage("\nSaving frequencies to CSV file...")
+        with open(CountsCSV, 'w', newline='') as f:
+            wr = csv.writer(f, delimiter = ',')
+            wr.writerow(counts)
+
+    TransectIO.AddMessage("Done.")
+
+
+# Processing runs only as a script, or from the Python toolbox through
+# Main, so that worker processes can import this module without starting
+# another run
+if __name__ == "__main__":
+    Main()
@@ -24,199 +24,118 @@
 # proportion of total InputPolygon area. If proportion has not reached
 # TargetSamplingProportion (new input parameter 3), attempts to redraw
 # transect.
+#
+# v06: Engine (new optional input parameter 9) picks how LinearTransects
+# draws transects: "gdb", the default, keeps the geodatabase workflow of
+# v05; "memory" draws them in memory (TransectGeometry.py) and writes
+# OutputTransects once at the end. Without arcpy the default is "memory".
+#
+# v06: Runs without arcpy (e.g. on Linux batch nodes without an ArcGIS
+# license): InputPolygon is read from a shapefile and OutputTransects is
+# written as a polyline shapefile (TransectIO.py), and the parameters are
+# read from the command line in toolbox order.
+#
+# v06: BatchSize draws and tests candidate transects in vectorized batches
+# (Engine="memory" only); survivors are accepted one at a time.
+#
+# v06: The in-memory engine prepares InputPolygon once (triangulation for
+# drawing start points, edge grid for containment tests) and caches it by
+# the hash of its geometry, in memory and on disk (TransectCache.py).
+#
+# v06: Sampler="freespace" draws candidate transects only from start points
+# and bearings that can still hold a whole transect (TransectRaster.py),
+# so few are rejected late in a run; rejected candidates no longer count
+# toward max_transects.
+#
+# v06: Profile (new optional input parameter 6) saves the time spent in each
+# phase (sampling, containment, buffer, erase...) and the outcome of each
+# candidate transect as JSON (TransectProfile.py).
+#
+# v06: The geodatabase engine reads the UnsampledArea from the zone left
+# after erasing the new buffer; v05 read the zone before the erase, so the
+# UnsampledProportion lagged one transect behind. The in-memory engine
+# keeps a running total instead: the exact area of each new buffer that is
+# inside InputPolygon and outside the earlier buffers is subtracted from
+# it, measured from the polygon edges and buffers near the new transect.
+#
+# v06: Engine="raster" rasterizes InputPolygon once into a mask of CellSize
+# cells (new optional input parameter 7, used with this Engine only) and
+# stamps each transect buffer into it (TransectMask.py). The mask accepts
+# or rejects the candidates it is certain of and leaves the rest to the
+# exact tests, so the transects and the UnsampledProportion are exact.
+#
+# v06: OutputTransects is opened once per run and each accepted transect is
+# appended to it through one insert cursor (TransectIO.OpenTransects); the
+# geodatabase engine no longer writes a Transect{n} feature class per
+# transect and merges them at the end. Every transect carries its
+# TransectID and Trial besides its start point (x, y), distance and bearing.
+#
+# v06: Seed (new optional input parameter 8) makes a run reproducible: the
+# bearings, the start points and the in-memory engine draw from the random
+# stream of (Seed, Trial) (TransectSeed.py), and the geodatabase engine sets
+# arcpy.env.randomGenerator from it.
+#
+# v06: LinearTransects lives in TransectTools.py with the other core
+# functions, and this script only reads the tool parameters and calls it.
+# arcpy is imported when a function first needs it, and the whole script
+# runs only as a script, so importing it starts no run (TransectCLI.py
+# runs the same functions from the command line).
+# v06: Requires Python 3.7+ and NumPy 1.17+ (ArcGIS Pro 2.8+); ArcMap's
+# Python 2.7 is not supported. Main runs the tool, from this script or from
+# RandomTransectGenerator.pyt, which has the v06 parameters.
 # -----------------------------------------------------------------------------
 
 
 # Imports
-import arcpy, os, random
+import TransectIO
+import TransectProfile
+from TransectTools import LinearTransects, LinearTransectsInMemory
 
-# Inputs
-InputPolygon = arcpy.GetParameterAsText(0)
-transect_length = float( arcpy.GetParameterAsText(1) )
-max_transects = int( arcpy.GetParameterAsText(2) )
-TargetSamplingProportion = float( arcpy.GetParameterAsText(3) )
-WorkspaceGDB = arcpy.GetParameterAsText(4)
-OutputTransects = arcpy.GetParameterAsText(5)
 
-# Function definitions
-def LinearTransects(InputPolygon, transect_length, max_transects,
-                    TargetSamplingProportion, OutputTransects, WorkspaceGDB):
+def Main():
     """
-    Draws n_transects within InputPolygon and returns OutputTransects.
-
-    InputPolygon = polygon feature class with a single polygon
-    transect_length = desired length of transect segments,
-                    in linear units of the InputPolygon
-    max_transects = desired maximum number of transects to be drawn
-                *** This number may not be reached due to space constraints! ***
-    max_iterations = number to times to attempt drawing transects
-    OutputTransects = output line feature class
-    WorkspaceGDB = any geodatabase that has space for the intermediate files
-
-    Dependencies:
-    import arcpy
-    import os
-    import random
+    Runs Random Transects with the tool parameters
+    (TransectIO.GetParameterAsText), from this script or from
+    RandomTransectGenerator.pyt.
     """
 
-    # --------------------- Sampling Zone Parameters ------------------------ #
-    
-    BoundaryLyr = os.path.join(WorkspaceGDB, "Boundary") 
-    arcpy.MakeFeatureLayer_management(InputPolygon, BoundaryLyr)
-    with arcpy.da.SearchCursor( BoundaryLyr, ["SHAPE@AREA"] ) as cursor:
-        TotalArea = [ row[0] for row in cursor ][0]
-    
-    # ----------------------Initialize 'while' loops ------------------------ #
-    
-    UnsampledArea = TotalArea
-    UnsampledZone = BoundaryLyr
-    
-    UnsampledProportion = 1.0
-    MaxUnsampledProportion = 1.0 - TargetSamplingProportion
-   
-    n = 0
-    AllTransects = []
-
-    
-
-    while (UnsampledProportion>MaxUnsampledProportion) and (n<max_transects):
-
-        # -------------------- Create Random Transect ----------------------- #
-
-        arcpy.AddMessage( "\tCreating transect {}...".format(n) )
-        
-        # Drop a random point
-        arcpy.AddMessage("\t\tCreating random start point...")
-        arcpy.CreateRandomPoints_management(WorkspaceGDB, "randpt",
-                                            UnsampledZone, "", 1)
-        Vertex = os.path.join(WorkspaceGDB, "randpt")
-
-        # Add fields x, y, distance, and bearing
-        arcpy.AddMessage("\t\tAdding attibutes to the point...")
-        arcpy.AddField_management(Vertex, "x", "DOUBLE")
-        arcpy.AddField_management(Vertex, "y", "DOUBLE")
-        arcpy.AddField_management(Vertex, "distance", "FLOAT")
-        arcpy.AddField_management(Vertex, "bearing", "FLOAT")
-
-        # Update attribute table with data for bearing distance tool
-        arcpy.AddMessage("\t\tGenerating a random bearing...")
-        with arcpy.da.UpdateCursor(Vertex, ["SHAPE@XY",
-                                            "x", "y",
-                                            "distance",
-                                            "bearing"]) as cursor:
-            for row in cursor:
-                row[1] = row[0][0]
-                row[2] = row[0][1]
-                row[3] = transect_length
-                row[4] = random.randint(1,360)
-                cursor.updateRow(row)
-
-        # Create a table to feed to Bearing Distance to line tool
-        arcpy.AddMessage("\t\tSaving attributes as a table...")
-        arcpy.TableToTable_conversion(Vertex, WorkspaceGDB, "RandPtTable")
-        Table = os.path.join(WorkspaceGDB, "RandPtTable")
-
-        # Generate transect
-        arcpy.AddMessage("\t\tDrawing transect line...")
-        Transect = os.path.join(WorkspaceGDB, "Transect{}".format(n) )
-        arcpy.BearingDistanceToLine_management(Table, Transect,
-                                               x_field = 'x', y_field = 'y',
-                                               distance_field = 'distance',
-                                               bearing_field = 'bearing',
-                                               spatial_reference = Vertex )
-
-        # ---------------------- Verify Transect ------------------------ #
-        
-        # Check that Transect is completely contained in UnsampledZone
-        TransectLyr = os.path.join("in_memory", "transect_lyr")
-        arcpy.MakeFeatureLayer_management(Transect, TransectLyr)
-        arcpy.SelectLayerByLocation_management(TransectLyr,
-                                               "COMPLETELY_WITHIN",
-                                               UnsampledZone, '',
-                                               "NEW_SELECTION")
-        Inside = int( arcpy.GetCount_management(TransectLyr).getOutput(0) )
-        
-        if Inside == 1:
-        
-            AllTransects.append(Transect)
-            arcpy.AddMessage("\t\tFinished drawing transect {}".format(n) )
-
-            # ------------------ Update UnsampledZone ------------------- #
-            
-            # Buffer transect by the transect length
-            arcpy.AddMessage("\t\tBuffering transect {}...".format(n) )
-            TransBuffer = os.path.join(WorkspaceGDB,
-                                       "Transect{}Buf".format(n) )
-            arcpy.Buffer_analysis(TransectLyr, TransBuffer, transect_length )
-
-            # Erase buffer from UnsampledZone
-            arcpy.AddMessage(
-                "\t\tErasing transect buffer from unsampled zone..." )
-            UnsampledZone_Erase = os.path.join("in_memory",
-                                               "UnsampledZone{}".format(n))
-            arcpy.Erase_analysis(UnsampledZone, TransBuffer,
-                                 UnsampledZone_Erase, '')
-            arcpy.Delete_management(TransBuffer)
-
-            # Get new UnsampledArea
-            with arcpy.da.SearchCursor( UnsampledZone,
-                                        ["SHAPE@AREA"] ) as cursor:
-                UnsampledArea = [ row[0] for row in cursor ][0]
-
-            # Update 'while' loop conditions
-            UnsampledProportion = UnsampledArea / TotalArea
-            UnsampledZone = UnsampledZone_Erase
-
-            n += 1
-
-        else:
-            arcpy.AddMessage("\t\t---------------------------------")
-            arcpy.AddMessage("\t\tTransect {} exited UnsampledZone.".format(n))
-            arcpy.AddMessage("\t\t---------------------------------")
-            arcpy.Delete_management(Transect)
-
-            # If UnsampledArea is too small, escape the 'while' loop
-            if UnsampledArea < (2.0*transect_length):
-                n = max_transects
-            # Otherwise, try to draw the next transect.
-            else:
-                n += 1
-
-        # Clean up
-        arcpy.AddMessage("\t\tCleaning up workspace..." )
-        arcpy.Delete_management(Vertex)
-        arcpy.Delete_management(Table)
-
-        arcpy.AddMessage(
-            "\t\tUnsampled area: {0:.2f} m".format(UnsampledArea) )
-        arcpy.AddMessage(
-            "\t\tUnsampled proportion: {0:.3f}".format(UnsampledProportion) )
-
-    # ------------------------- END 'WHILE' LOOP ---------------------------- #
-
-
-    # Combine transects into one shapefile
-    arcpy.AddMessage("\tMerging transects into one dataset...")
-    arcpy.Merge_management(AllTransects, OutputTransects, '')
-
-    # Count features
-    Result = int( arcpy.GetCount_management(OutputTransects).getOutput(0) )
-    arcpy.AddMessage("\tTotal number of transects drawn: {}".format(Result) )
-
-    # Clean up
-    arcpy.AddMessage("\tCleaning up...")
-    for t in AllTransects:
-        arcpy.Delete_management(t)
-
-    return OutputTransects
-
-
-# Environments
-arcpy.env.overwriteOutput = True
-
-# Processing
-transects = LinearTransects(InputPolygon, transect_length, max_transects,
-                            TargetSamplingProportion, OutputTransects,
-                            WorkspaceGDB)
-
-arcpy.AddMessage("Script complete.")
+    # Inputs
+    InputPolygon = TransectIO.GetParameterAsText(0)
+    transect_length = float( TransectIO.GetParameterAsText(1) )
+    max_transects = int( TransectIO.GetParameterAsText(2) )
+    TargetSamplingProportion = float( TransectIO.GetParameterAsText(3) )
+    WorkspaceGDB = TransectIO.GetParameterAsText(4)
+    OutputTransects = TransectIO.GetParameterAsText(5)
+    Profile = TransectIO.GetParameterAsText(6) # Optional
+    CellSize = float( TransectIO.GetParameterAsText(7) or 0 ) # Optional
+    Seed = TransectIO.GetParameterAsText(8) or None # Optional
+    Engine = TransectIO.GetParameterAsText(9) # Optional
+
+    # Environments
+    arcpy = TransectIO.GetArcpy()
+    if arcpy is not None:
+        arcpy.env.overwriteOutput = True
+
+    # The geodatabase engine of v05 stays the default wherever arcpy is
+    if not Engine:
+        Engine = "gdb" if arcpy is not None else "memory"
+
+    # Processing
+    Trace = TransectProfile.NewTrace() if Profile else None
+    transects = LinearTransects(InputPolygon, transect_length, max_transects,
+                                TargetSamplingProportion, OutputTransects,
+                                WorkspaceGDB, Engine, Trace=Trace,
+                                CellSize=CellSize, Seed=Seed)
+    if Profile:
+        TransectProfile.ReportSummary(TransectProfile.WriteProfile(Profile,
+                                                                   [Trace]),
+                                      TransectIO.AddMessage)
+
+    TransectIO.AddMessage("Script complete.")
+
+
+# Processing runs only as a script, or from the Python toolbox through
+# Main, so that other scripts and worker processes can import this module
+# without starting a run
+if __name__ == "__main__":
+    Main()
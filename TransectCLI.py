@@ -0,0 +1,204 @@
+# TransectCLI.py
+# Created: 10/17/2026
+# Command-line entry point for the toolbox functions, outside ArcGIS.
+#
+# The toolbox scripts read their inputs with GetParameterAsText in toolbox
+# order; this script takes named options instead and calls the same
+# functions (TransectTools.py, BatchTransects.py). arcpy is imported only
+# when a run needs it: with --engine gdb, or when an input or output is not
+# a shapefile. Otherwise the run reads and writes shapefiles with NumPy and
+# starts in well under a second.
+#
+# Usage:
+# python TransectCLI.py random PrincetonFarm.shp 150 100 transects.shp
+# python TransectCLI.py max PrincetonFarm.shp 150 100 50 transects.shp
+#     --workers 4 --seed 2017 --counts counts.csv --cache
+# python TransectCLI.py random PrincetonFarm.shp 150 100 transects.shp
+#     --batch-size 4096 --pipeline
+# python TransectCLI.py batch polygons.shp 150 100 transects.shp
+# python TransectCLI.py optimize PrincetonFarm.shp 150 200 1000 transects.shp
+#     --history history.json
+# -----------------------------------------------------------------------------
+
+# Imports
+import argparse
+import csv
+import os
+import sys
+
+import BatchTransects
+import TransectIO
+import TransectProfile
+import TransectTools
+
+
+def NeedsArcpy(Datasets, Engine="memory"):
+    """
+    Returns True when a run needs arcpy: Engine="gdb", or any of Datasets
+    (paths, "" for none) is not a shapefile.
+
+    Dependencies:
+    import os
+    """
+
+    if Engine == "gdb":
+        return True
+    return any(Dataset and os.path.splitext(Dataset)[1].lower() != ".shp"
+               for Dataset in Datasets)
+
+
+def WriteCounts(CountsCSV, Rows):
+    """Writes Rows to CountsCSV, as the toolbox scripts do."""
+
+    TransectIO.AddMessage("\nSaving counts to CSV file...")
+    with open(CountsCSV, 'w', newline='') as f:
+        wr = csv.writer(f, delimiter = ',')
+        wr.writerows(Rows)
+
+
+def main(Arguments=None):
+    """Runs the toolbox functions from the command line."""
+
+    Parser = argparse.ArgumentParser(
+        description="Draws random, nonoverlapping transects within polygons")
+    Commands = Parser.add_subparsers(dest="command", required=True)
+
+    Random = Commands.add_parser(
+        "random", help="draw transects once (Random Transects)")
+    Max = Commands.add_parser(
+        "max", help="keep the best of many trials (Max Random Transects)")
+    Batch = Commands.add_parser(
+        "batch", help="draw transects in every polygon of a layer")
+    Optimize = Commands.add_parser(
+        "optimize", help="improve one layout by local search")
+    for Command in (Random, Max, Batch, Optimize):
+        Command.add_argument("input", help="input polygon shapefile or "
+                             "feature class")
+        Command.add_argument("transect_length", type=float)
+        Command.add_argument("max_transects", type=int)
+    Max.add_argument("max_iterations", type=int)
+    Optimize.add_argument("steps", type=int,
+                          help="destroy-and-repair steps of the search")
+    for Command in (Random, Max, Batch, Optimize):
+        Command.add_argument("output", help="output polyline shapefile or "
+                             "feature class")
+        Command.add_argument("--batch-size", type=int, default=0,
+                             help="candidates drawn and tested at a time")
+        Command.add_argument("--sampler", default="uniform",
+                             choices=["uniform", "freespace"])
+        Command.add_argument("--seed", type=int, default=None,
+                             help="seed of the run (fresh entropy if not "
+                             "given)")
+    for Command in (Random, Max):
+        Command.add_argument("--cell-size", type=float, default=0,
+                             help="cell size of the mask of --engine raster")
+    Optimize.add_argument("--cell-size", type=float, default=0,
+                          help="cell size of the mask the starting layout "
+                          "is drawn on when --start is not given (exact "
+                          "geometry when 0)")
+    for Command in (Random, Max):
+        Command.add_argument("--engine", default="memory",
+                             choices=["memory", "raster", "gdb"])
+        Command.add_argument("--workspace", default="",
+                             help="geodatabase for the intermediate files "
+                             "of --engine gdb")
+        Command.add_argument("--profile", default="",
+                             help="JSON file for the time of each phase")
+        Command.add_argument("--pipeline", action="store_true",
+                             help="draw batches ahead (random) or write "
+                             "checkpoints and the store (max) on a "
+                             "background thread")
+    for Command in (Random, Batch):
+        Command.add_argument("--target", type=float, default=1.0,
+                             help="TargetSamplingProportion")
+    for Command in (Max, Batch):
+        Command.add_argument("--workers", type=int, default=1,
+                             help="worker processes (0 for all CPUs)")
+        Command.add_argument("--counts", default="",
+                             help="CSV file for the trial counts")
+    Max.add_argument("--checkpoint", default="")
+    Max.add_argument("--resume", action="store_true")
+    Max.add_argument("--patience", type=int, default=0)
+    Max.add_argument("--min-chance", type=float, default=0.0)
+    for Command in (Max, Optimize):
+        Command.add_argument("--time-budget", type=float, default=0)
+    Max.add_argument("--store", default="",
+                     help="directory to save every trial's transects in")
+    Max.add_argument("--cache", action="store_true",
+                     help="reuse and extend the cached result of a run "
+                     "with the same inputs and --seed")
+    Batch.add_argument("--id-field", default="")
+    Batch.add_argument("--iterations", type=int, default=1,
+                       help="trials per polygon")
+    Optimize.add_argument("--start", default="",
+                          help="transects to start from (drawn if not "
+                          "given)")
+    Optimize.add_argument("--history", default="",
+                          help="JSON file for the stats of each step")
+    Arguments = Parser.parse_args(Arguments)
+
+    # Import arcpy only when the run reads or writes through it
+    Engine = getattr(Arguments, "engine", "memory")
+    if NeedsArcpy([Arguments.input, Arguments.output,
+                   getattr(Arguments, "workspace", ""),
+                   getattr(Arguments, "start", "")], Engine):
+        arcpy = TransectIO.GetArcpy()
+        if arcpy is None:
+            Parser.error("arcpy is required for --engine gdb and for "
+                         "inputs or outputs that are not shapefiles")
+        arcpy.env.overwriteOutput = True
+    else:
+        TransectIO.UseArcpy(False)
+
+    if Arguments.command == "batch":
+        Output, Counts = BatchTransects.BatchTransects(
+            Arguments.input, Arguments.transect_length,
+            Arguments.max_transects, Arguments.output, Arguments.id_field,
+            Arguments.iterations, Arguments.target,
+            Arguments.workers or None, Arguments.batch_size,
+            Arguments.sampler, Arguments.seed)
+        if Arguments.counts:
+            WriteCounts(Arguments.counts,
+                        [["PolygonID", "Count", "Trials", "Seed"]] + Counts)
+        return 0
+
+    if Arguments.command == "optimize":
+        TransectTools.OptimizeNTransects(
+            Arguments.input, Arguments.transect_length,
+            Arguments.max_transects, Arguments.steps, Arguments.output,
+            Arguments.start, Arguments.seed, Arguments.batch_size,
+            Arguments.sampler, Arguments.cell_size, Arguments.time_budget,
+            Arguments.history)
+        return 0
+
+    if Arguments.command == "random":
+        Trace = TransectProfile.NewTrace() if Arguments.profile else None
+        TransectTools.LinearTransects(
+            Arguments.input, Arguments.transect_length,
+            Arguments.max_transects, Arguments.target, Arguments.output,
+            Arguments.workspace, Engine, Arguments.batch_size,
+            Arguments.sampler, Trace, Arguments.cell_size,
+            Seed=Arguments.seed, Pipeline=Arguments.pipeline)
+        if Trace is not None:
+            TransectProfile.ReportSummary(
+                TransectProfile.WriteProfile(Arguments.profile, [Trace]),
+                TransectIO.AddMessage)
+        return 0
+
+    Output, Counts = TransectTools.MaximizeNTransects(
+        Arguments.input, Arguments.transect_length, Arguments.max_transects,
+        Arguments.max_iterations, Arguments.workspace, Arguments.output,
+        Engine, Arguments.batch_size, Arguments.sampler,
+        Arguments.workers or os.cpu_count(), Arguments.seed,
+        Arguments.checkpoint, Arguments.resume,
+        Patience=Arguments.patience, MinChance=Arguments.min_chance,
+        TimeBudget=Arguments.time_budget, Profile=Arguments.profile,
+        CellSize=Arguments.cell_size, Store=Arguments.store,
+        Pipeline=Arguments.pipeline, Cache=Arguments.cache)
+    if Arguments.counts:
+        WriteCounts(Arguments.counts, [Counts])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
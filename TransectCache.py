@@ -0,0 +1,263 @@
+# TransectCache.py
+# Created: 10/17/2026
+# Caches prepared polygons (TransectGeometry.PreparePolygon) so that the
+# triangulation and edge grid of a study area are built once, then reused
+# by every trial in this process and loaded from disk by later runs.
+#
+# Entries are keyed by a hash of the polygon's ring coordinates, so a
+# changed boundary never reuses a stale entry, and stored as .npz files in
+# the cache directory (TRANSECT_CACHE, or ~/.cache/transect-generator).
+#
+# The results of seeded MaximizeNTransects runs are cached too, in the
+# "results" subdirectory, keyed by the polygon's hash, the run parameters
+# and the Seed, but not max_iterations: trial i always draws the same
+# transects (TransectSeed.py), so a cached run holds the first trials of
+# any longer run with the same key, and a longer run only runs the trials
+# after them. Each entry keeps the counts of the trials run and the layout
+# of the best one. Reading an entry marks it used (its modification time);
+# once the entries take more than RESULT_CACHE_BYTES, the least recently
+# used are deleted.
+# -----------------------------------------------------------------------------
+
+# Imports
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+import TransectGeometry
+
+# Bump when PreparePolygon changes what it stores, so old entries are ignored
+PREPARED_VERSION = 3
+
+# Bump when the cached results of a run change meaning
+RESULT_VERSION = 3
+
+# Largest total size of the cached results, in bytes
+RESULT_CACHE_BYTES = 2**28
+
+# Prepared polygons already loaded or built by this process, by key
+_Prepared = {}
+
+
+def CacheDirectory(CacheDir=None):
+    """
+    Returns (and creates) the cache directory: CacheDir, or the
+    TRANSECT_CACHE environment variable, or ~/.cache/transect-generator.
+    """
+
+    if CacheDir is None:
+        CacheDir = os.environ.get(
+            "TRANSECT_CACHE",
+            os.path.join(os.path.expanduser("~"), ".cache",
+                         "transect-generator"))
+    if not os.path.isdir(CacheDir):
+        os.makedirs(CacheDir)
+    return CacheDir
+
+
+def GeometryKey(Rings):
+    """Returns a hex digest of the ring coordinates of a polygon."""
+
+    Hash = hashlib.sha1()
+    for Ring in Rings:
+        Ring = np.ascontiguousarray(Ring, dtype="<f8")
+        Hash.update(np.int64(len(Ring)).tobytes())
+        Hash.update(Ring.tobytes())
+    return Hash.hexdigest()
+
+
+def PolygonKey(Polygon):
+    """
+    Returns a hex digest of the vertices and ring offsets of a prepared
+    polygon, for caches of what is built from it.
+    """
+
+    return GeometryKey([Polygon["Vertices"], Polygon["RingOffsets"]])
+
+
+def PreparedPolygon(Rings, CacheDir=None):
+    """
+    Returns the prepared polygon for Rings, from this process, from the
+    cache directory, or by running TransectGeometry.PreparePolygon and
+    saving the result. Pass CacheDir=False to skip the disk cache.
+
+    Dependencies:
+    import os
+    import TransectGeometry
+    """
+
+    Key = "polygon-v{0}-{1}".format(PREPARED_VERSION, GeometryKey(Rings))
+    if Key in _Prepared:
+        return _Prepared[Key]
+
+    Polygon = None
+    Path = None
+    if CacheDir is not False:
+        Path = os.path.join(CacheDirectory(CacheDir), Key + ".npz")
+        if os.path.exists(Path):
+            try:
+                Polygon = LoadArrays(Path)
+            except (OSError, ValueError, KeyError):
+                Polygon = None
+
+    if Polygon is None:
+        Polygon = TransectGeometry.PreparePolygon(Rings)
+        if Path is not None:
+            SaveArrays(Path, Polygon)
+
+    _Prepared[Key] = Polygon
+    return Polygon
+
+
+def SaveArrays(Path, Arrays):
+    """
+    Writes a dictionary of arrays and scalars to an .npz file. The file is
+    written under a temporary name and renamed, so readers never see a
+    partly written entry.
+    """
+
+    Handle, Temporary = tempfile.mkstemp(dir=os.path.dirname(Path),
+                                         suffix=".npz")
+    try:
+        with os.fdopen(Handle, "wb") as f:
+            np.savez(f, **Arrays)
+        os.replace(Temporary, Path)
+    except BaseException:
+        os.remove(Temporary)
+        raise
+
+
+def LoadArrays(Path):
+    """Reads a dictionary written by SaveArrays; 0-d arrays become scalars."""
+
+    Arrays = {}
+    with np.load(Path) as Data:
+        for Name in Data.files:
+            Value = Data[Name]
+            Arrays[Name] = Value.item() if Value.ndim == 0 else Value
+    return Arrays
+
+
+# ------------------------------ Run results -------------------------------- #
+
+def ResultDirectory(CacheDir=None):
+    """Returns (and creates) the directory of cached run results."""
+
+    Directory = os.path.join(CacheDirectory(CacheDir), "results")
+    if not os.path.isdir(Directory):
+        os.makedirs(Directory)
+    return Directory
+
+
+def ResultKey(Rings, transect_length, max_transects, Engine, BatchSize,
+              Sampler, CellSize, Seed):
+    """
+    Returns the cache key of a run on the polygon Rings: a hash of the
+    polygon and of every parameter that changes what its trials draw,
+    including Seed and excluding max_iterations.
+
+    Dependencies:
+    import hashlib
+    import json
+    """
+
+    Parameters = {"transect_length": transect_length,
+                  "max_transects": max_transects, "Engine": Engine,
+                  "BatchSize": BatchSize, "Sampler": Sampler,
+                  "CellSize": CellSize, "Seed": str(Seed)}
+    Hash = hashlib.sha1(GeometryKey(Rings).encode("ascii"))
+    Hash.update(json.dumps(Parameters, sort_keys=True).encode("utf-8"))
+    return "result-v{0}-{1}".format(RESULT_VERSION, Hash.hexdigest())
+
+
+def LoadResult(Key, CacheDir=None):
+    """
+    Returns the cached result Key, a dictionary with Counts (the count of
+    each trial run, in order), BestTrial and Best (its transects), or None
+    when there is none. Marks the entry as used.
+
+    Dependencies:
+    import os
+    """
+
+    Path = os.path.join(ResultDirectory(CacheDir), Key + ".npz")
+    if not os.path.exists(Path):
+        return None
+    try:
+        Result = LoadArrays(Path)
+        os.utime(Path)
+    except (OSError, ValueError, KeyError):
+        return None
+    Result["Counts"] = [int(Count) for Count in Result["Counts"]]
+    Result["Best"] = Result["Best"].reshape(-1, 5)
+    return Result
+
+
+def SaveResult(Key, Counts, BestTrial, Best, CacheDir=None,
+               MaxBytes=RESULT_CACHE_BYTES):
+    """
+    Caches the result of a run as Key: Counts (the count of each trial run,
+    in order), BestTrial and Best, its (n, 5) array of transects. Then
+    deletes the least recently used entries until the cached results take
+    at most MaxBytes (never this one).
+
+    Dependencies:
+    import numpy as np
+    import os
+    """
+
+    Path = os.path.join(ResultDirectory(CacheDir), Key + ".npz")
+    SaveArrays(Path, {"Counts": np.asarray(Counts, dtype=np.int64),
+                      "BestTrial": int(BestTrial),
+                      "Best": np.asarray(Best, dtype=np.float64)})
+    EvictResults(MaxBytes, CacheDir, Keep=Path)
+
+
+def EvictResults(MaxBytes=RESULT_CACHE_BYTES, CacheDir=None, Keep=None):
+    """
+    Deletes cached results, least recently used first, until they take at
+    most MaxBytes. The file Keep is never deleted.
+
+    Dependencies:
+    import os
+    """
+
+    Directory = ResultDirectory(CacheDir)
+    Entries = []
+    for Name in os.listdir(Directory):
+        if not (Name.startswith("result-") and Name.endswith(".npz")):
+            continue
+        Path = os.path.join(Directory, Name)
+        try:
+            Status = os.stat(Path)
+        except OSError:
+            continue
+        Entries.append((Status.st_mtime, Status.st_size, Path))
+
+    Total = sum(Size for Used, Size, Path in Entries)
+    for Used, Size, Path in sorted(Entries):
+        if Total <= MaxBytes:
+            break
+        if Keep is not None and os.path.abspath(Path) == os.path.abspath(Keep):
+            continue
+        try:
+            os.remove(Path)
+        except OSError:
+            continue
+        Total -= Size
+
+
+def CachedCounts(Counts, max_transects, max_iterations):
+    """
+    Returns the counts of the trials a run of max_iterations trials takes
+    from cached Counts: the first max_iterations, up to the first that
+    reached max_transects, where the run would have stopped.
+    """
+
+    Counts = list(Counts[:max_iterations])
+    if max_transects in Counts:
+        Counts = Counts[:Counts.index(max_transects) + 1]
+    return Counts
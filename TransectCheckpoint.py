@@ -0,0 +1,115 @@
+# TransectCheckpoint.py
+# Created: 10/17/2026
+# Checkpoints for MaximizeNTransects, so that an interrupted run can resume
+# where it stopped instead of starting over from the first trial.
+#
+# A checkpoint is an append-only text file with one JSON record per line.
+# The first line holds the parameters of the run, including its Seed. Each
+# later line records a group of finished trials: their counts and the index
+# of the best trial, when it improved in that group. Trials draw from the
+# random stream of (Seed, trial index) (TransectSeed.py), so no RNG state
+# is recorded and a best trial drawn in memory is drawn again from its
+# index on resume. The gdb engine keeps feature classes instead: a
+# sequential run resumes with the BestTrial feature class it left in
+# WorkspaceGDB, and each record of a parallel run holds the path of its
+# chunk's best feature class in the scratch geodatabase of a worker, which
+# is kept until the run finishes. RegenerateTrial can still draw any gdb
+# trial again from its index.
+# Each record is flushed and synced as it is written, and a torn last line
+# (from a run killed mid-write) is dropped on resume, so a checkpoint is
+# never left unreadable.
+# -----------------------------------------------------------------------------
+
+# Imports
+import json
+import os
+
+# Trials between records of the sequential MaximizeNTransects loop
+CHECKPOINT_EVERY = 10
+
+
+def ReadCheckpoint(Checkpoint):
+    """
+    Reads a checkpoint.
+
+    Returns the parameters of the run, its records in order, and the length
+    in bytes of the complete records. Returns None, [], 0 when Checkpoint
+    does not exist or has no complete parameters record.
+
+    Dependencies:
+    import json
+    import os
+    """
+
+    if not os.path.exists(Checkpoint):
+        return None, [], 0
+
+    with open(Checkpoint, "rb") as f:
+        Lines = f.read().split(b"\n")
+
+    # The last element is empty after a complete file, or a torn record
+    Records = []
+    Length = 0
+    for Line in Lines[:-1]:
+        try:
+            Records.append(json.loads(Line.decode("utf-8")))
+        except ValueError:
+            break
+        Length += len(Line) + 1
+
+    if not Records:
+        return None, [], 0
+    return Records[0], Records[1:], Length
+
+
+def OpenCheckpoint(Checkpoint, Parameters, Resume=False):
+    """
+    Opens a checkpoint for appending records.
+
+    Checkpoint = path of the checkpoint file
+    Parameters = dictionary of JSON values describing the run
+    Resume = if True and Checkpoint exists, continues it: its parameters
+             must match Parameters (except "Seed", which is kept from the
+             checkpoint) and any torn last record is cut off. Otherwise a
+             new checkpoint replaces Checkpoint.
+
+    Returns the open file, the parameters of the run and the records
+    already written.
+
+    Dependencies:
+    import json
+    """
+
+    Started, Records, Length = (ReadCheckpoint(Checkpoint) if Resume
+                                else (None, [], 0))
+
+    if Started is None:
+        Log = open(Checkpoint, "w")
+        AppendRecord(Log, Parameters)
+        return Log, Parameters, []
+
+    for Key, Value in Parameters.items():
+        if Key != "Seed" and Started.get(Key) != Value:
+            raise ValueError(
+                "Cannot resume {0}: {1} was {2!r}, not {3!r}".format(
+                    Checkpoint, Key, Started.get(Key), Value) )
+
+    Log = open(Checkpoint, "r+")
+    Log.truncate(Length)
+    Log.seek(Length)
+    return Log, Started, Records
+
+
+def AppendRecord(Log, Record):
+    """
+    Writes Record as one line of the checkpoint and syncs it to disk.
+
+    Dependencies:
+    import json
+    import os
+    """
+
+    Log.write(json.dumps(Record, separators=(",", ":")) + "\n")
+    Log.flush()
+    os.fsync(Log.fileno())
+
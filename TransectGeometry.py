@@ -0,0 +1,1112 @@
+# TransectGeometry.py
+# Created: 10/17/2026
+# In-memory geometry engine for LinearTransects
+# Draws random, nonoverlapping, nonparallel sampling transects within a polygon
+# without writing any intermediate datasets to a geodatabase.
+#
+# A polygon is held as a dictionary of NumPy arrays (see PreparePolygon). The
+# UnsampledZone is never built as a polygon: a candidate transect is inside it
+# when it lies within the polygon and is farther than transect_length from
+# every accepted transect, which is exactly the area left after erasing a
+# transect_length buffer around each accepted transect. Accepted transects
+# are kept in a uniform grid (TransectGrid), so that test only looks at
+# nearby transects. The area of the UnsampledZone is a running total, less
+# the exact area each accepted buffer erases from it (ErasedArea).
+#
+# Transects are returned as an (n, 5) float array with columns
+# x0, y0, x1, y1, bearing.
+# -----------------------------------------------------------------------------
+
+# Imports
+import time
+
+import numpy as np
+
+import TransectProfile
+
+# Largest number of point/edge pairs tested at once by the vectorized tests
+CHUNK_SIZE = 2**20
+
+# Largest number of cells, and of cell/edge slots, in a polygon's edge grid
+MAX_EDGE_CELLS = 2**18
+MAX_EDGE_SLOTS = 2**24
+
+# Position of each edge grid cell's reference point within the cell, away
+# from the cell center so that it is unlikely to fall on an edge
+CELL_REFERENCE = (0.5 + 0.0731, 0.5 - 0.0419)
+
+
+# ------------------------------ Polygons ----------------------------------- #
+
+def PreparePolygon(Rings):
+    """
+    Builds the in-memory polygon used by the geometry engine.
+
+    Rings = list of (k, 2) coordinate arrays, one per ring. Exterior and
+            interior rings may be in any order; holes are found by
+            nesting (even-odd rule).
+
+    Returns a dictionary with:
+    Vertices = (v, 2) array of all ring vertices
+    RingOffsets = start index of each ring in Vertices, plus the end index
+    Edges = (e, 4) array of ring edges as x0, y0, x1, y1
+    BBox = xmin, ymin, xmax, ymax
+    Area = area of the polygon, holes excluded
+    EdgeSign = 1 for edges that have the polygon on their left, -1 for
+               edges that have it on their right
+    Triangles = (t, 3, 2) triangulation of the polygon, used to draw
+                uniform random points without rejection
+    TriangleCumArea = running total of the triangle areas
+    GridOrigin, GridCellSize, GridShape = uniform grid over BBox
+    CellEdges = (cells, k) edges touching each grid cell, padded with -1
+    CellInside = True where the reference point of a grid cell is inside
+
+    The grid lets PointsInPolygon and SegmentsCrossBoundary test only the
+    edges near each point or segment. It is left out (and the tests fall
+    back to testing every edge) when it would be too large.
+
+    Dependencies:
+    import numpy as np
+    """
+
+    Closed = []
+    for Ring in Rings:
+        Ring = np.asarray(Ring, dtype=np.float64).reshape(-1, 2)
+        if len(Ring) > 1 and np.array_equal(Ring[0], Ring[-1]):
+            Ring = Ring[:-1]
+        if len(Ring) >= 3:
+            Closed.append(Ring)
+    if not Closed:
+        raise ValueError("Polygon has no rings with at least 3 vertices")
+
+    Vertices = np.concatenate(Closed)
+    RingOffsets = np.cumsum([0] + [len(Ring) for Ring in Closed])
+    Edges = np.concatenate([np.hstack([Ring, np.roll(Ring, -1, axis=0)])
+                            for Ring in Closed])
+
+    Polygon = {"Vertices": Vertices,
+               "RingOffsets": RingOffsets,
+               "Edges": Edges,
+               "BBox": np.array([Vertices[:, 0].min(), Vertices[:, 1].min(),
+                                 Vertices[:, 0].max(), Vertices[:, 1].max()])}
+
+    # A ring is a hole when it is nested inside an odd number of other rings;
+    # its edges have the polygon on their left when the ring is clockwise
+    Area = 0.0
+    EdgeSign = []
+    for i, Ring in enumerate(Closed):
+        x, y = Ring[:, 0], Ring[:, 1]
+        RingArea = np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))
+        Depth = 0
+        for j, Other in enumerate(Closed):
+            if i != j:
+                Depth += int(PointsInPolygon(_RingPolygon(Other),
+                                             x[:1], y[:1])[0])
+        Hole = Depth % 2 == 1
+        Area += -abs(RingArea) / 2.0 if Hole else abs(RingArea) / 2.0
+        EdgeSign.append(np.full(len(Ring), 1.0 if (RingArea > 0) != Hole
+                                else -1.0))
+    Polygon["Area"] = float(Area)
+    Polygon["EdgeSign"] = np.concatenate(EdgeSign)
+
+    Polygon["Triangles"] = _Triangulate(Polygon)
+    A, B, C = [Polygon["Triangles"][:, i] for i in range(3)]
+    Polygon["TriangleCumArea"] = np.cumsum(
+        np.abs(_Orient(A[:, 0], A[:, 1], B[:, 0], B[:, 1],
+                       C[:, 0], C[:, 1])) / 2.0)
+
+    Polygon.update(_EdgeGrid(Polygon))
+
+    return Polygon
+
+
+def _Triangulate(Polygon):
+    """
+    Splits the polygon into triangles along horizontal lines through every
+    vertex. Between two such lines (a slab) no edge starts or ends, so the
+    edges crossing the slab, sorted left to right, pair up (even-odd rule)
+    into trapezoids, each split into two triangles. Holes need no special
+    handling.
+    """
+
+    ax, ay, bx, by = Polygon["Edges"].T
+    Slanted = ay != by
+    ax, ay, bx, by = ax[Slanted], ay[Slanted], bx[Slanted], by[Slanted]
+    Bottom = np.minimum(ay, by)
+    Top = np.maximum(ay, by)
+
+    # Levels one ulp apart leave no room for a middle line; such slabs have
+    # no area and are skipped
+    Levels = np.unique(Polygon["Vertices"][:, 1])
+    Low, High = Levels[:-1], Levels[1:]
+    Middle = (Low + High) / 2.0
+    Keep = (Low < Middle) & (Middle < High)
+    Low, High, Middle = Low[Keep], High[Keep], Middle[Keep]
+
+    Triangles = []
+    for s in _Chunks(len(Middle), len(ax)):
+        Slab, Edge = np.nonzero((Bottom < Middle[s, None]) &
+                                (Top > Middle[s, None]))
+        Slope = (bx[Edge] - ax[Edge]) / (by[Edge] - ay[Edge])
+        yLow = Low[s][Slab]
+        yHigh = High[s][Slab]
+        xLow = ax[Edge] + (yLow - ay[Edge]) * Slope
+        xMiddle = ax[Edge] + (Middle[s][Slab] - ay[Edge]) * Slope
+        xHigh = ax[Edge] + (yHigh - ay[Edge]) * Slope
+
+        Order = np.lexsort((xMiddle, Slab))
+        Left, Right = Order[0::2], Order[1::2]
+        BottomLeft = np.column_stack([xLow[Left], yLow[Left]])
+        BottomRight = np.column_stack([xLow[Right], yLow[Left]])
+        TopRight = np.column_stack([xHigh[Right], yHigh[Left]])
+        TopLeft = np.column_stack([xHigh[Left], yHigh[Left]])
+        Triangles.append(np.stack([BottomLeft, BottomRight, TopRight], 1))
+        Triangles.append(np.stack([BottomLeft, TopRight, TopLeft], 1))
+
+    return np.concatenate(Triangles) if Triangles else np.empty((0, 3, 2))
+
+
+def _EdgeGrid(Polygon):
+    """
+    Builds a uniform grid over the polygon's bounding box with about one
+    cell per edge. Each edge is listed in every cell its bounding box
+    touches, and each cell stores whether its reference point is inside.
+    Returns {} when the padded cell/edge table would be too large.
+    """
+
+    Edges = Polygon["Edges"]
+    xmin, ymin, xmax, ymax = Polygon["BBox"]
+    Width = max(xmax - xmin, 1e-9)
+    Height = max(ymax - ymin, 1e-9)
+    CellSize = max(np.sqrt(Width * Height / min(len(Edges), MAX_EDGE_CELLS)),
+                   max(Width, Height) / MAX_EDGE_CELLS)
+    nx = int(Width // CellSize) + 1
+    ny = int(Height // CellSize) + 1
+
+    # Range of cells touched by each edge's bounding box
+    Column0 = ((np.minimum(Edges[:, 0], Edges[:, 2]) - xmin) //
+               CellSize).astype(np.int64)
+    Column1 = ((np.maximum(Edges[:, 0], Edges[:, 2]) - xmin) //
+               CellSize).astype(np.int64)
+    Row0 = ((np.minimum(Edges[:, 1], Edges[:, 3]) - ymin) //
+            CellSize).astype(np.int64)
+    Row1 = ((np.maximum(Edges[:, 1], Edges[:, 3]) - ymin) //
+            CellSize).astype(np.int64)
+    Columns = Column1 - Column0 + 1
+    Counts = Columns * (Row1 - Row0 + 1)
+    if Counts.sum() > MAX_EDGE_SLOTS:
+        return {}
+
+    Edge = np.repeat(np.arange(len(Edges)), Counts)
+    Local = np.arange(Counts.sum()) - np.repeat(np.cumsum(Counts) - Counts,
+                                                 Counts)
+    Cell = ((np.repeat(Row0, Counts) + Local // np.repeat(Columns, Counts))
+            * nx + np.repeat(Column0, Counts) +
+            Local % np.repeat(Columns, Counts))
+
+    # Pad the edges of each cell into one row of a table
+    Order = np.argsort(Cell, kind="stable")
+    Cell, Edge = Cell[Order], Edge[Order]
+    PerCell = np.bincount(Cell, minlength=nx * ny)
+    if nx * ny * max(1, PerCell.max()) > MAX_EDGE_SLOTS:
+        return {}
+    Slot = np.arange(len(Cell)) - (np.cumsum(PerCell) - PerCell)[Cell]
+    CellEdges = np.full((nx * ny, max(1, PerCell.max())), -1, dtype=np.int32)
+    CellEdges[Cell, Slot] = Edge
+
+    Grid = {"GridOrigin": np.array([xmin, ymin]),
+            "GridCellSize": float(CellSize),
+            "GridShape": np.array([ny, nx]),
+            "CellEdges": CellEdges}
+
+    Row, Column = np.divmod(np.arange(nx * ny), nx)
+    Grid["CellInside"] = PointsInPolygon(
+        {"Edges": Edges},
+        xmin + (Column + CELL_REFERENCE[0]) * CellSize,
+        ymin + (Row + CELL_REFERENCE[1]) * CellSize)
+
+    return Grid
+
+
+def _RingPolygon(Ring):
+    """Returns a minimal polygon dictionary (Edges only) for a single ring."""
+
+    Ring = np.asarray(Ring, dtype=np.float64).reshape(-1, 2)
+    return {"Edges": np.hstack([Ring, np.roll(Ring, -1, axis=0)])}
+
+
+def _Chunks(n, Width):
+    """Yields slices over n items, each small enough to test against Width."""
+
+    Step = max(1, CHUNK_SIZE // max(1, Width))
+    for Start in range(0, n, Step):
+        yield slice(Start, min(n, Start + Step))
+
+
+def PointsInPolygon(Polygon, x, y):
+    """
+    Returns a boolean array, True where point (x, y) is inside Polygon.
+    Uses the even-odd rule, so points inside holes are outside.
+    """
+
+    x = np.asarray(x, dtype=np.float64).ravel()
+    y = np.asarray(y, dtype=np.float64).ravel()
+    if "CellEdges" in Polygon:
+        return _PointsInPolygonGrid(Polygon, x, y)
+    ax, ay, bx, by = Polygon["Edges"].T
+
+    Inside = np.zeros(len(x), dtype=bool)
+    for s in _Chunks(len(x), len(ax)):
+        px = x[s, None]
+        py = y[s, None]
+        Straddle = (ay > py) != (by > py)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            XCross = ax + (py - ay) * (bx - ax) / (by - ay)
+        Inside[s] = np.count_nonzero(Straddle & (px < XCross), axis=1) % 2 == 1
+
+    return Inside
+
+
+def _PointsInPolygonGrid(Polygon, x, y):
+    """
+    PointsInPolygon using the edge grid: a point is inside when its cell's
+    reference point is inside and the segment between them crosses an even
+    number of edges, or outside and it crosses an odd number. That segment
+    stays within the cell, so only the cell's own edges are tested.
+    """
+
+    ny, nx = [int(n) for n in Polygon["GridShape"]]
+    xmin, ymin = Polygon["GridOrigin"]
+    CellSize = Polygon["GridCellSize"]
+    Column = np.floor((x - xmin) / CellSize)
+    Row = np.floor((y - ymin) / CellSize)
+
+    Inside = np.zeros(len(x), dtype=bool)
+    Index = np.flatnonzero((Column >= 0) & (Column < nx) &
+                           (Row >= 0) & (Row < ny))
+    Column = Column[Index].astype(np.intp)
+    Row = Row[Index].astype(np.intp)
+    Cell = Row * nx + Column
+    rx = xmin + (Column + CELL_REFERENCE[0]) * CellSize
+    ry = ymin + (Row + CELL_REFERENCE[1]) * CellSize
+    CellEdges = Polygon["CellEdges"]
+
+    for s in _Chunks(len(Index), CellEdges.shape[1]):
+        Rows = CellEdges[Cell[s]]
+        ax, ay, bx, by = np.moveaxis(Polygon["Edges"][np.maximum(Rows, 0)],
+                                     -1, 0)
+        px, py = x[Index[s], None], y[Index[s], None]
+        qx, qy = rx[s, None], ry[s, None]
+        Cross = ((_Orient(ax, ay, bx, by, px, py) *
+                  _Orient(ax, ay, bx, by, qx, qy) < 0) &
+                 (_Orient(px, py, qx, qy, ax, ay) *
+                  _Orient(px, py, qx, qy, bx, by) < 0) & (Rows >= 0))
+        Inside[Index[s]] = (Polygon["CellInside"][Cell[s]] ^
+                            (np.count_nonzero(Cross, axis=1) % 2 == 1))
+
+    return Inside
+
+
+def _Orient(ax, ay, bx, by, cx, cy):
+    """Twice the signed area of triangle abc (positive if counterclockwise)."""
+
+    return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+
+def SegmentsCrossBoundary(Polygon, x0, y0, x1, y1):
+    """
+    Returns a boolean array, True where segment (x0, y0)-(x1, y1) touches or
+    crosses any edge of Polygon.
+    """
+
+    x0, y0, x1, y1 = [np.asarray(a, dtype=np.float64).ravel()
+                      for a in (x0, y0, x1, y1)]
+    if "CellEdges" in Polygon:
+        return _SegmentsCrossBoundaryGrid(Polygon, x0, y0, x1, y1)
+    ax, ay, bx, by = Polygon["Edges"].T
+
+    Cross = np.zeros(len(x0), dtype=bool)
+    for s in _Chunks(len(x0), len(ax)):
+        px0, py0 = x0[s, None], y0[s, None]
+        px1, py1 = x1[s, None], y1[s, None]
+        d1 = _Orient(ax, ay, bx, by, px0, py0)
+        d2 = _Orient(ax, ay, bx, by, px1, py1)
+        d3 = _Orient(px0, py0, px1, py1, ax, ay)
+        d4 = _Orient(px0, py0, px1, py1, bx, by)
+        Cross[s] = np.any((d1 * d2 <= 0) & (d3 * d4 <= 0), axis=1)
+
+    return Cross
+
+
+def _SegmentsCrossBoundaryGrid(Polygon, x0, y0, x1, y1):
+    """
+    SegmentsCrossBoundary using the edge grid: only edges listed in the
+    cells touched by each segment's bounding box are tested.
+    """
+
+    ny, nx = [int(n) for n in Polygon["GridShape"]]
+    xmin, ymin = Polygon["GridOrigin"]
+    CellSize = Polygon["GridCellSize"]
+
+    def CellRange(a, b, Origin, n):
+        First = np.floor((np.minimum(a, b) - Origin) / CellSize)
+        Last = np.floor((np.maximum(a, b) - Origin) / CellSize)
+        return (np.clip(First, 0, n - 1).astype(np.intp),
+                np.clip(Last, 0, n - 1).astype(np.intp))
+
+    Column0, Column1 = CellRange(x0, x1, xmin, nx)
+    Row0, Row1 = CellRange(y0, y1, ymin, ny)
+    Columns = Column1 - Column0 + 1
+    Rows = Row1 - Row0 + 1
+    Cross = np.zeros(len(x0), dtype=bool)
+    if len(x0) == 0:
+        return Cross
+
+    # Every (column, row) offset within the largest bounding box
+    OffsetRow, OffsetColumn = np.divmod(
+        np.arange(Columns.max() * Rows.max()), Columns.max())
+    CellEdges = Polygon["CellEdges"]
+    Edges = Polygon["Edges"]
+
+    for s in _Chunks(len(x0), len(OffsetRow) * CellEdges.shape[1]):
+        Used = ((OffsetColumn < Columns[s, None]) &
+                (OffsetRow < Rows[s, None]))
+        Cell = np.where(Used, (Row0[s, None] + OffsetRow) * nx +
+                        Column0[s, None] + OffsetColumn, 0)
+        Slots = CellEdges[Cell]
+        Slots[~Used] = -1
+        Slots = Slots.reshape(len(Slots), -1)
+        ax, ay, bx, by = np.moveaxis(Edges[np.maximum(Slots, 0)], -1, 0)
+        px0, py0 = x0[s, None], y0[s, None]
+        px1, py1 = x1[s, None], y1[s, None]
+        d1 = _Orient(ax, ay, bx, by, px0, py0)
+        d2 = _Orient(ax, ay, bx, by, px1, py1)
+        d3 = _Orient(px0, py0, px1, py1, ax, ay)
+        d4 = _Orient(px0, py0, px1, py1, bx, by)
+        Cross[s] = np.any((d1 * d2 <= 0) & (d3 * d4 <= 0) & (Slots >= 0),
+                          axis=1)
+
+    return Cross
+
+
+def SegmentsWithinPolygon(Polygon, x0, y0, x1, y1):
+    """
+    Returns a boolean array, True where segment (x0, y0)-(x1, y1) is
+    completely within Polygon: it starts inside and crosses no edge.
+    """
+
+    return (PointsInPolygon(Polygon, x0, y0) &
+            ~SegmentsCrossBoundary(Polygon, x0, y0, x1, y1))
+
+
+def RandomPointsInPolygon(Polygon, n, rng):
+    """
+    Returns x, y arrays of n points drawn uniformly within Polygon: in
+    triangles picked in proportion to their area, or by rejection sampling
+    inside its bounding box when it has no triangulation.
+    """
+
+    if len(Polygon.get("TriangleCumArea", [])):
+        CumArea = Polygon["TriangleCumArea"]
+        Pick = np.searchsorted(CumArea, rng.uniform(0.0, CumArea[-1], n),
+                               side="right")
+        A, B, C = np.moveaxis(
+            Polygon["Triangles"][np.minimum(Pick, len(CumArea) - 1)], 1, 0)
+        u, v = rng.random((2, n))
+        Flip = u + v > 1.0
+        u[Flip], v[Flip] = 1.0 - u[Flip], 1.0 - v[Flip]
+        Points = A + u[:, None] * (B - A) + v[:, None] * (C - A)
+        return Points[:, 0], Points[:, 1]
+
+    xmin, ymin, xmax, ymax = Polygon["BBox"]
+    Fill = max(Polygon["Area"] / ((xmax - xmin) * (ymax - ymin)), 1e-3)
+
+    x = np.empty(0)
+    y = np.empty(0)
+    while len(x) < n:
+        Draw = int((n - len(x)) / Fill * 1.2) + 16
+        px = rng.uniform(xmin, xmax, Draw)
+        py = rng.uniform(ymin, ymax, Draw)
+        Keep = PointsInPolygon(Polygon, px, py)
+        x = np.concatenate([x, px[Keep]])
+        y = np.concatenate([y, py[Keep]])
+
+    return x[:n], y[:n]
+
+
+# ------------------------------ Transects ---------------------------------- #
+
+def TransectEndpoints(x, y, bearing, transect_length):
+    """
+    Returns x1, y1 of transects starting at (x, y) with bearing in degrees
+    clockwise from north, as drawn by BearingDistanceToLine.
+    """
+
+    Radians = np.radians(bearing)
+    return (x + transect_length * np.sin(Radians),
+            y + transect_length * np.cos(Radians))
+
+
+def PointSegmentDistance(px, py, ax, ay, bx, by):
+    """Distance from point (px, py) to segment (ax, ay)-(bx, by), broadcast."""
+
+    vx = bx - ax
+    vy = by - ay
+    LengthSq = vx * vx + vy * vy
+    t = ((px - ax) * vx + (py - ay) * vy) / np.where(LengthSq > 0,
+                                                     LengthSq, 1.0)
+    t = np.clip(t, 0.0, 1.0)
+    return np.hypot(px - (ax + t * vx), py - (ay + t * vy))
+
+
+def SegmentDistance(ax, ay, bx, by, cx, cy, dx, dy):
+    """
+    Distance between segments (ax, ay)-(bx, by) and (cx, cy)-(dx, dy),
+    broadcast. Crossing segments are at distance 0.
+    """
+
+    Distance = np.minimum(
+        np.minimum(PointSegmentDistance(ax, ay, cx, cy, dx, dy),
+                   PointSegmentDistance(bx, by, cx, cy, dx, dy)),
+        np.minimum(PointSegmentDistance(cx, cy, ax, ay, bx, by),
+                   PointSegmentDistance(dx, dy, ax, ay, bx, by)))
+    Cross = ((_Orient(ax, ay, bx, by, cx, cy) *
+              _Orient(ax, ay, bx, by, dx, dy) < 0) &
+             (_Orient(cx, cy, dx, dy, ax, ay) *
+              _Orient(cx, cy, dx, dy, bx, by) < 0))
+    return np.where(Cross, 0.0, Distance)
+
+
+def ClearOfTransects(x0, y0, x1, y1, Transects, transect_length):
+    """
+    Returns a boolean array, True where segment (x0, y0)-(x1, y1) is farther
+    than transect_length from every row of Transects, i.e. lies outside all
+    of their buffers. Pass x1, y1 = x0, y0 to test points.
+    """
+
+    x0, y0, x1, y1 = [np.asarray(a, dtype=np.float64).ravel()
+                      for a in (x0, y0, x1, y1)]
+    Clear = np.ones(len(x0), dtype=bool)
+    if len(Transects) == 0:
+        return Clear
+
+    ax, ay, bx, by = Transects[:, 0], Transects[:, 1], \
+        Transects[:, 2], Transects[:, 3]
+    for s in _Chunks(len(x0), len(Transects)):
+        Distance = SegmentDistance(x0[s, None], y0[s, None],
+                                   x1[s, None], y1[s, None],
+                                   ax, ay, bx, by)
+        Clear[s] = np.all(Distance > transect_length, axis=1)
+
+    return Clear
+
+
+# ----------------------------- Transect grid ------------------------------- #
+
+# Accepted transects are indexed by the grid cell of their midpoint. Cells
+# are at least 2 * transect_length wide: a segment or point within
+# transect_length of a transect has its midpoint within 2 * transect_length
+# of the transect's midpoint, so only the 3 x 3 block of cells around a
+# candidate has to be tested, however many transects have been accepted.
+
+# Largest number of cells in a transect grid
+MAX_GRID_CELLS = 2**22
+
+
+def TransectGrid(Polygon, transect_length, Transects, Slots=4):
+    """
+    Returns an empty uniform grid index over Polygon for the rows of
+    Transects (an (n, 5) array filled in as transects are accepted).
+    Slots = initial number of transects per cell; cells grow as needed.
+    """
+
+    xmin, ymin, xmax, ymax = Polygon["BBox"]
+    CellSize = max(2.0 * transect_length,
+                   np.sqrt((xmax - xmin) * (ymax - ymin) / MAX_GRID_CELLS))
+    nx = int((xmax - xmin) // CellSize) + 1
+    ny = int((ymax - ymin) // CellSize) + 1
+
+    return {"Origin": (xmin, ymin),
+            "CellSize": CellSize,
+            "Shape": (ny, nx),
+            "Slots": np.full((ny, nx, Slots), -1, dtype=np.int32),
+            "Counts": np.zeros((ny, nx), dtype=np.int32),
+            "Size": 0,
+            "Transects": Transects,
+            "transect_length": transect_length}
+
+
+def _GridCells(Grid, x, y):
+    """Returns the row and column of the cells holding points (x, y)."""
+
+    ny, nx = Grid["Shape"]
+    Column = np.floor((x - Grid["Origin"][0]) / Grid["CellSize"])
+    Row = np.floor((y - Grid["Origin"][1]) / Grid["CellSize"])
+    return (np.clip(Row, 0, ny - 1).astype(np.intp),
+            np.clip(Column, 0, nx - 1).astype(np.intp))
+
+
+def AddToGrid(Grid, Row):
+    """Indexes row Row of Grid["Transects"], in place."""
+
+    x0, y0, x1, y1 = Grid["Transects"][Row, :4]
+    CellRow, CellColumn = _GridCells(Grid, (x0 + x1) / 2.0, (y0 + y1) / 2.0)
+    Count = Grid["Counts"][CellRow, CellColumn]
+    if Count == Grid["Slots"].shape[2]:
+        Grid["Slots"] = np.concatenate([Grid["Slots"],
+                                        np.full_like(Grid["Slots"], -1)],
+                                       axis=2)
+    Grid["Slots"][CellRow, CellColumn, Count] = Row
+    Grid["Counts"][CellRow, CellColumn] = Count + 1
+    Grid["Size"] += 1
+
+
+def ClearOfGrid(Grid, x0, y0, x1, y1):
+    """
+    Returns a boolean array, True where segment (x0, y0)-(x1, y1) is farther
+    than transect_length from every transect in Grid. Same result as
+    ClearOfTransects, testing only the transects in nearby cells.
+    """
+
+    x0, y0, x1, y1 = [np.asarray(a, dtype=np.float64).ravel()
+                      for a in (x0, y0, x1, y1)]
+    Clear = np.ones(len(x0), dtype=bool)
+    if Grid["Size"] == 0 or len(x0) == 0:
+        return Clear
+
+    # Rows of the transects in the 3 x 3 block of cells around each midpoint
+    ny, nx = Grid["Shape"]
+    CellRow, CellColumn = _GridCells(Grid, (x0 + x1) / 2.0, (y0 + y1) / 2.0)
+    Row = CellRow[:, None] + np.repeat([-1, 0, 1], 3)
+    Column = CellColumn[:, None] + np.tile([-1, 0, 1], 3)
+    Outside = (Row < 0) | (Row >= ny) | (Column < 0) | (Column >= nx)
+    Rows = Grid["Slots"][np.clip(Row, 0, ny - 1), np.clip(Column, 0, nx - 1)]
+    Rows[Outside] = -1
+    Rows = Rows.reshape(len(x0), -1)
+
+    Index = np.flatnonzero(np.any(Rows >= 0, axis=1))
+    if len(Index) == 0:
+        return Clear
+    Rows = Rows[Index]
+    Neighbors = Grid["Transects"][np.maximum(Rows, 0)]
+    for s in _Chunks(len(Index), Rows.shape[1]):
+        Distance = SegmentDistance(x0[Index[s], None], y0[Index[s], None],
+                                   x1[Index[s], None], y1[Index[s], None],
+                                   Neighbors[s, :, 0], Neighbors[s, :, 1],
+                                   Neighbors[s, :, 2], Neighbors[s, :, 3])
+        Clear[Index[s]] = np.all((Distance > Grid["transect_length"]) |
+                                 (Rows[s] < 0), axis=1)
+
+    return Clear
+
+
+# --------------------------- Unsampled area -------------------------------- #
+
+# The unsampled area is a running total: when a transect is accepted, the
+# part of its buffer that is inside the polygon and outside every earlier
+# buffer is measured exactly and subtracted. That part is bounded by pieces
+# of three kinds of curves: the outline of the new buffer, the polygon's
+# edges, and the outlines of the earlier buffers that overlap it. Each curve
+# is cut where it crosses the others, the pieces that bound the part are
+# kept, and its area is the sum of (x dy - y dx) / 2 along them (Green's
+# theorem). Only the edges and buffers near the new transect take part, so
+# the cost does not grow with the polygon or with the transects accepted.
+
+def _BufferOutline(x0, y0, x1, y1, Radius):
+    """
+    Returns the counterclockwise outline of the buffer of segment
+    (x0, y0)-(x1, y1): its two sides as a (2, 4) array of x0, y0, x1, y1,
+    and its two half circles as a (2, 5) array of center x, center y,
+    radius, start angle and sweep (radians, counterclockwise).
+    """
+
+    Angle = np.arctan2(y1 - y0, x1 - x0)
+    ox, oy = -np.sin(Angle) * Radius, np.cos(Angle) * Radius
+    Sides = np.array([[x0 - ox, y0 - oy, x1 - ox, y1 - oy],
+                      [x1 + ox, y1 + oy, x0 + ox, y0 + oy]])
+    Arcs = np.array([[x1, y1, Radius, Angle - np.pi / 2.0, np.pi],
+                     [x0, y0, Radius, Angle + np.pi / 2.0, np.pi]])
+    return Sides, Arcs
+
+
+def _ArcFraction(Arcs, Angle):
+    """
+    Returns how far Angle is along each arc, as a fraction of its sweep
+    (within [0, 1] only for angles on the arc).
+    """
+
+    return (np.mod(Angle - Arcs[..., 3], 2.0 * np.pi) / Arcs[..., 4])
+
+
+def _Crossings(Segments, Arcs, SegmentOwner, ArcOwner):
+    """
+    Finds where the curves of different owners cross. Returns the segment
+    and the fraction along it of each crossing on a segment, and the arc and
+    the fraction along it of each crossing on an arc.
+    """
+
+    Split = {"Segment": [], "SegmentFraction": [], "Arc": [],
+             "ArcFraction": []}
+
+    # Segment with segment
+    px, py = Segments[:, 0], Segments[:, 1]
+    rx, ry = Segments[:, 2] - px, Segments[:, 3] - py
+    qx, qy = px[None, :] - px[:, None], py[None, :] - py[:, None]
+    Denominator = rx[:, None] * ry[None, :] - ry[:, None] * rx[None, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (qx * ry[None, :] - qy * rx[None, :]) / Denominator
+        u = (qx * ry[:, None] - qy * rx[:, None]) / Denominator
+    i, j = np.nonzero((SegmentOwner[:, None] != SegmentOwner[None, :]) &
+                      (t > 0) & (t < 1) & (u > 0) & (u < 1))
+    Split["Segment"] += [i, j]
+    Split["SegmentFraction"] += [t[i, j], u[i, j]]
+
+    # Segment with arc: |p + t r - c|^2 = R^2
+    cx, cy, Radius = Arcs[:, 0], Arcs[:, 1], Arcs[:, 2]
+    dx, dy = px[:, None] - cx[None, :], py[:, None] - cy[None, :]
+    a = (rx * rx + ry * ry)[:, None]
+    b = rx[:, None] * dx + ry[:, None] * dy
+    Root = np.sqrt(np.maximum(b * b - a * (dx * dx + dy * dy -
+                                           Radius[None, :] ** 2), 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Roots = ((-b - Root) / a, (-b + Root) / a)
+    for t in Roots:
+        Angle = np.arctan2(dy + t * ry[:, None], dx + t * rx[:, None])
+        f = _ArcFraction(Arcs[None, :], Angle)
+        i, j = np.nonzero((SegmentOwner[:, None] != ArcOwner[None, :]) &
+                          (Root > 0) & (t > 0) & (t < 1) & (f < 1))
+        Split["Segment"].append(i)
+        Split["SegmentFraction"].append(t[i, j])
+        Split["Arc"].append(j)
+        Split["ArcFraction"].append(f[i, j])
+
+    # Arc with arc: the two points where their circles cross
+    dx, dy = cx[None, :] - cx[:, None], cy[None, :] - cy[:, None]
+    d = np.hypot(dx, dy)
+    r0, r1 = Radius[:, None], Radius[None, :]
+    Meet = ((ArcOwner[:, None] < ArcOwner[None, :]) & (d > 0) &
+            (d < r0 + r1) & (d > np.abs(r0 - r1)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Along = (d * d + r0 * r0 - r1 * r1) / (2.0 * d)
+        Across = np.sqrt(np.maximum(r0 * r0 - Along * Along, 0.0))
+        ux, uy = dx / d, dy / d
+    for Side in (-1.0, 1.0):
+        x = cx[:, None] + Along * ux - Side * Across * uy
+        y = cy[:, None] + Along * uy + Side * Across * ux
+        f0 = _ArcFraction(Arcs[:, None],
+                          np.arctan2(y - cy[:, None], x - cx[:, None]))
+        f1 = _ArcFraction(Arcs[None, :],
+                          np.arctan2(y - cy[None, :], x - cx[None, :]))
+        i, j = np.nonzero(Meet & (f0 < 1) & (f1 < 1))
+        Split["Arc"] += [i, j]
+        Split["ArcFraction"] += [f0[i, j], f1[i, j]]
+
+    return [np.concatenate(Split[Key]) if Split[Key] else np.empty(0)
+            for Key in ("Segment", "SegmentFraction", "Arc", "ArcFraction")]
+
+
+def _Pieces(Count, Curve, Fraction):
+    """
+    Cuts each of Count curves at the given fractions along it. Returns the
+    curve and the start and end fractions of every piece.
+    """
+
+    Curve = np.concatenate([Curve.astype(np.intp), np.arange(Count),
+                            np.arange(Count)])
+    Fraction = np.concatenate([Fraction, np.zeros(Count), np.ones(Count)])
+    Order = np.lexsort((Fraction, Curve))
+    Curve, Fraction = Curve[Order], Fraction[Order]
+    Next = np.flatnonzero((Curve[:-1] == Curve[1:]) &
+                          (Fraction[:-1] < Fraction[1:]))
+    return Curve[Next], Fraction[Next], Fraction[Next + 1]
+
+
+def _GridNeighbors(Grid, x0, y0, x1, y1, Distance):
+    """
+    Returns the rows of the transects in Grid that are within Distance of
+    segment (x0, y0)-(x1, y1).
+    """
+
+    ny, nx = Grid["Shape"]
+    Reach = Distance + Grid["transect_length"] / 2.0
+    Row0, Column0 = _GridCells(Grid, min(x0, x1) - Reach,
+                               min(y0, y1) - Reach)
+    Row1, Column1 = _GridCells(Grid, max(x0, x1) + Reach,
+                               max(y0, y1) + Reach)
+    Rows = Grid["Slots"][Row0:Row1 + 1, Column0:Column1 + 1].ravel()
+    Rows = Rows[Rows >= 0]
+    Near = Grid["Transects"][Rows]
+    return Rows[SegmentDistance(x0, y0, x1, y1, Near[:, 0], Near[:, 1],
+                                Near[:, 2], Near[:, 3]) < Distance]
+
+
+def ErasedArea(Polygon, Grid, Row):
+    """
+    Returns the area of the buffer (transect_length) of transect Row of
+    Grid["Transects"] that is inside Polygon and outside the buffers of
+    the other transects in Grid: the unsampled area the transect erases.
+    """
+
+    L = Grid["transect_length"]
+    x0, y0, x1, y1 = Grid["Transects"][Row, :4]
+
+    # Curves that can bound the erased part: the outline of the new buffer
+    # (owner 0), the edges near it (owner -1), and the outlines of the
+    # buffers that overlap it (owner 1, 2...)
+    Near = _GridNeighbors(Grid, x0, y0, x1, y1, 2.0 * L)
+    Near = Grid["Transects"][Near[Near != Row]]
+    Edges = Polygon["Edges"]
+    Edge = np.flatnonzero(
+        (np.maximum(Edges[:, 0], Edges[:, 2]) >= min(x0, x1) - L) &
+        (np.minimum(Edges[:, 0], Edges[:, 2]) <= max(x0, x1) + L) &
+        (np.maximum(Edges[:, 1], Edges[:, 3]) >= min(y0, y1) - L) &
+        (np.minimum(Edges[:, 1], Edges[:, 3]) <= max(y0, y1) + L))
+    Outlines = [_BufferOutline(x0, y0, x1, y1, L)] + [
+        _BufferOutline(ax, ay, bx, by, L) for ax, ay, bx, by in Near[:, :4]]
+    Segments = np.concatenate([Sides for Sides, Arcs in Outlines] +
+                              [Edges[Edge]])
+    Arcs = np.concatenate([Arcs for Sides, Arcs in Outlines])
+    Owner = np.repeat(np.arange(len(Outlines)), 2)
+    SegmentOwner = np.concatenate([Owner, np.full(len(Edge), -1)])
+    SegmentSign = np.concatenate([np.ones(len(Owner)),
+                                  Polygon["EdgeSign"][Edge]])
+
+    # Cut the curves where they cross and find a point in each piece
+    Segment, SegmentFraction, Arc, ArcFraction = _Crossings(
+        Segments, Arcs, SegmentOwner, Owner)
+    Segment, s0, s1 = _Pieces(len(Segments), Segment, SegmentFraction)
+    Arc, a0, a1 = _Pieces(len(Arcs), Arc, ArcFraction)
+    sx, sy = Segments[Segment, 0], Segments[Segment, 1]
+    rx = Segments[Segment, 2] - sx
+    ry = Segments[Segment, 3] - sy
+    cx, cy, Radius, Start, Sweep = Arcs[Arc].T
+    Middle = Start + (a0 + a1) / 2.0 * Sweep
+    x = np.concatenate([sx + (s0 + s1) / 2.0 * rx,
+                        cx + Radius * np.cos(Middle)])
+    y = np.concatenate([sy + (s0 + s1) / 2.0 * ry,
+                        cy + Radius * np.sin(Middle)])
+    PieceOwner = np.concatenate([SegmentOwner[Segment], Owner[Arc]])
+
+    # A piece bounds the erased part when the part is on one side of it:
+    # inside the new buffer and the polygon, and outside the other buffers,
+    # leaving out the curve's own
+    InNew = PointSegmentDistance(x, y, x0, y0, x1, y1) < L
+    InPolygon = PointsInPolygon(Polygon, x, y)
+    InOld = ((PointSegmentDistance(x[:, None], y[:, None], Near[:, 0],
+                                   Near[:, 1], Near[:, 2], Near[:, 3]) < L) &
+             (PieceOwner[:, None] != np.arange(1, len(Outlines))))
+    Keep = ~np.any(InOld, axis=1)
+    Keep &= np.where(PieceOwner == 0, InPolygon,
+                     np.where(PieceOwner < 0, InNew, InNew & InPolygon))
+
+    # Sum (x dy - y dx) / 2 along the kept pieces; the outlines of the
+    # other buffers bound the part from outside them, so count backwards
+    Sign = np.concatenate([SegmentSign[Segment],
+                           np.where(Owner[Arc] == 0, 1.0, -1.0)])
+    Sign[(PieceOwner > 0) & (np.arange(len(Sign)) < len(Segment))] = -1.0
+    Ax, Ay = sx + s0 * rx, sy + s0 * ry
+    Bx, By = sx + s1 * rx, sy + s1 * ry
+    a, b = Start + a0 * Sweep, Start + a1 * Sweep
+    Twice = np.concatenate([
+        Ax * By - Bx * Ay,
+        Radius * Radius * (b - a) + cx * Radius * (np.sin(b) - np.sin(a)) +
+        cy * Radius * (np.cos(a) - np.cos(b))])
+    return float(np.sum((Sign * Twice)[Keep]) / 2.0)
+
+
+def RandomPointInZone(Polygon, Grid, rng, ZoneRemains=True, BatchSize=64,
+                      MaxBatches=1000):
+    """
+    Returns one random point (x, y) in the UnsampledZone: inside Polygon and
+    outside the buffers of the transects in Grid. Returns None when the zone
+    is empty or no point is found after MaxBatches batches of BatchSize.
+    """
+
+    if not ZoneRemains:
+        return None
+
+    for Batch in range(MaxBatches):
+        x, y = RandomPointsInPolygon(Polygon, BatchSize, rng)
+        Clear = np.flatnonzero(ClearOfGrid(Grid, x, y, x, y))
+        if len(Clear):
+            return x[Clear[0]], y[Clear[0]]
+
+    return None
+
+
+def DrawTransects(Polygon, transect_length, max_transects,
+                  TargetSamplingProportion, rng=None, BatchSize=0,
+                  Sampler="uniform", Trace=None, CellSize=0, Prefetch=0):
+    """
+    Draws up to max_transects transects within Polygon, following the same
+    steps as the geodatabase version of LinearTransects:
+
+    1. Drop a random start point in the UnsampledZone
+    2. Draw a transect of transect_length at a random whole-degree bearing
+    3. Keep the transect if it is completely within the UnsampledZone and
+       erase its buffer (transect_length) from the UnsampledZone
+    4. Stop at max_transects attempts, when the unsampled proportion falls
+       to 1 - TargetSamplingProportion, or when the UnsampledZone is too
+       small to continue
+
+    Polygon = dictionary from PreparePolygon
+    rng = numpy.random.Generator (a new unseeded one if None)
+    BatchSize = when above 0, draws candidates BatchSize at a time with
+                DrawTransectsBatched instead
+    Sampler = "uniform" draws start points uniformly in the UnsampledZone;
+              "freespace" draws only start points and bearings that can
+              still hold a whole transect, BatchSize (or
+              TransectRaster.BATCH_SIZE) at a time, with
+              TransectRaster.DrawTransectsFreeSpace
+    Trace = trace from TransectProfile.NewTrace that receives the time of
+            each phase and the outcome of each candidate (None = off)
+    CellSize = when above 0, filters candidates and measures the unsampled
+               area on a mask of CellSize cells (survivors are still tested
+               exactly), BatchSize (or TransectMask.BATCH_SIZE) at a time,
+               with TransectMask.DrawTransectsMask; Sampler is ignored
+    Prefetch = with BatchSize and the uniform Sampler, batches drawn ahead
+               by a producer thread (see DrawTransectsBatched; off when 0)
+
+    Returns Transects, an (n, 5) array of x0, y0, x1, y1, bearing, and Stats,
+    a dictionary of counts and areas for the run.
+
+    Dependencies:
+    import numpy as np
+    """
+
+    if rng is None:
+        rng = np.random.default_rng()
+    if CellSize > 0:
+        import TransectMask
+        return TransectMask.DrawTransectsMask(
+            Polygon, transect_length, max_transects, TargetSamplingProportion,
+            CellSize, rng, BatchSize or TransectMask.BATCH_SIZE, Trace=Trace)
+    if Sampler == "freespace":
+        import TransectRaster
+        return TransectRaster.DrawTransectsFreeSpace(
+            Polygon, transect_length, max_transects, TargetSamplingProportion,
+            rng, BatchSize or TransectRaster.BATCH_SIZE, Trace=Trace)
+    if BatchSize > 0:
+        return DrawTransectsBatched(Polygon, transect_length, max_transects,
+                                    TargetSamplingProportion, rng, BatchSize,
+                                    Trace=Trace, Prefetch=Prefetch)
+    if Trace is not None:
+        Started = time.perf_counter()
+
+    # --------------------- Sampling Zone Parameters ------------------------ #
+
+    TotalArea = Polygon["Area"]
+
+    # ----------------------Initialize 'while' loops ------------------------ #
+
+    UnsampledArea = TotalArea
+    UnsampledProportion = 1.0
+    MaxUnsampledProportion = 1.0 - TargetSamplingProportion
+
+    Transects = np.empty((max(0, max_transects), 5))
+    Grid = TransectGrid(Polygon, transect_length, Transects)
+    n = 0
+    Accepted = 0
+    Exited = 0
+    if Trace is not None:
+        Started = TransectProfile.Lap(Trace, "Setup", Started)
+
+    while (UnsampledProportion>MaxUnsampledProportion) and (n<max_transects):
+
+        # Drop a random start point in the UnsampledZone
+        Start = RandomPointInZone(Polygon, Grid, rng, UnsampledArea > 0)
+        if Start is None:
+            if Trace is not None:
+                TransectProfile.Count(Trace, "NoStartPoint")
+            break
+        x0, y0 = Start
+
+        # Generate transect
+        bearing = float(rng.integers(1, 361))
+        x1, y1 = TransectEndpoints(x0, y0, bearing, transect_length)
+        if Trace is not None:
+            Started = TransectProfile.Lap(Trace, "Sampling", Started)
+
+        # Check that transect is completely contained in UnsampledZone
+        Inside = (SegmentsWithinPolygon(Polygon, x0, y0, x1, y1)[0] and
+                  ClearOfGrid(Grid, x0, y0, x1, y1)[0])
+        if Trace is not None:
+            Started = TransectProfile.Lap(Trace, "Containment", Started)
+
+        if Inside:
+            Transects[Accepted] = (x0, y0, x1, y1, bearing)
+            AddToGrid(Grid, Accepted)
+            Accepted += 1
+            if Trace is not None:
+                TransectProfile.Count(Trace, "Accepted")
+                Started = TransectProfile.Lap(Trace, "Buffer", Started)
+
+            # Subtract the part of the transect buffer that was still
+            # unsampled from the running total
+            UnsampledArea -= ErasedArea(Polygon, Grid, Accepted - 1)
+            UnsampledProportion = UnsampledArea / TotalArea
+            n += 1
+            if Trace is not None:
+                Started = TransectProfile.Lap(Trace, "Erase", Started)
+
+        else:
+            Exited += 1
+            if Trace is not None:
+                TransectProfile.Count(Trace, "Exited")
+
+            # If UnsampledArea is too small, escape the 'while' loop
+            if UnsampledArea < (2.0*transect_length):
+                if Trace is not None:
+                    TransectProfile.Count(Trace, "TooSmall")
+                break
+            # Otherwise, try to draw the next transect.
+            else:
+                n += 1
+
+    Stats = {"Candidates": Accepted + Exited,
+             "Accepted": Accepted,
+             "Exited": Exited,
+             "TotalArea": TotalArea,
+             "UnsampledArea": UnsampledArea,
+             "UnsampledProportion": UnsampledProportion}
+
+    return Transects[:Accepted].copy(), Stats
+
+
+def DrawTransectsBatched(Polygon, transect_length, max_transects,
+                         TargetSamplingProportion, rng=None, BatchSize=4096,
+                         MaxEmptyBatches=10, Trace=None, Prefetch=0):
+    """
+    Draws up to max_transects transects within Polygon from batches of
+    candidates instead of one candidate at a time:
+
+    1. Draw BatchSize start points in Polygon and BatchSize whole-degree
+       bearings at once, and compute every endpoint in one step
+    2. Reject, in bulk, candidates that start in or cross a transect buffer
+       or leave Polygon
+    3. Accept the surviving candidates one at a time, skipping those that
+       conflict with transects accepted earlier in the same batch
+
+    Start points uniform in Polygon that survive step 2 are uniform in the
+    UnsampledZone, as in DrawTransects. Unlike DrawTransects, rejected
+    candidates do not count toward max_transects: the run stops at
+    max_transects accepted transects, at the TargetSamplingProportion, or
+    after MaxEmptyBatches batches in a row without a survivor.
+
+    Prefetch = when above 0, a producer thread draws the batches of step 1
+               (TransectPipeline.PrefetchBatches), up to Prefetch ahead of
+               the batch being tested; the transects drawn are the same
+
+    Returns Transects and Stats as DrawTransects does, and fills Trace as
+    DrawTransects does.
+
+    Dependencies:
+    import numpy as np
+    """
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    def NewBatch():
+        x0, y0 = RandomPointsInPolygon(Polygon, BatchSize, rng)
+        bearing = rng.integers(1, 361, BatchSize).astype(np.float64)
+        x1, y1 = TransectEndpoints(x0, y0, bearing, transect_length)
+        return x0, y0, x1, y1, bearing
+
+    if Prefetch > 0:
+        import TransectPipeline
+        Batches = TransectPipeline.PrefetchBatches(NewBatch, Prefetch)
+        NextBatch = lambda: next(Batches)
+    else:
+        Batches = None
+        NextBatch = NewBatch
+    if Trace is not None:
+        Started = time.perf_counter()
+
+    TotalArea = Polygon["Area"]
+
+    UnsampledArea = TotalArea
+    UnsampledProportion = 1.0
+    MaxUnsampledProportion = 1.0 - TargetSamplingProportion
+
+    Transects = np.empty((max(0, max_transects), 5))
+    Grid = TransectGrid(Polygon, transect_length, Transects)
+    Accepted = 0
+    Candidates = 0
+    EmptyBatches = 0
+    if Trace is not None:
+        Started = TransectProfile.Lap(Trace, "Setup", Started)
+
+    while ((UnsampledProportion > MaxUnsampledProportion) and
+           (Accepted < max_transects) and (EmptyBatches < MaxEmptyBatches) and
+           UnsampledArea > 0):
+
+        # Generate a batch of candidate transects (or take the next one the
+        # producer drew)
+        x0, y0, x1, y1, bearing = NextBatch()
+        Candidates += BatchSize
+        if Trace is not None:
+            Started = TransectProfile.Lap(Trace, "Sampling", Started)
+
+        # Reject candidates outside the UnsampledZone in bulk
+        Keep = ClearOfGrid(Grid, x0, y0, x0, y0)
+        Index = np.flatnonzero(Keep)
+        Keep[Index] = SegmentsWithinPolygon(Polygon, x0[Index], y0[Index],
+                                            x1[Index], y1[Index])
+        Index = np.flatnonzero(Keep)
+        Keep[Index] = ClearOfGrid(Grid, x0[Index], y0[Index], x1[Index],
+                                  y1[Index])
+        Survivors = np.flatnonzero(Keep)
+        if Trace is not None:
+            TransectProfile.Count(Trace, "Exited",
+                                  BatchSize - len(Survivors))
+            Started = TransectProfile.Lap(Trace, "Containment", Started)
+
+        if len(Survivors) == 0:
+            EmptyBatches += 1
+            continue
+        EmptyBatches = 0
+
+        # Accept survivors one at a time
+        BatchStart = Accepted
+        Tested = 0
+        for i in Survivors:
+            Tested += 1
+            if (Accepted > BatchStart and
+                    not ClearOfGrid(Grid, x0[i], y0[i], x1[i], y1[i])[0]):
+                if Trace is not None:
+                    TransectProfile.Count(Trace, "Conflict")
+                continue
+
+            Transects[Accepted] = (x0[i], y0[i], x1[i], y1[i], bearing[i])
+            AddToGrid(Grid, Accepted)
+            Accepted += 1
+            if Trace is not None:
+                TransectProfile.Count(Trace, "Accepted")
+                Started = TransectProfile.Lap(Trace, "Buffer", Started)
+
+            UnsampledArea -= ErasedArea(Polygon, Grid, Accepted - 1)
+            UnsampledProportion = UnsampledArea / TotalArea
+            if Trace is not None:
+                Started = TransectProfile.Lap(Trace, "Erase", Started)
+
+            if ((UnsampledProportion <= MaxUnsampledProportion) or
+                    (Accepted == max_transects)):
+                break
+
+        if Trace is not None:
+            TransectProfile.Count(Trace, "Unused", len(Survivors) - Tested)
+
+    if Batches is not None:
+        Batches.close()
+    if Trace is not None and EmptyBatches == MaxEmptyBatches:
+        TransectProfile.Count(Trace, "TooSmall")
+
+    Stats = {"Candidates": Candidates,
+             "Accepted": Accepted,
+             "Exited": Candidates - Accepted,
+             "TotalArea": TotalArea,
+             "UnsampledArea": UnsampledArea,
+             "UnsampledProportion": UnsampledProportion}
+
+    return Transects[:Accepted].copy(), Stats
@@ -0,0 +1,798 @@
+# TransectIO.py
+# Created: 10/17/2026
+# Reads input polygons into coordinate arrays and writes transect arrays
+# to an output line feature class for the in-memory geometry engine
+# (TransectGeometry.py). The geodatabase is touched once on each side.
+#
+# Output transects go through a sink opened once per run (OpenTransects,
+# AppendTransects, CloseTransects): one insert cursor, or a streaming
+# shapefile writer that patches the headers when it is closed, so the
+# geodatabase engine can append transects as they are accepted.
+#
+# When arcpy is not available (no ArcGIS license, e.g. Linux batch nodes),
+# polygons are read from and transects written to shapefiles with NumPy,
+# and the few geoprocessing calls the toolbox scripts make on their outputs
+# (GetCount, CopyFeatures, Delete, Rename) are done on the shapefile's files.
+#
+# Importing arcpy takes seconds, so it is imported by the first function
+# that needs it (GetArcpy) instead of with this module, and UseArcpy(False)
+# runs on shapefiles without importing it at all (TransectCLI.py).
+# -----------------------------------------------------------------------------
+
+# Imports
+import datetime
+import os
+import shutil
+import sys
+
+import numpy as np
+
+# arcpy, once GetArcpy has imported it (None when it is not available)
+_Arcpy = {}
+
+# Tool parameters set by UseParameters, in toolbox order
+_Parameters = {}
+
+# Files that make up a shapefile
+SHAPEFILE_EXTENSIONS = [".shp", ".shx", ".dbf", ".prj", ".cpg"]
+
+# Shape types stored as parts and points (polyline and polygon, plain/Z/M)
+PART_SHAPE_TYPES = [3, 5, 13, 15, 23, 25]
+
+# Record of a two-point line in a polyline .shp file
+POLYLINE_RECORD = np.dtype([("Number", ">i4"), ("Length", ">i4"),
+                            ("ShapeType", "<i4"), ("Box", "<f8", 4),
+                            ("NumParts", "<i4"), ("NumPoints", "<i4"),
+                            ("Parts", "<i4"), ("Points", "<f8", 4)])
+
+# Fields of every output transect: those BearingDistanceToLine gives each
+# transect, its position in the output and its trial
+TRANSECT_FIELDS = [("x", "DOUBLE", 0), ("y", "DOUBLE", 0),
+                   ("distance", "FLOAT", 0), ("bearing", "FLOAT", 0),
+                   ("TransectID", "LONG", 0), ("Trial", "LONG", 0)]
+
+
+# ------------------------------ Toolbox glue ------------------------------- #
+
+def GetArcpy():
+    """
+    Returns the arcpy module, imported on the first call (which takes
+    seconds), or None when arcpy is not available or UseArcpy(False) was
+    called.
+    """
+
+    if "Module" not in _Arcpy:
+        try:
+            import arcpy
+        except ImportError:
+            arcpy = None
+        _Arcpy["Module"] = arcpy
+    return _Arcpy["Module"]
+
+
+def UseArcpy(Use=True):
+    """
+    Use = False runs without arcpy (shapefiles only), even where it is
+          installed; True imports it again on the next GetArcpy call.
+    """
+
+    if Use:
+        _Arcpy.pop("Module", None)
+    else:
+        _Arcpy["Module"] = None
+
+
+def AddMessage(Message):
+    """Sends Message to the geoprocessing window, or stdout without arcpy."""
+
+    arcpy = GetArcpy()
+    if arcpy is not None:
+        arcpy.AddMessage(Message)
+    else:
+        print(Message)
+
+
+def UseParameters(Values):
+    """
+    Makes GetParameterAsText return Values, the parameters of a tool in
+    toolbox order (None for a parameter left empty), as a Python toolbox
+    passes them to execute instead of through arcpy.
+    """
+
+    _Parameters["Values"] = ["" if Value is None else str(Value)
+                             for Value in Values]
+
+
+def GetParameterAsText(Index):
+    """
+    Returns tool parameter Index as text: from UseParameters, from arcpy,
+    or without arcpy from the command-line arguments in toolbox order.
+    Parameters the tool does not have (e.g. an older toolbox) are "".
+    """
+
+    if "Values" in _Parameters:
+        Values = _Parameters["Values"]
+    else:
+        arcpy = GetArcpy()
+        if arcpy is not None:
+            if Index < arcpy.GetArgumentCount():
+                return arcpy.GetParameterAsText(Index)
+            return ""
+        Values = sys.argv[1:]
+    if Index < len(Values):
+        return Values[Index]
+    return ""
+
+
+def GetCount(Dataset):
+    """Returns the number of features in Dataset."""
+
+    arcpy = GetArcpy()
+    if arcpy is not None:
+        return int( arcpy.GetCount_management(Dataset).getOutput(0) )
+    return (os.path.getsize(_ShapefileBase(Dataset) + ".shx") - 100) // 8
+
+
+def CopyFeatures(Dataset, OutputDataset):
+    """Copies Dataset to OutputDataset."""
+
+    arcpy = GetArcpy()
+    if arcpy is not None:
+        arcpy.CopyFeatures_management(Dataset, OutputDataset)
+        return
+    Source = _ShapefileBase(Dataset)
+    Target = _ShapefileBase(OutputDataset)
+    for Extension in SHAPEFILE_EXTENSIONS:
+        if os.path.exists(Source + Extension):
+            shutil.copyfile(Source + Extension, Target + Extension)
+
+
+def Delete(Dataset):
+    """Deletes Dataset."""
+
+    arcpy = GetArcpy()
+    if arcpy is not None:
+        arcpy.Delete_management(Dataset)
+        return
+    Base = _ShapefileBase(Dataset)
+    for Extension in SHAPEFILE_EXTENSIONS:
+        if os.path.exists(Base + Extension):
+            os.remove(Base + Extension)
+
+
+def Rename(Dataset, OutputDataset):
+    """
+    Renames Dataset to OutputDataset, replacing it. Cheaper than
+    CopyFeatures followed by Delete.
+    """
+
+    arcpy = GetArcpy()
+    if arcpy is not None:
+        if arcpy.Exists(OutputDataset):
+            arcpy.Delete_management(OutputDataset)
+        arcpy.Rename_management(Dataset, OutputDataset)
+        return
+    Delete(OutputDataset)
+    Source = _ShapefileBase(Dataset)
+    Target = _ShapefileBase(OutputDataset)
+    for Extension in SHAPEFILE_EXTENSIONS:
+        if os.path.exists(Source + Extension):
+            os.replace(Source + Extension, Target + Extension)
+
+
+def _ShapefileBase(Dataset):
+    """
+    Returns the path of a shapefile without its extension. Datasets named
+    without an extension (e.g. os.path.join(WorkspaceGDB, "BestTrial")) are
+    shapefiles in the WorkspaceGDB folder.
+    """
+
+    Base, Extension = os.path.splitext(Dataset)
+    if Extension.lower() in SHAPEFILE_EXTENSIONS:
+        return Base
+    return Dataset
+
+
+# ----------------------------- Feature classes ----------------------------- #
+
+def ReadPolygon(InputPolygon):
+    """
+    Reads the rings of the single polygon in InputPolygon.
+
+    InputPolygon = polygon feature class or layer with a single polygon
+                   (a polygon shapefile when arcpy is not available)
+
+    Returns Rings, a list of (k, 2) coordinate arrays (exterior and interior
+    rings of every part), and the SpatialReference of InputPolygon (the
+    well-known text of its .prj file without arcpy). Null shapes are
+    skipped; raises ValueError when InputPolygon has no other shape.
+
+    Dependencies:
+    import arcpy (optional)
+    """
+
+    arcpy = GetArcpy()
+    if arcpy is None:
+        Shapes, Attributes, WKT = ReadShapefile(InputPolygon)
+        Shapes = [Rings for Rings in Shapes if Rings]
+        SpatialReference = WKT
+    else:
+        with arcpy.da.SearchCursor(InputPolygon, ["SHAPE@"]) as cursor:
+            Shapes = [ row[0] for row in cursor if row[0] is not None ]
+        if Shapes:
+            SpatialReference = Shapes[0].spatialReference
+            Shapes = [_ShapeRings(Shapes[0])]
+
+    if not Shapes:
+        raise ValueError("{} has no polygon that is not null"
+                         .format(InputPolygon))
+    return Shapes[0], SpatialReference
+
+
+def ReadPolygons(InputPolygons, IDField=""):
+    """
+    Reads every polygon in InputPolygons in one pass.
+
+    InputPolygons = polygon feature class or layer
+                    (a polygon shapefile when arcpy is not available)
+    IDField = field that identifies each polygon (the ObjectID, or the
+              record number without arcpy, if "")
+
+    Returns IDs, a list of the IDField value of each polygon, Shapes, a list
+    of the Rings of each polygon (as ReadPolygon returns them), and the
+    SpatialReference of InputPolygons. Null shapes are skipped.
+
+    Dependencies:
+    import arcpy (optional)
+    import numpy as np
+    """
+
+    arcpy = GetArcpy()
+    if arcpy is None:
+        Shapes, Attributes, WKT = ReadShapefile(InputPolygons)
+        IDs = (Attributes[IDField] if IDField
+               else np.arange(len(Shapes)))
+        Keep = [i for i, Rings in enumerate(Shapes) if Rings]
+        return [IDs[i].item() for i in Keep], [Shapes[i] for i in Keep], WKT
+
+    IDs, Shapes = [], []
+    SpatialReference = arcpy.Describe(InputPolygons).spatialReference
+    with arcpy.da.SearchCursor(InputPolygons,
+                               [IDField or "OID@", "SHAPE@"]) as cursor:
+        for row in cursor:
+            if row[1] is not None:
+                IDs.append(row[0])
+                Shapes.append(_ShapeRings(row[1]))
+
+    return IDs, Shapes, SpatialReference
+
+
+def ReadTransects(InputTransects):
+    """
+    Reads the transects of a line feature class, such as OutputTransects.
+
+    InputTransects = line feature class or layer
+                     (a polyline shapefile when arcpy is not available)
+
+    Returns Transects, an (n, 5) array of x0, y0, x1, y1 from the first and
+    last point of each line and its bearing in degrees clockwise from north
+    (in (0, 360], as TransectGeometry.TransectEndpoints takes it). Null
+    shapes are skipped.
+
+    Dependencies:
+    import arcpy (optional)
+    import numpy as np
+    """
+
+    arcpy = GetArcpy()
+    if arcpy is None:
+        Shapes, Attributes, WKT = ReadShapefile(InputTransects)
+        Ends = [np.concatenate([Parts[0][0], Parts[-1][-1]])
+                for Parts in Shapes if Parts]
+    else:
+        with arcpy.da.SearchCursor(InputTransects, ["SHAPE@"]) as cursor:
+            Ends = [[row[0].firstPoint.X, row[0].firstPoint.Y,
+                     row[0].lastPoint.X, row[0].lastPoint.Y]
+                    for row in cursor if row[0] is not None]
+
+    Ends = np.array(Ends, dtype=np.float64).reshape(-1, 4)
+    bearing = np.degrees(np.arctan2(Ends[:, 2] - Ends[:, 0],
+                                    Ends[:, 3] - Ends[:, 1])) % 360.0
+    bearing[bearing == 0.0] = 360.0
+    return np.column_stack([Ends, bearing])
+
+
+def _ShapeRings(Shape):
+    """
+    Returns the rings of an arcpy Polygon as a list of (k, 2) arrays.
+
+    Dependencies:
+    import numpy as np
+    """
+
+    # Interior rings follow their exterior ring after a None point
+    Rings = []
+    for Part in Shape:
+        Ring = []
+        for Pnt in Part:
+            if Pnt is None:
+                Rings.append(Ring)
+                Ring = []
+            else:
+                Ring.append((Pnt.X, Pnt.Y))
+        Rings.append(Ring)
+
+    return [np.array(Ring, dtype=np.float64) for Ring in Rings if Ring]
+
+
+def WriteTransects(OutputTransects, Transects, transect_length,
+                   SpatialReference, Fields=(), Trial=0):
+    """
+    Writes Transects to OutputTransects in one pass of OpenTransects,
+    AppendTransects and CloseTransects.
+
+    OutputTransects = output line feature class
+                      (a polyline shapefile when arcpy is not available)
+    Transects = (n, 5) array of x0, y0, x1, y1, bearing
+    transect_length = length of the transects, stored in distance
+    SpatialReference = spatial reference of the output, as returned by
+                       ReadPolygon
+    Fields = more (name, array of n values) fields to write after Trial;
+             integer arrays become LONG fields, other numbers DOUBLE and
+             anything else TEXT
+    Trial = trial number stored in the Trial field
+
+    Dependencies:
+    import numpy as np
+    """
+
+    Fields = [(Name, np.asarray(Values)) for Name, Values in Fields]
+    Sink = OpenTransects(OutputTransects, transect_length, SpatialReference,
+                         [_FieldType(Name, Values) for Name, Values in Fields])
+    AppendTransects(Sink, Transects, Trial,
+                    [Values for Name, Values in Fields])
+    CloseTransects(Sink)
+
+    return OutputTransects
+
+
+def _FieldType(Name, Values):
+    """Returns the (name, type, length) field that holds Values."""
+
+    if Values.dtype.kind in "iub":
+        return (Name, "LONG", 0)
+    if Values.dtype.kind == "f":
+        return (Name, "DOUBLE", 0)
+    Length = max([1] + [len(str(Value).encode("latin-1"))
+                        for Value in Values.ravel()])
+    return (Name, "TEXT", Length)
+
+
+# ----------------------------- Transect sinks ------------------------------ #
+
+def OpenTransects(OutputTransects, transect_length, SpatialReference,
+                  Fields=()):
+    """
+    Creates OutputTransects and opens one insert cursor (one streaming
+    shapefile writer without arcpy) on it, so that transects can be
+    appended as they are accepted instead of written to a feature class
+    each and merged.
+
+    Each transect gets the fields that BearingDistanceToLine gives it (x, y,
+    distance, bearing: start point, length and bearing), TransectID (its
+    position in OutputTransects) and Trial, then Fields.
+
+    Fields = more (name, type, length) fields; type is "LONG", "DOUBLE" or
+             "TEXT" (length characters)
+
+    Returns the open sink, a dictionary; append with AppendTransects and
+    close with CloseTransects.
+
+    Dependencies:
+    import arcpy (optional)
+    import os
+    """
+
+    arcpy = GetArcpy()
+    Fields = TRANSECT_FIELDS + [tuple(Field) for Field in Fields]
+    Sink = {"OutputTransects": OutputTransects,
+            "transect_length": float(transect_length),
+            "SpatialReference": SpatialReference, "Count": 0}
+
+    if arcpy is None:
+        Sink["Writer"] = OpenPolylineShapefile(OutputTransects, Fields,
+                                               SpatialReference)
+        return Sink
+
+    arcpy.CreateFeatureclass_management(os.path.dirname(OutputTransects),
+                                        os.path.basename(OutputTransects),
+                                        "POLYLINE",
+                                        spatial_reference=SpatialReference)
+    for Name, FieldType, Length in Fields:
+        if FieldType == "TEXT":
+            arcpy.AddField_management(OutputTransects, Name, FieldType,
+                                      field_length=Length)
+        else:
+            arcpy.AddField_management(OutputTransects, Name, FieldType)
+    Sink["Cursor"] = arcpy.da.InsertCursor(
+        OutputTransects, ["SHAPE@"] + [Name for Name, FieldType, Length
+                                       in Fields])
+    return Sink
+
+
+def AppendTransects(Sink, Transects, Trial=0, Values=()):
+    """
+    Appends Transects, an (n, 5) array of x0, y0, x1, y1, bearing, to an
+    open sink. Trial and each of Values (one per extra field of the sink)
+    are a single value or an array of n values.
+
+    Dependencies:
+    import arcpy (optional)
+    import numpy as np
+    """
+
+    arcpy = GetArcpy()
+    Transects = np.asarray(Transects, dtype=np.float64).reshape(-1, 5)
+    n = len(Transects)
+    Columns = ([Transects[:, 0], Transects[:, 1],
+                np.full(n, Sink["transect_length"]), Transects[:, 4],
+                Sink["Count"] + np.arange(n),
+                np.broadcast_to(np.asarray(Trial, dtype=np.int64), (n,))] +
+               [np.broadcast_to(np.asarray(Value), (n,)) for Value in Values])
+
+    if arcpy is None:
+        AppendPolylines(Sink["Writer"], Transects[:, :4], Columns)
+    else:
+        SpatialReference = Sink["SpatialReference"]
+        for Row in zip(Transects.tolist(),
+                       *[Column.tolist() for Column in Columns]):
+            x0, y0, x1, y1, bearing = Row[0]
+            Line = arcpy.Polyline(arcpy.Array([arcpy.Point(x0, y0),
+                                               arcpy.Point(x1, y1)]),
+                                  SpatialReference)
+            Sink["Cursor"].insertRow([Line] + list(Row[1:]))
+
+    Sink["Count"] += n
+
+
+def CloseTransects(Sink):
+    """
+    Closes a sink opened with OpenTransects and returns the number of
+    transects in it.
+    """
+
+    if "Writer" in Sink:
+        ClosePolylineShapefile(Sink.pop("Writer"))
+    if "Cursor" in Sink:
+        del Sink["Cursor"]
+    return Sink["Count"]
+
+
+# ------------------------------- Shapefiles -------------------------------- #
+
+def _Gather(Buffer, Offsets, DataType):
+    """
+    Returns the values of DataType stored at each byte offset of Buffer,
+    read in one vectorized step.
+    """
+
+    DataType = np.dtype(DataType)
+    Offsets = np.asarray(Offsets, dtype=np.int64)
+    Bytes = Buffer[Offsets[:, None] + np.arange(DataType.itemsize)]
+    return np.ascontiguousarray(Bytes).view(DataType).ravel()
+
+
+def _RaggedOffsets(Starts, Counts, Step):
+    """
+    Returns the byte offsets of Counts[i] items of Step bytes starting at
+    Starts[i], for every i, as one flat array.
+    """
+
+    Counts = np.asarray(Counts, dtype=np.int64)
+    First = np.repeat(np.cumsum(Counts) - Counts, Counts)
+    return (np.repeat(np.asarray(Starts, dtype=np.int64), Counts) +
+            Step * (np.arange(Counts.sum()) - First))
+
+
+def ReadShapefile(Shapefile):
+    """
+    Reads every polygon or polyline in Shapefile (.shp, .shx, .dbf, .prj).
+
+    The record offsets come from the .shx file, and the record headers, part
+    indices and coordinates of all records are each read with a single
+    vectorized gather, so the file is not walked record by record.
+
+    Returns Shapes, a list with one list of (k, 2) ring (or path) coordinate
+    arrays per record (empty for null shapes), Attributes, a dictionary of
+    .dbf field name to array (see ReadDBF), and the well-known text of the
+    .prj file ("" when there is none).
+
+    Dependencies:
+    import numpy as np
+    import os
+    """
+
+    Base = _ShapefileBase(Shapefile)
+    Shp = np.fromfile(Base + ".shp", dtype=np.uint8)
+    Shx = np.fromfile(Base + ".shx", dtype=np.uint8)
+
+    # .shx records: offset and content length in 16-bit words, big-endian
+    Index = np.frombuffer(Shx[100:].tobytes(), dtype=">i4").reshape(-1, 2)
+    Content = Index[:, 0].astype(np.int64) * 2 + 8
+
+    ShapeType = _Gather(Shp, Content, "<i4")
+    Valid = np.isin(ShapeType, PART_SHAPE_TYPES)
+    if np.any((ShapeType != 0) & ~Valid):
+        raise ValueError("{} does not hold polygons or polylines"
+                         .format(Shapefile))
+
+    Starts = Content[Valid]
+    NumParts = _Gather(Shp, Starts + 36, "<i4").astype(np.int64)
+    NumPoints = _Gather(Shp, Starts + 40, "<i4").astype(np.int64)
+
+    Parts = _Gather(Shp, _RaggedOffsets(Starts + 44, NumParts, 4), "<i4")
+    Points = _Gather(Shp, _RaggedOffsets(Starts + 44 + 4 * NumParts,
+                                         2 * NumPoints, 8),
+                     "<f8").reshape(-1, 2)
+
+    # Part indices are relative to their record; make them absolute
+    PointOffsets = np.cumsum(NumPoints) - NumPoints
+    PartStarts = Parts + np.repeat(PointOffsets, NumParts)
+    PartEnds = np.append(PartStarts[1:], len(Points))
+    PartEnds[np.cumsum(NumParts) - 1] = PointOffsets + NumPoints
+
+    Rings = [Points[Start:End] for Start, End in zip(PartStarts, PartEnds)]
+    RecordParts = np.split(np.arange(len(Rings)), np.cumsum(NumParts)[:-1])
+    Shapes = [[] for Record in range(len(Content))]
+    for Record, RingIndex in zip(np.flatnonzero(Valid), RecordParts):
+        Shapes[Record] = [Rings[i] for i in RingIndex]
+
+    Attributes = ReadDBF(Base + ".dbf") if os.path.exists(Base + ".dbf") \
+        else {}
+
+    WKT = ""
+    if os.path.exists(Base + ".prj"):
+        with open(Base + ".prj") as f:
+            WKT = f.read().strip()
+
+    return Shapes, Attributes, WKT
+
+
+def ReadDBF(DBF):
+    """
+    Reads the attribute table of a .dbf file with one structured NumPy read.
+
+    Returns a dictionary of field name to array: float arrays for numeric
+    fields (NaN where blank) and string arrays for all other fields.
+    """
+
+    with open(DBF, "rb") as f:
+        Data = f.read()
+
+    NumRecords = int(np.frombuffer(Data[4:8], dtype="<u4")[0])
+    HeaderLength, RecordLength = np.frombuffer(Data[8:12], dtype="<u2")
+
+    Fields = []
+    Offset = 32
+    while Data[Offset:Offset + 1] != b"\r":
+        Name = Data[Offset:Offset + 11].split(b"\x00")[0].decode("ascii")
+        Type = Data[Offset + 11:Offset + 12].decode("ascii")
+        Fields.append((Name, Type, Data[Offset + 16]))
+        Offset += 32
+
+    Record = np.dtype([("Deleted", "S1")] +
+                      [(Name, "S{}".format(Length))
+                       for Name, Type, Length in Fields])
+    Table = np.frombuffer(Data, dtype=Record, count=NumRecords,
+                          offset=int(HeaderLength))
+    if Record.itemsize != RecordLength:
+        raise ValueError("{} has an unexpected record length".format(DBF))
+
+    Attributes = {}
+    for Name, Type, Length in Fields:
+        Values = np.char.strip(Table[Name])
+        if Type in "NF":
+            Blank = Values == b""
+            Values = np.where(Blank, b"nan", Values).astype(np.float64)
+        else:
+            Values = np.char.decode(Values, "latin-1")
+        Attributes[Name] = Values
+
+    return Attributes
+
+
+def OpenPolylineShapefile(Shapefile, Fields, WKT=""):
+    """
+    Creates a polyline shapefile and opens its .shp, .shx and .dbf files
+    for streaming: records are appended with AppendPolylines, and
+    ClosePolylineShapefile patches the file lengths, bounding box and
+    record count into the headers.
+
+    Shapefile = output path (".shp" is added when missing)
+    Fields = list of (name, type, length) fields; type is "LONG", "DOUBLE"
+             (or "FLOAT") or "TEXT" (length characters)
+    WKT = well-known text of the spatial reference
+
+    Returns the open writer, a dictionary.
+    """
+
+    Base = _ShapefileBase(Shapefile)
+    Columns = []
+    for Name, FieldType, Length in Fields:
+        if FieldType == "LONG":
+            Columns.append((Name[:10], "N", 10, 0))
+        elif FieldType in ("DOUBLE", "FLOAT"):
+            Columns.append((Name[:10], "N", 19, 6))
+        else:
+            Columns.append((Name[:10], "C", max(1, int(Length or 254)), 0))
+
+    Writer = {"Base": Base, "Columns": Columns, "Count": 0,
+              "BBox": [np.inf, np.inf, -np.inf, -np.inf],
+              "Shp": open(Base + ".shp", "wb"),
+              "Shx": open(Base + ".shx", "wb"),
+              "Dbf": open(Base + ".dbf", "wb")}
+
+    # Headers are written now with no records and patched on close
+    Writer["Shp"].write(_ShapefileHeader(100, 3, [0.0] * 4))
+    Writer["Shx"].write(_ShapefileHeader(100, 3, [0.0] * 4))
+    Writer["Dbf"].write(_DBFHeader(Columns, 0))
+
+    if WKT:
+        with open(Base + ".prj", "w") as f:
+            f.write(WKT)
+
+    return Writer
+
+
+def AppendPolylines(Writer, Lines, Values):
+    """
+    Appends two-point lines, an (n, 4) array of x0, y0, x1, y1, and their
+    attributes (one array of n values per field) to an open writer. All
+    records are packed in NumPy structured arrays and written in one call
+    per file.
+
+    Dependencies:
+    import numpy as np
+    """
+
+    Lines = np.asarray(Lines, dtype=np.float64).reshape(-1, 4)
+    n = len(Lines)
+    if n == 0:
+        return
+    First = Writer["Count"]
+
+    # Main file records: 8-byte big-endian header and 80 bytes of content
+    Records = np.zeros(n, dtype=POLYLINE_RECORD)
+    Records["Number"] = First + np.arange(1, n + 1)
+    Records["Length"] = (POLYLINE_RECORD.itemsize - 8) // 2
+    Records["ShapeType"] = 3
+    Records["Box"] = np.column_stack(
+        [np.minimum(Lines[:, 0], Lines[:, 2]),
+         np.minimum(Lines[:, 1], Lines[:, 3]),
+         np.maximum(Lines[:, 0], Lines[:, 2]),
+         np.maximum(Lines[:, 1], Lines[:, 3])])
+    Records["NumParts"] = 1
+    Records["NumPoints"] = 2
+    Records["Points"] = Lines
+
+    Index = np.zeros(n, dtype=[("Offset", ">i4"), ("Length", ">i4")])
+    Index["Offset"] = (100 + POLYLINE_RECORD.itemsize *
+                       (First + np.arange(n))) // 2
+    Index["Length"] = Records["Length"]
+
+    BBox = Writer["BBox"]
+    Writer["BBox"] = [min(BBox[0], Records["Box"][:, 0].min()),
+                      min(BBox[1], Records["Box"][:, 1].min()),
+                      max(BBox[2], Records["Box"][:, 2].max()),
+                      max(BBox[3], Records["Box"][:, 3].max())]
+
+    Writer["Shp"].write(Records.tobytes())
+    Writer["Shx"].write(Index.tobytes())
+    Writer["Dbf"].write(_DBFRecords(Writer["Columns"], Values, n).tobytes())
+    Writer["Count"] += n
+
+
+def ClosePolylineShapefile(Writer):
+    """
+    Patches the headers of an open writer with its final lengths, bounding
+    box and record count, closes its files, and returns the .shp path.
+    """
+
+    n = Writer["Count"]
+    BBox = Writer["BBox"] if n else [0.0] * 4
+
+    for Name, Length in (("Shp", 100 + POLYLINE_RECORD.itemsize * n),
+                         ("Shx", 100 + 8 * n)):
+        f = Writer[Name]
+        f.seek(0)
+        f.write(_ShapefileHeader(Length, 3, BBox))
+        f.close()
+
+    f = Writer["Dbf"]
+    f.write(b"\x1a")
+    f.seek(0)
+    f.write(_DBFHeader(Writer["Columns"], n))
+    f.close()
+
+    return Writer["Base"] + ".shp"
+
+
+def _ShapefileHeader(FileLength, ShapeType, BBox):
+    """Returns the 100-byte header of a .shp or .shx file."""
+
+    Header = np.zeros(1, dtype=[("FileCode", ">i4"), ("Unused", ">i4", 5),
+                                ("FileLength", ">i4"), ("Version", "<i4"),
+                                ("ShapeType", "<i4"), ("BBox", "<f8", 4),
+                                ("ZM", "<f8", 4)])
+    Header["FileCode"] = 9994
+    Header["FileLength"] = FileLength // 2
+    Header["Version"] = 1000
+    Header["ShapeType"] = ShapeType
+    Header["BBox"] = BBox
+    return Header.tobytes()
+
+
+def _DBFHeader(Columns, NumRecords):
+    """
+    Returns the header and field descriptors of a .dbf file with Columns,
+    a list of (name, type, length, decimals), and NumRecords records.
+
+    Dependencies:
+    import datetime
+    import numpy as np
+    """
+
+    Header = np.zeros(1, dtype=[("Version", "u1"), ("Date", "u1", 3),
+                                ("NumRecords", "<u4"),
+                                ("HeaderLength", "<u2"),
+                                ("RecordLength", "<u2"),
+                                ("Reserved", "u1", 20)])
+    Header["Version"] = 3
+    Today = datetime.date.today()
+    Header["Date"] = (Today.year - 1900, Today.month, Today.day)
+    Header["NumRecords"] = NumRecords
+    Header["HeaderLength"] = 32 + 32 * len(Columns) + 1
+    Header["RecordLength"] = 1 + sum(Column[2] for Column in Columns)
+
+    Descriptors = np.zeros(len(Columns), dtype=[("Name", "S11"),
+                                                ("Type", "S1"),
+                                                ("Address", "<u4"),
+                                                ("Length", "u1"),
+                                                ("Decimals", "u1"),
+                                                ("Reserved", "u1", 14)])
+    for i, (Name, Type, Length, Decimals) in enumerate(Columns):
+        Descriptors[i] = (Name.encode("ascii"), Type.encode("ascii"), 0,
+                          Length, Decimals, 0)
+
+    return Header.tobytes() + Descriptors.tobytes() + b"\r"
+
+
+def _DBFRecords(Columns, Values, NumRecords):
+    """
+    Returns NumRecords .dbf records of Columns as a structured array,
+    formatting Values (one array per column) column by column.
+
+    Dependencies:
+    import numpy as np
+    """
+
+    Record = np.dtype([("Deleted", "S1")] +
+                      [(Name, "S{}".format(Length))
+                       for Name, Type, Length, Decimals in Columns])
+    Table = np.zeros(NumRecords, dtype=Record)
+    Table["Deleted"] = b" "
+    for (Name, Type, Length, Decimals), Column in zip(Columns, Values):
+        Column = np.asarray(Column)
+        if Type == "N" and Decimals == 0:
+            Text = np.char.mod("%{}d".format(Length),
+                               Column.astype(np.int64))
+        elif Type == "N":
+            Text = np.char.mod("%{0}.{1}f".format(Length, Decimals),
+                               Column.astype(np.float64))
+        else:
+            Text = np.char.ljust(np.char.encode(Column.astype(str),
+                                                "latin-1"), Length)
+        Table[Name] = (np.char.encode(Text, "ascii")
+                       if Text.dtype.kind == "U" else Text)
+
+    return Table
@@ -0,0 +1,373 @@
+# TransectMask.py
+# Created: 10/17/2026
+# Raster engine for coverage-driven runs (Engine="raster").
+#
+# Most candidates of a run are far from the polygon boundary and from the
+# accepted transects, and testing them exactly is more work than they
+# need. This engine rasterizes the polygon once into a mask of square cells
+# of CellSize, each of them CLEAR (inside the polygon and touching no edge),
+# BLOCKED (outside the polygon and touching no edge) or PARTIAL (touched by
+# an edge). Each accepted transect then makes the cells entirely within its
+# transect_length buffer BLOCKED and the CLEAR cells it may reach PARTIAL.
+#
+# The mask is conservative, so it decides a candidate only where the
+# answer is certain: a candidate with a point in a BLOCKED cell is
+# rejected, and a candidate whose cells and their neighbors are all CLEAR
+# is accepted, as it is within the polygon and farther than
+# transect_length from every transect. Only the candidates crossing
+# PARTIAL cells are tested exactly, as in
+# TransectGeometry.DrawTransectsBatched (within the polygon, then clear of
+# the accepted transects through a TransectGrid). Start points are drawn
+# uniformly within the cells that are not BLOCKED, which hold the whole
+# UnsampledZone, and the unsampled area is measured exactly
+# (TransectGeometry.ErasedArea), so neither the transects nor the
+# unsampled proportion depend on CellSize; CellSize only sets how many
+# candidates the mask decides.
+# -----------------------------------------------------------------------------
+
+# Imports
+import collections
+import time
+
+import numpy as np
+
+import TransectCache
+import TransectGeometry
+import TransectProfile
+
+# Default cells per transect_length, and the most cells in a mask
+CELLS_PER_TRANSECT = 10
+MAX_CELLS = 2**26
+
+# Candidates drawn and tested at a time
+BATCH_SIZE = 256
+
+# States of a cell: no point of a valid transect can be in it, some can,
+# or every point of it is inside the polygon and clear of the transects
+BLOCKED = 0
+PARTIAL = 1
+CLEAR = 2
+
+# Masks built by this process, by polygon hash and CellSize, the most
+# recently used last; only the last MASK_CACHE_SIZE are kept
+MASK_CACHE_SIZE = 4
+_Masks = collections.OrderedDict()
+
+
+# -------------------------------- Mask ------------------------------------- #
+
+def PolygonMask(Polygon, CellSize, MaxCells=MAX_CELLS):
+    """
+    Returns the mask of Polygon at CellSize before any transect is drawn.
+    Masks are built once per polygon and CellSize, and the last
+    MASK_CACHE_SIZE built are kept; Cells is shared, so copy it before
+    changing it.
+
+    Returns a dictionary with:
+    Origin = x, y of the lower left corner of cell (0, 0)
+    CellSize = width and height of a cell
+    Cells = (rows, columns) array of the state of each cell: CLEAR,
+            PARTIAL where an edge of Polygon touches it, BLOCKED otherwise
+
+    Dependencies:
+    import numpy as np
+    import TransectCache
+    import TransectGeometry
+    """
+
+    Key = (TransectCache.PolygonKey(Polygon), float(CellSize))
+    if Key in _Masks:
+        _Masks.move_to_end(Key)
+        return _Masks[Key]
+
+    xmin, ymin, xmax, ymax = Polygon["BBox"]
+    nx = max(1, int(np.ceil((xmax - xmin) / CellSize)))
+    ny = max(1, int(np.ceil((ymax - ymin) / CellSize)))
+    if nx * ny > MaxCells:
+        raise ValueError("CellSize {0} gives {1} cells; the most is {2}"
+                         .format(CellSize, nx * ny, MaxCells))
+
+    # A cell no edge touches is entirely inside or outside, like its center
+    cx = xmin + (np.arange(nx) + 0.5) * CellSize
+    cy = ymin + (np.arange(ny) + 0.5) * CellSize
+    X, Y = np.meshgrid(cx, cy)
+    Inside = TransectGeometry.PointsInPolygon(
+        Polygon, X.ravel(), Y.ravel()).reshape(ny, nx)
+    Cells = np.where(Inside, CLEAR, BLOCKED).astype(np.int8)
+
+    # Samples are half a cell apart along each edge, so every cell the edge
+    # touches is the cell of a sample or next to it
+    Edges = Polygon["Edges"]
+    Length = np.hypot(Edges[:, 2] - Edges[:, 0], Edges[:, 3] - Edges[:, 1])
+    Samples = np.ceil(Length / (CellSize / 2.0)).astype(np.int64) + 1
+    Edge = np.repeat(np.arange(len(Edges)), Samples)
+    t = ((np.arange(len(Edge)) - np.repeat(np.cumsum(Samples) - Samples,
+                                           Samples)) /
+         np.repeat(np.maximum(Samples - 1, 1), Samples))
+    bx = Edges[Edge, 0] + t * (Edges[Edge, 2] - Edges[Edge, 0])
+    by = Edges[Edge, 1] + t * (Edges[Edge, 3] - Edges[Edge, 1])
+    Row = np.floor((by - ymin) / CellSize).astype(np.int64)
+    Column = np.floor((bx - xmin) / CellSize).astype(np.int64)
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            Cells[np.clip(Row + dy, 0, ny - 1),
+                  np.clip(Column + dx, 0, nx - 1)] = PARTIAL
+
+    Mask = {"Origin": (xmin, ymin), "CellSize": float(CellSize),
+            "Cells": Cells}
+    _Masks[Key] = Mask
+    while len(_Masks) > MASK_CACHE_SIZE:
+        _Masks.popitem(last=False)
+    return Mask
+
+
+def SegmentStates(Mask, Cells, x0, y0, x1, y1):
+    """
+    Returns the state of each segment (x0, y0)-(x1, y1) in Cells, looked up
+    at points at most half a cell apart: BLOCKED when a point is in a
+    BLOCKED cell or outside the mask, CLEAR when the cell of every point
+    and its eight neighbors are CLEAR (the segment can only touch those),
+    PARTIAL otherwise.
+
+    Dependencies:
+    import numpy as np
+    """
+
+    x0, y0, x1, y1 = [np.atleast_1d(np.asarray(a, dtype=np.float64))
+                      for a in (x0, y0, x1, y1)]
+    if len(x0) == 0:
+        return np.zeros(0, dtype=np.int8)
+
+    CellSize = Mask["CellSize"]
+    Length = np.hypot(x1 - x0, y1 - y0).max()
+    t = np.linspace(0.0, 1.0, int(np.ceil(Length / (CellSize / 2.0))) + 1)
+    Row = np.floor((y0[:, None] + t * (y1 - y0)[:, None] - Mask["Origin"][1])
+                   / CellSize).astype(np.int64)
+    Column = np.floor((x0[:, None] + t * (x1 - x0)[:, None] -
+                       Mask["Origin"][0]) / CellSize).astype(np.int64)
+
+    ny, nx = Cells.shape
+
+    def Lookup(Row, Column):
+        Within = (Row >= 0) & (Row < ny) & (Column >= 0) & (Column < nx)
+        State = np.full(Row.shape, BLOCKED, dtype=np.int8)
+        State[Within] = Cells[Row[Within], Column[Within]]
+        return State
+
+    Blocked = (Lookup(Row, Column) == BLOCKED).any(axis=1)
+    Clear = ~Blocked
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            Index = np.flatnonzero(Clear)
+            Clear[Index] = (Lookup(Row[Index] + dy, Column[Index] + dx) ==
+                            CLEAR).all(axis=1)
+
+    State = np.full(len(x0), PARTIAL, dtype=np.int8)
+    State[Blocked] = BLOCKED
+    State[Clear] = CLEAR
+    return State
+
+
+def StampBuffer(Mask, Cells, x0, y0, x1, y1, transect_length):
+    """
+    Marks the cells entirely within transect_length of the transect
+    (x0, y0)-(x1, y1) BLOCKED and the CLEAR cells that may come within
+    transect_length of it PARTIAL, in place. Only the window of cells
+    around the buffer is tested.
+
+    Dependencies:
+    import numpy as np
+    import TransectGeometry
+    """
+
+    CellSize = Mask["CellSize"]
+    xmin, ymin = Mask["Origin"]
+    ny, nx = Cells.shape
+    c0 = max(0, int((min(x0, x1) - transect_length - xmin) // CellSize))
+    c1 = min(nx, int((max(x0, x1) + transect_length - xmin) // CellSize) + 1)
+    r0 = max(0, int((min(y0, y1) - transect_length - ymin) // CellSize))
+    r1 = min(ny, int((max(y0, y1) + transect_length - ymin) // CellSize) + 1)
+    if r0 >= r1 or c0 >= c1:
+        return
+
+    # The buffer is convex, so a cell is within it when its corners are; a
+    # cell is out of reach when its center is farther than transect_length
+    # plus half a diagonal
+    X, Y = np.meshgrid(xmin + np.arange(c0, c1 + 1) * CellSize,
+                       ymin + np.arange(r0, r1 + 1) * CellSize)
+    Corner = TransectGeometry.PointSegmentDistance(X, Y, x0, y0, x1,
+                                                   y1) <= transect_length
+    Within = (Corner[:-1, :-1] & Corner[:-1, 1:] & Corner[1:, :-1] &
+              Corner[1:, 1:])
+    X, Y = np.meshgrid(xmin + (np.arange(c0, c1) + 0.5) * CellSize,
+                       ymin + (np.arange(r0, r1) + 0.5) * CellSize)
+    Reach = TransectGeometry.PointSegmentDistance(X, Y, x0, y0, x1, y1) <= (
+        transect_length + CellSize * np.sqrt(0.5))
+
+    Window = Cells[r0:r1, c0:c1]
+    Window[Reach & (Window == CLEAR)] = PARTIAL
+    Window[Within] = BLOCKED
+
+
+def RandomPointsInFree(Mask, Cells, n, rng):
+    """
+    Draws n points uniformly within the cells of Cells that are not
+    BLOCKED.
+
+    Returns x, y arrays, or None when every cell is BLOCKED.
+
+    Dependencies:
+    import numpy as np
+    """
+
+    Free = np.flatnonzero(Cells != BLOCKED)
+    if len(Free) == 0:
+        return None
+
+    Row, Column = np.unravel_index(Free[rng.integers(0, len(Free), n)],
+                                   Cells.shape)
+    x = Mask["Origin"][0] + (Column + rng.random(n)) * Mask["CellSize"]
+    y = Mask["Origin"][1] + (Row + rng.random(n)) * Mask["CellSize"]
+    return x, y
+
+
+# ------------------------------ Transects ---------------------------------- #
+
+def DrawTransectsMask(Polygon, transect_length, max_transects,
+                      TargetSamplingProportion, CellSize, rng=None,
+                      BatchSize=BATCH_SIZE, MaxEmptyBatches=10, Trace=None):
+    """
+    Draws up to max_transects transects within Polygon like
+    TransectGeometry.DrawTransectsBatched, deciding candidates with a mask
+    of CellSize cells where it can and testing the rest exactly. Rejected
+    candidates do not count toward max_transects. The run also stops when
+    every cell is BLOCKED.
+
+    Returns Transects and Stats as TransectGeometry.DrawTransects does.
+    Fills Trace as DrawTransects does, with the stamping of buffers under
+    "Buffer", the exact unsampled area under "Erase", and the candidates
+    the mask left to the exact tests counted as "Exact".
+
+    Dependencies:
+    import numpy as np
+    import time
+    import TransectGeometry
+    import TransectProfile
+    """
+
+    if rng is None:
+        rng = np.random.default_rng()
+    if Trace is not None:
+        Started = time.perf_counter()
+
+    TotalArea = Polygon["Area"]
+    Mask = PolygonMask(Polygon, CellSize)
+    Cells = Mask["Cells"].copy()
+
+    UnsampledArea = TotalArea
+    UnsampledProportion = 1.0
+    MaxUnsampledProportion = 1.0 - TargetSamplingProportion
+
+    Transects = np.empty((max(0, max_transects), 5))
+    Grid = TransectGeometry.TransectGrid(Polygon, transect_length, Transects)
+    Accepted = 0
+    Candidates = 0
+    EmptyBatches = 0
+    if Trace is not None:
+        Started = TransectProfile.Lap(Trace, "Setup", Started)
+
+    while ((UnsampledProportion > MaxUnsampledProportion) and
+           (Accepted < max_transects) and (EmptyBatches < MaxEmptyBatches)):
+
+        # Generate a batch of candidates from the cells not BLOCKED
+        Start = RandomPointsInFree(Mask, Cells, BatchSize, rng)
+        if Start is None:
+            if Trace is not None:
+                TransectProfile.Count(Trace, "NoStartPoint")
+            break
+        x0, y0 = Start
+        bearing = rng.integers(1, 361, BatchSize).astype(np.float64)
+        x1, y1 = TransectGeometry.TransectEndpoints(x0, y0, bearing,
+                                                    transect_length)
+        Candidates += BatchSize
+        if Trace is not None:
+            Started = TransectProfile.Lap(Trace, "Sampling", Started)
+
+        # Look up the cells along every candidate at once, then test the
+        # candidates the mask cannot decide exactly against the polygon and
+        # accepted transects
+        State = SegmentStates(Mask, Cells, x0, y0, x1, y1)
+        Keep = State == CLEAR
+        Exact = np.flatnonzero(State == PARTIAL)
+        Inside = Exact[TransectGeometry.SegmentsWithinPolygon(
+            Polygon, x0[Exact], y0[Exact], x1[Exact], y1[Exact])]
+        Keep[Inside] = TransectGeometry.ClearOfGrid(
+            Grid, x0[Inside], y0[Inside], x1[Inside], y1[Inside])
+        Survivors = np.flatnonzero(Keep)
+        if Trace is not None:
+            TransectProfile.Count(Trace, "Exact", len(Exact))
+            TransectProfile.Count(Trace, "Exited",
+                                  BatchSize - len(Survivors))
+            Started = TransectProfile.Lap(Trace, "Containment", Started)
+
+        if len(Survivors) == 0:
+            EmptyBatches += 1
+            continue
+        EmptyBatches = 0
+
+        # Accept survivors one at a time
+        BatchStart = Accepted
+        Tested = 0
+        for i in Survivors:
+            Tested += 1
+            if (Accepted > BatchStart and not TransectGeometry.ClearOfGrid(
+                    Grid, x0[i], y0[i], x1[i], y1[i])[0]):
+                if Trace is not None:
+                    TransectProfile.Count(Trace, "Conflict")
+                continue
+
+            Transects[Accepted] = (x0[i], y0[i], x1[i], y1[i], bearing[i])
+            TransectGeometry.AddToGrid(Grid, Accepted)
+            Accepted += 1
+            StampBuffer(Mask, Cells, x0[i], y0[i], x1[i], y1[i],
+                        transect_length)
+            if Trace is not None:
+                TransectProfile.Count(Trace, "Accepted")
+                Started = TransectProfile.Lap(Trace, "Buffer", Started)
+
+            UnsampledArea -= TransectGeometry.ErasedArea(Polygon, Grid,
+                                                         Accepted - 1)
+            UnsampledProportion = UnsampledArea / TotalArea
+            if Trace is not None:
+                Started = TransectProfile.Lap(Trace, "Erase", Started)
+
+            if ((UnsampledProportion <= MaxUnsampledProportion) or
+                    (Accepted == max_transects)):
+                break
+
+        if Trace is not None:
+            TransectProfile.Count(Trace, "Unused", len(Survivors) - Tested)
+
+    if Trace is not None and EmptyBatches == MaxEmptyBatches:
+        TransectProfile.Count(Trace, "TooSmall")
+
+    Stats = {"Candidates": Candidates,
+             "Accepted": Accepted,
+             "Exited": Candidates - Accepted,
+             "TotalArea": TotalArea,
+             "UnsampledArea": UnsampledArea,
+             "UnsampledProportion": UnsampledProportion}
+
+    return Transects[:Accepted].copy(), Stats
+
+
+def EngineCellSize(Engine, transect_length, CellSize=0):
+    """
+    Returns the engine that runs Engine and the CellSize of its mask:
+    "memory" and CellSize (transect_length / CELLS_PER_TRANSECT if 0) for
+    Engine="raster", otherwise Engine and 0 (no mask).
+    """
+
+    if Engine != "raster":
+        return Engine, 0
+    return "memory", float(CellSize or transect_length / CELLS_PER_TRANSECT)
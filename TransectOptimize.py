@@ -0,0 +1,210 @@
+# TransectOptimize.py
+# Created: 10/17/2026
+# Improves a layout of transects in place instead of redrawing it, to reach
+# higher counts than restarting random sequential placement.
+#
+# Large-neighborhood search with simulated annealing. Each step:
+#
+# 1. Destroy: remove the transects whose midpoints are within Radius of a
+#    center (an accepted transect's midpoint, or a random point in the
+#    polygon).
+# 2. Repair: draw Candidates transects with midpoints in the same disk, plus
+#    the removed ones, keep those within the polygon and farther than
+#    transect_length from every transect outside the disk, and refill the
+#    disk with a greedy independent set of them: the candidate that
+#    conflicts with the fewest others first, so more fit than in the random
+#    order of sequential placement.
+# 3. Accept the new layout if it has as many transects or more, or with
+#    probability exp(change / Temperature) if it has fewer; Temperature
+#    falls linearly to 0 over the steps.
+#
+# Every layout the search accepts satisfies the same constraints as
+# DrawTransects (within the polygon, farther than transect_length from each
+# other), and the best one is kept. History records each step, so that the
+# convergence of runs can be compared.
+# -----------------------------------------------------------------------------
+
+# Imports
+import time
+
+import numpy as np
+
+import TransectGeometry
+
+# Candidates drawn in each neighborhood
+CANDIDATES = 256
+
+# Fields recorded for each step
+HISTORY_FIELDS = ["Count", "BestCount", "Temperature", "Removed", "Inserted",
+                  "Accepted", "Seconds"]
+
+
+def Midpoints(Transects):
+    """Returns the x, y arrays of the midpoints of Transects."""
+
+    return ((Transects[:, 0] + Transects[:, 2]) / 2.0,
+            (Transects[:, 1] + Transects[:, 3]) / 2.0)
+
+
+def GreedyIndependentSet(Conflicts, rng):
+    """
+    Returns the indices of a set of candidates no two of which conflict,
+    picking the candidate with the fewest conflicts left first (ties in
+    random order).
+
+    Conflicts = (m, m) symmetric boolean array, False on the diagonal
+    """
+
+    m = len(Conflicts)
+    Left = np.ones(m, dtype=bool)
+    Degree = Conflicts.sum(axis=1).astype(np.float64)
+    Degree += rng.random(m) * 0.5
+    Chosen = []
+    while Left.any():
+        i = int(np.argmin(np.where(Left, Degree, np.inf)))
+        Chosen.append(i)
+        Dropped = Left & Conflicts[i]
+        Dropped[i] = True
+        Left &= ~Dropped
+        Degree -= Conflicts[:, Dropped].sum(axis=1)
+
+    return np.array(Chosen, dtype=np.intp)
+
+
+def RepairNeighborhood(Polygon, transect_length, Fixed, Removed, cx, cy,
+                       Radius, Candidates, rng):
+    """
+    Refills the disk of Radius around (cx, cy) with transects clear of the
+    Fixed transects, drawn from Candidates new transects with midpoints in
+    the disk and the Removed transects.
+
+    Returns an (n, 5) array of the transects that refill the disk.
+
+    Dependencies:
+    import numpy as np
+    import TransectGeometry
+    """
+
+    # Candidates with whole-degree bearings and midpoints in the disk
+    Distance = Radius * np.sqrt(rng.random(Candidates))
+    Angle = rng.uniform(0.0, 2.0 * np.pi, Candidates)
+    bearing = rng.integers(1, 361, Candidates).astype(np.float64)
+    dx, dy = TransectGeometry.TransectEndpoints(0.0, 0.0, bearing,
+                                                transect_length / 2.0)
+    mx = cx + Distance * np.cos(Angle)
+    my = cy + Distance * np.sin(Angle)
+    New = np.column_stack([mx - dx, my - dy, mx + dx, my + dy, bearing])
+    Pool = np.concatenate([Removed, New])
+
+    # Keep those within the polygon and clear of the fixed transects nearby
+    Keep = TransectGeometry.SegmentsWithinPolygon(
+        Polygon, Pool[:, 0], Pool[:, 1], Pool[:, 2], Pool[:, 3])
+    Pool = Pool[Keep]
+    if len(Fixed):
+        fx, fy = Midpoints(Fixed)
+        Near = Fixed[np.hypot(fx - cx, fy - cy) <=
+                     Radius + 2.5 * transect_length]
+        Pool = Pool[TransectGeometry.ClearOfTransects(
+            Pool[:, 0], Pool[:, 1], Pool[:, 2], Pool[:, 3], Near,
+            transect_length)]
+    if len(Pool) == 0:
+        return Pool
+
+    Conflicts = TransectGeometry.SegmentDistance(
+        Pool[:, 0, None], Pool[:, 1, None], Pool[:, 2, None],
+        Pool[:, 3, None], Pool[:, 0], Pool[:, 1], Pool[:, 2],
+        Pool[:, 3]) <= transect_length
+    np.fill_diagonal(Conflicts, False)
+    return Pool[GreedyIndependentSet(Conflicts, rng)]
+
+
+def OptimizeTransects(Polygon, transect_length, Transects, Steps,
+                      max_transects=None, rng=None, Radius=0,
+                      Candidates=CANDIDATES, Temperature=0.5,
+                      TimeBudget=0):
+    """
+    Improves a layout of transects within Polygon by large-neighborhood
+    search with simulated annealing (see the top of this module).
+
+    Polygon = dictionary from TransectGeometry.PreparePolygon
+    Transects = starting layout, an (n, 5) array of x0, y0, x1, y1, bearing
+                that already satisfies the constraints (e.g. from
+                TransectGeometry.DrawTransects); not changed
+    Steps = number of destroy-and-repair steps
+    max_transects = stops once the layout holds this many (no limit if
+                    None); the layout never holds more
+    rng = numpy.random.Generator (a new unseeded one if None)
+    Radius = radius of the neighborhoods (2 * transect_length if 0)
+    Candidates = new candidate transects drawn in each neighborhood
+    Temperature = starting temperature, in transects; 0 only accepts
+                  layouts with as many transects or more
+    TimeBudget = stops after this many seconds (off when 0)
+
+    Returns the best layout found, as an (n, 5) array, and History, a
+    dictionary of arrays with one value per step run:
+    Count = transects in the current layout after the step
+    BestCount = transects in the best layout so far
+    Temperature = temperature of the step
+    Removed, Inserted = transects removed from and put in the neighborhood
+    Accepted = whether the new layout was accepted
+    Seconds = time since the start of the search
+
+    Dependencies:
+    import numpy as np
+    import time
+    import TransectGeometry
+    """
+
+    Started = time.perf_counter()
+    if rng is None:
+        rng = np.random.default_rng()
+    if max_transects is None:
+        max_transects = np.inf
+    Radius = Radius or 2.0 * transect_length
+
+    Current = np.array(Transects, dtype=np.float64).reshape(-1, 5)
+    Best = Current.copy()
+    History = dict((Field, []) for Field in HISTORY_FIELDS)
+
+    for Step in range(Steps):
+        if len(Best) >= max_transects:
+            break
+        if TimeBudget and time.perf_counter() - Started > TimeBudget:
+            break
+        T = Temperature * (1.0 - Step / float(Steps))
+
+        # Destroy the neighborhood of a transect or of a random point
+        mx, my = Midpoints(Current)
+        if len(Current) and rng.random() < 0.5:
+            i = rng.integers(len(Current))
+            cx, cy = mx[i], my[i]
+        else:
+            x, y = TransectGeometry.RandomPointsInPolygon(Polygon, 1, rng)
+            cx, cy = x[0], y[0]
+        Inside = np.hypot(mx - cx, my - cy) <= Radius
+        Fixed = Current[~Inside]
+
+        # Repair it, up to max_transects
+        Refill = RepairNeighborhood(Polygon, transect_length, Fixed,
+                                    Current[Inside], cx, cy, Radius,
+                                    Candidates, rng)
+        if np.isfinite(max_transects):
+            Refill = Refill[:max(0, int(max_transects) - len(Fixed))]
+
+        # Accept as many or more, or fewer with the annealing probability
+        Change = len(Refill) - np.count_nonzero(Inside)
+        Accepted = bool(Change >= 0 or
+                        (T > 0 and rng.random() < np.exp(Change / T)))
+        if Accepted:
+            Current = np.concatenate([Fixed, Refill])
+            if len(Current) > len(Best):
+                Best = Current.copy()
+
+        for Field, Value in zip(HISTORY_FIELDS, (
+                len(Current), len(Best), T, np.count_nonzero(Inside),
+                len(Refill), Accepted, time.perf_counter() - Started)):
+            History[Field].append(Value)
+
+    History = dict((Field, np.array(Values))
+                   for Field, Values in History.items())
+    return Best, History
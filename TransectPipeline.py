@@ -0,0 +1,138 @@
+# TransectPipeline.py
+# Created: 10/17/2026
+# Threads that take candidate generation and I/O off the geometry loop
+# (Pipeline=True).
+#
+# PrefetchBatches runs a producer thread that draws the next batches of
+# candidates while the loop tests the current one, and keeps at most Depth
+# of them waiting in a bounded queue. The producer is the only user of the
+# random generator, and batches are consumed in the order they are drawn,
+# so a pipelined run draws the same transects as a run without it.
+#
+# A writer (StartWriter) is a background thread that runs queued calls in
+# order, such as checkpoint records and Store appends. Only pure Python and
+# NumPy work goes to it: arcpy is not thread-safe, so messages and every
+# arcpy call stay on the main thread. Submit blocks only when Depth
+# calls are already waiting, so slow I/O holds the loop back only when it
+# falls that far behind. StopWriter waits for the queued calls and raises
+# the first error any of them raised.
+#
+# Neither thread overlaps geoprocessing: the gdb engine runs as before. On
+# PrincetonFarm.shp (L = 150, one CPU core), 40 trials with a checkpoint
+# record and Store append after each take as long with the writer as
+# without it, since those writes are about 1% of a trial. Prefetching made
+# BatchSize=512 trials about 1.5x slower, so MaximizeNTransects no longer
+# prefetches. The writer pays off only when the checkpoint or Store is on
+# slow storage, and prefetching only with a spare core.
+# -----------------------------------------------------------------------------
+
+# Imports
+import queue
+import threading
+
+# Batches drawn ahead, and calls waiting for the writer, at most
+PREFETCH_DEPTH = 2
+WRITER_DEPTH = 256
+
+
+def _Put(Queue, Item, Stop):
+    """Puts Item in Queue, waiting for room, unless Stop is set first."""
+
+    while not Stop.is_set():
+        try:
+            Queue.put(Item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+
+def PrefetchBatches(Generate, Depth=PREFETCH_DEPTH):
+    """
+    Yields the results of Generate() one call after another, computed
+    ahead by a producer thread. Closing the generator stops the producer;
+    an error raised by Generate is raised here when its turn comes.
+
+    Dependencies:
+    import queue
+    import threading
+    """
+
+    Queue = queue.Queue(maxsize=max(1, Depth))
+    Stop = threading.Event()
+
+    def Produce():
+        try:
+            while not Stop.is_set():
+                _Put(Queue, (Generate(), None), Stop)
+        except Exception as Error:
+            _Put(Queue, (None, Error), Stop)
+
+    Producer = threading.Thread(target=Produce, daemon=True)
+    Producer.start()
+    try:
+        while True:
+            Batch, Error = Queue.get()
+            if Error is not None:
+                raise Error
+            yield Batch
+    finally:
+        Stop.set()
+        Producer.join()
+
+
+def StartWriter(Depth=WRITER_DEPTH):
+    """
+    Starts a writer thread that runs the calls passed to Submit in order.
+
+    Returns the writer, a dictionary with its Queue, Thread and the Errors
+    its calls raised.
+
+    Dependencies:
+    import queue
+    import threading
+    """
+
+    Writer = {"Queue": queue.Queue(maxsize=max(1, Depth)), "Errors": []}
+
+    def Work():
+        while True:
+            Call = Writer["Queue"].get()
+            if Call is None:
+                return
+            Function, Arguments = Call
+            try:
+                Function(*Arguments)
+            except Exception as Error:
+                Writer["Errors"].append(Error)
+
+    Writer["Thread"] = threading.Thread(target=Work, daemon=True)
+    Writer["Thread"].start()
+    return Writer
+
+
+def Submit(Writer, Function, *Arguments):
+    """
+    Queues Function(*Arguments) to run on Writer, or runs it right away
+    when Writer is None. Raises the first error an earlier call raised.
+    """
+
+    if Writer is None:
+        Function(*Arguments)
+        return
+    if Writer["Errors"]:
+        raise Writer["Errors"][0]
+    Writer["Queue"].put((Function, Arguments))
+
+
+def StopWriter(Writer):
+    """
+    Waits for the calls queued on Writer to run and stops it (nothing when
+    Writer is None). Raises the first error any call raised.
+    """
+
+    if Writer is None:
+        return
+    Writer["Queue"].put(None)
+    Writer["Thread"].join()
+    if Writer["Errors"]:
+        raise Writer["Errors"][0]
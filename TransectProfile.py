@@ -0,0 +1,104 @@
+# TransectProfile.py
+# Created: 10/17/2026
+# Per-phase timing and outcome counts for the transect placement loops.
+#
+# A trace is a dictionary holding the seconds spent in each phase of one
+# trial (sampling start points, containment tests, buffering, erasing...)
+# and the number of candidates with each outcome (accepted, exited the
+# UnsampledZone, stopped because the UnsampledArea was too small...). The
+# placement loops take Trace=None and only touch it behind
+# "if Trace is not None", so profiling costs nothing when it is off.
+#
+# WriteProfile saves the traces of a run and their summary as JSON:
+# {"Trials": [trace, ...], "Summary": {...}}
+# -----------------------------------------------------------------------------
+
+# Imports
+import json
+import time
+
+
+def NewTrace(Trial=0):
+    """Returns an empty trace for trial number Trial."""
+
+    return {"Trial": Trial, "Seconds": {}, "Outcomes": {}}
+
+
+def Lap(Trace, Phase, Started):
+    """
+    Adds the time since Started (a time.perf_counter() value) to Phase and
+    returns the current time, which starts the next phase.
+
+    Dependencies:
+    import time
+    """
+
+    Now = time.perf_counter()
+    Trace["Seconds"][Phase] = Trace["Seconds"].get(Phase, 0.0) + Now - Started
+    return Now
+
+
+def Count(Trace, Outcome, n=1):
+    """Adds n candidates with Outcome to Trace."""
+
+    Trace["Outcomes"][Outcome] = Trace["Outcomes"].get(Outcome, 0) + int(n)
+
+
+def Summarize(Traces):
+    """
+    Returns the summary of a list of traces: the number of trials, the total
+    and mean seconds and the share of the total time of each phase, and the
+    total and share of each outcome.
+    """
+
+    Seconds = {}
+    Outcomes = {}
+    for Trace in Traces:
+        for Phase, Value in Trace["Seconds"].items():
+            Seconds[Phase] = Seconds.get(Phase, 0.0) + Value
+        for Outcome, Value in Trace["Outcomes"].items():
+            Outcomes[Outcome] = Outcomes.get(Outcome, 0) + Value
+
+    TotalSeconds = sum(Seconds.values()) or 1.0
+    TotalOutcomes = sum(Outcomes.values()) or 1
+    Trials = max(len(Traces), 1)
+    return {"Trials": len(Traces),
+            "Seconds": Seconds,
+            "MeanSeconds": {Phase: Value / Trials
+                            for Phase, Value in Seconds.items()},
+            "TimeShare": {Phase: Value / TotalSeconds
+                          for Phase, Value in Seconds.items()},
+            "Outcomes": Outcomes,
+            "OutcomeShare": {Outcome: Value / float(TotalOutcomes)
+                             for Outcome, Value in Outcomes.items()}}
+
+
+def WriteProfile(Profile, Traces):
+    """
+    Writes Traces and their summary to the JSON file Profile and returns the
+    summary.
+
+    Dependencies:
+    import json
+    """
+
+    Summary = Summarize(Traces)
+    with open(Profile, "w") as f:
+        json.dump({"Trials": Traces, "Summary": Summary}, f, indent=1,
+                  sort_keys=True)
+    return Summary
+
+
+def ReportSummary(Summary, AddMessage):
+    """Sends the time share of each phase and the outcome counts to
+    AddMessage (e.g. TransectIO.AddMessage)."""
+
+    AddMessage("\nTime by phase over {} trials:".format(Summary["Trials"]))
+    for Phase, Value in sorted(Summary["Seconds"].items(),
+                               key=lambda Item: -Item[1]):
+        AddMessage("\t{0:<24} {1:10.3f} s {2:6.1%}".format(
+            Phase, Value, Summary["TimeShare"][Phase]))
+    AddMessage("Candidate outcomes:")
+    for Outcome, Value in sorted(Summary["Outcomes"].items()):
+        AddMessage("\t{0:<24} {1:10d} {2:6.1%}".format(
+            Outcome, Value, Summary["OutcomeShare"][Outcome]))
@@ -0,0 +1,389 @@
+# TransectRaster.py
+# Created: 10/17/2026
+# Free-space raster for drawing start points and bearings that can still
+# hold a whole transect (Sampler="freespace" in TransectGeometry).
+#
+# Late in a run most of the UnsampledZone is too narrow for a transect, so
+# start points drawn uniformly over it are almost all rejected. This module
+# keeps a raster of the cells that may still hold part of a transect and,
+# for each of Directions bearing ranges, the cells a transect could start
+# from in that range: the AND of the free cells shifted along the bearing
+# (a cell is viable when every cell along the path is free). Candidates are
+# drawn only from viable (cell, bearing range) pairs and are then tested
+# exactly as before, so the raster only has to never rule out a transect
+# that fits. It is updated around each accepted transect, not rebuilt.
+# Because it may keep pairs that hold no transect, a run stops after a
+# number of batches with no fit as well as when no pair is viable.
+#
+# Every viable pair covers the same cell area and number of bearings, so
+# accepted transects have the same distribution as with uniform sampling.
+#
+# The raster is conservative, so the saving is modest: on PrincetonFarm.shp
+# (L = 150, 20 trials) a trial tests about 6,600 candidates, against about
+# 14,100 for uniform sampling with BatchSize=512, and 2,560 of them are the
+# MaxEmptyBatches batches that end the run.
+# -----------------------------------------------------------------------------
+
+# Imports
+import collections
+import time
+
+import numpy as np
+
+import TransectCache
+import TransectGeometry
+import TransectProfile
+
+# Bearing ranges; each covers 360 / DIRECTIONS whole-degree bearings
+DIRECTIONS = 36
+
+# Raster cells per transect_length, and the most cells in a raster
+CELLS_PER_TRANSECT = 8
+MAX_CELLS = 2**18
+
+# Candidates drawn and tested at a time
+BATCH_SIZE = 256
+
+# Rasters built by this process, by polygon hash and raster parameters, the
+# most recently used last; only the last RASTER_CACHE_SIZE are kept
+RASTER_CACHE_SIZE = 4
+_Rasters = collections.OrderedDict()
+
+
+# ------------------------------ Free space --------------------------------- #
+
+def FreeSpaceRaster(Polygon, transect_length, Directions=DIRECTIONS,
+                    CellsPerTransect=CELLS_PER_TRANSECT, MaxCells=MAX_CELLS):
+    """
+    Returns a new free-space raster of Polygon before any transect is drawn.
+    Rasters are built once per polygon and transect_length and copied; the
+    last RASTER_CACHE_SIZE built are kept.
+
+    Returns a dictionary with:
+    Origin, CellSize, Shape = raster over the BBox of Polygon
+    Pad = width of the border around Free and Reachable
+    Free = cells that may hold part of a transect: inside or on the
+           boundary of Polygon, and not entirely within transect_length of
+           an accepted transect
+    Reachable = cells within Reach of a Free cell
+    Viable = (Directions, ny, nx) cells a transect can start from in each
+             bearing range
+    Offsets = (Directions, k, 2) row and column steps along each range
+
+    Dependencies:
+    import numpy as np
+    import TransectCache
+    """
+
+    Key = (TransectCache.PolygonKey(Polygon), float(transect_length),
+           Directions, CellsPerTransect, MaxCells)
+    if Key in _Rasters:
+        _Rasters.move_to_end(Key)
+    else:
+        _Rasters[Key] = _BuildRaster(Polygon, transect_length, Directions,
+                                     CellsPerTransect, MaxCells)
+        while len(_Rasters) > RASTER_CACHE_SIZE:
+            _Rasters.popitem(last=False)
+    Raster = dict(_Rasters[Key])
+    for Name in ("Free", "Reachable", "Viable"):
+        Raster[Name] = Raster[Name].copy()
+    return Raster
+
+
+def _BuildRaster(Polygon, transect_length, Directions, CellsPerTransect,
+                 MaxCells):
+    """Builds the raster returned by FreeSpaceRaster."""
+
+    if 360 % Directions:
+        raise ValueError("Directions must divide 360")
+
+    xmin, ymin, xmax, ymax = Polygon["BBox"]
+    CellSize = max(float(transect_length) / CellsPerTransect,
+                   np.sqrt((xmax - xmin) * (ymax - ymin) / MaxCells))
+    nx = max(1, int(np.ceil((xmax - xmin) / CellSize)))
+    ny = max(1, int(np.ceil((ymax - ymin) / CellSize)))
+
+    # A point of a transect that fits is in a Free cell whose center is at
+    # most Reach from the cell tested for it along the middle bearing of
+    # the range: half a diagonal each for the start point, the rounded step
+    # and the point's own cell, plus the spread of the bearing range
+    Width = 360 // Directions
+    HalfDiagonal = CellSize * np.sqrt(0.5)
+    Spread = 2.0 * transect_length * np.sin(np.radians(Width - 1) / 4.0)
+    Reach = 3.0 * HalfDiagonal + Spread
+    Steps = max(1, int(np.ceil(transect_length / CellSize)))
+    Pad = Steps + 2 * int(np.ceil(Reach / CellSize)) + 1
+
+    # Cells with their center inside, or crossed by the boundary
+    cx = xmin + (np.arange(nx) + 0.5) * CellSize
+    cy = ymin + (np.arange(ny) + 0.5) * CellSize
+    X, Y = np.meshgrid(cx, cy)
+    Inside = TransectGeometry.PointsInPolygon(
+        Polygon, X.ravel(), Y.ravel()).reshape(ny, nx)
+
+    Edges = Polygon["Edges"]
+    Length = np.hypot(Edges[:, 2] - Edges[:, 0], Edges[:, 3] - Edges[:, 1])
+    Samples = np.ceil(Length / (CellSize / 2.0)).astype(np.int64) + 1
+    Edge = np.repeat(np.arange(len(Edges)), Samples)
+    t = ((np.arange(len(Edge)) - np.repeat(np.cumsum(Samples) - Samples,
+                                           Samples)) /
+         np.repeat(np.maximum(Samples - 1, 1), Samples))
+    bx = Edges[Edge, 0] + t * (Edges[Edge, 2] - Edges[Edge, 0])
+    by = Edges[Edge, 1] + t * (Edges[Edge, 3] - Edges[Edge, 1])
+    # Samples are half a cell apart, so a cell the boundary only clips is
+    # next to the cell of a sample
+    Row = ((by - ymin) / CellSize).astype(np.int64)
+    Column = ((bx - xmin) / CellSize).astype(np.int64)
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            Inside[np.clip(Row + dy, 0, ny - 1),
+                   np.clip(Column + dx, 0, nx - 1)] = True
+
+    Free = np.zeros((ny + 2 * Pad, nx + 2 * Pad), dtype=bool)
+    Free[Pad:Pad + ny, Pad:Pad + nx] = Inside
+
+    # Disk of cells within Reach, and the steps along each bearing range
+    r = int(np.ceil(Reach / CellSize))
+    dy, dx = [a.ravel() for a in np.mgrid[-r:r + 1, -r:r + 1]]
+    Disk = np.column_stack([dy, dx])[np.hypot(dy, dx) * CellSize <= Reach]
+
+    Middle = np.radians(np.arange(Directions) * Width + (Width + 1) / 2.0)
+    Distance = np.arange(Steps + 1) * (transect_length / Steps) / CellSize
+    Offsets = np.stack(
+        [np.rint(np.cos(Middle)[:, None] * Distance),
+         np.rint(np.sin(Middle)[:, None] * Distance)],
+        axis=2).astype(np.int64)
+
+    Raster = {"Origin": np.array([xmin, ymin]),
+              "CellSize": CellSize,
+              "Shape": np.array([ny, nx]),
+              "Pad": Pad,
+              "Free": Free,
+              "Reachable": np.zeros_like(Free),
+              "Viable": np.zeros((Directions, ny, nx), dtype=bool),
+              "Disk": Disk,
+              "Offsets": Offsets,
+              "Width": Width,
+              "HalfDiagonal": HalfDiagonal,
+              "Reach": Reach,
+              "transect_length": float(transect_length)}
+    _UpdateWindow(Raster, 0, ny, 0, nx)
+    return Raster
+
+
+def _UpdateWindow(Raster, r0, r1, c0, c1):
+    """
+    Recomputes Reachable and Viable for raster rows r0 to r1 - 1 and
+    columns c0 to c1 - 1 after Free changed there, widening the window by
+    the distance each depends on.
+    """
+
+    ny, nx = Raster["Shape"]
+    Pad = Raster["Pad"]
+    Free, Reachable = Raster["Free"], Raster["Reachable"]
+    Disk, Offsets = Raster["Disk"], Raster["Offsets"]
+
+    # Reachable depends on Free within the disk; paths from the edge of the
+    # raster may end in the border, which is reachable from inside
+    r = int(Disk[:, 0].max())
+    a0, a1 = max(-r, r0 - r), min(ny + r, r1 + r)
+    b0, b1 = max(-r, c0 - r), min(nx + r, c1 + r)
+    Window = np.zeros((a1 - a0, b1 - b0), dtype=bool)
+    for dy, dx in Disk:
+        Window |= Free[Pad + a0 + dy:Pad + a1 + dy,
+                       Pad + b0 + dx:Pad + b1 + dx]
+    Reachable[Pad + a0:Pad + a1, Pad + b0:Pad + b1] = Window
+
+    # Viable depends on Reachable along each bearing range
+    s = int(np.abs(Offsets).max())
+    a0, a1 = max(0, a0 - s), min(ny, a1 + s)
+    b0, b1 = max(0, b0 - s), min(nx, b1 + s)
+    for d, Path in enumerate(Offsets):
+        Window = np.ones((a1 - a0, b1 - b0), dtype=bool)
+        for dy, dx in Path:
+            Window &= Reachable[Pad + a0 + dy:Pad + a1 + dy,
+                                Pad + b0 + dx:Pad + b1 + dx]
+        Raster["Viable"][d, a0:a1, b0:b1] = Window
+
+
+def BlockTransect(Raster, x0, y0, x1, y1):
+    """
+    Removes the cells lying entirely within transect_length of the accepted
+    transect (x0, y0)-(x1, y1) from the free space, in place.
+
+    Dependencies:
+    import numpy as np
+    import TransectGeometry
+    """
+
+    ny, nx = Raster["Shape"]
+    Pad = Raster["Pad"]
+    CellSize = Raster["CellSize"]
+    L = Raster["transect_length"]
+    xmin, ymin = Raster["Origin"]
+
+    c0 = max(0, int((min(x0, x1) - L - xmin) // CellSize))
+    c1 = min(nx, int((max(x0, x1) + L - xmin) // CellSize) + 1)
+    r0 = max(0, int((min(y0, y1) - L - ymin) // CellSize))
+    r1 = min(ny, int((max(y0, y1) + L - ymin) // CellSize) + 1)
+    if r0 >= r1 or c0 >= c1:
+        return
+
+    cx = xmin + (np.arange(c0, c1) + 0.5) * CellSize
+    cy = ymin + (np.arange(r0, r1) + 0.5) * CellSize
+    X, Y = np.meshgrid(cx, cy)
+    Distance = TransectGeometry.PointSegmentDistance(X, Y, x0, y0, x1, y1)
+    Raster["Free"][Pad + r0:Pad + r1, Pad + c0:Pad + c1] &= (
+        Distance > L - Raster["HalfDiagonal"])
+    _UpdateWindow(Raster, r0, r1, c0, c1)
+
+
+def SampleViable(Raster, n, rng):
+    """
+    Draws n candidate start points and whole-degree bearings uniformly from
+    the viable (cell, bearing range) pairs of Raster.
+
+    Returns x, y, bearing arrays, or None when no pair is viable.
+
+    Dependencies:
+    import numpy as np
+    """
+
+    Pairs = np.flatnonzero(Raster["Viable"])
+    if len(Pairs) == 0:
+        return None
+
+    ny, nx = Raster["Shape"]
+    Direction, Row, Column = np.unravel_index(
+        Pairs[rng.integers(0, len(Pairs), n)], (len(Raster["Offsets"]), ny,
+                                                nx))
+    x = Raster["Origin"][0] + (Column + rng.random(n)) * Raster["CellSize"]
+    y = Raster["Origin"][1] + (Row + rng.random(n)) * Raster["CellSize"]
+    bearing = (Direction * Raster["Width"] +
+               rng.integers(1, Raster["Width"] + 1, n)).astype(np.float64)
+    return x, y, bearing
+
+
+# ------------------------------- Drawing ----------------------------------- #
+
+def DrawTransectsFreeSpace(Polygon, transect_length, max_transects,
+                           TargetSamplingProportion, rng=None,
+                           BatchSize=BATCH_SIZE,
+                           MaxEmptyBatches=10, Trace=None):
+    """
+    Draws up to max_transects transects within Polygon like
+    TransectGeometry.DrawTransectsBatched, drawing candidates only from
+    start points and bearings that the free-space raster says can still
+    hold a whole transect. Rejected candidates do not count toward
+    max_transects.
+
+    The run also stops when no (cell, bearing range) pair is viable, or
+    after MaxEmptyBatches batches in a row in which no candidate fits.
+    Viable pairs can remain then: the raster only rules out what cannot
+    fit, so the last pairs may hold no transect at all.
+
+    Returns Transects and Stats as TransectGeometry.DrawTransects does, and
+    fills Trace as it does, with the raster update under "Buffer".
+
+    Dependencies:
+    import numpy as np
+    import time
+    import TransectGeometry
+    import TransectProfile
+    """
+
+    if rng is None:
+        rng = np.random.default_rng()
+    if Trace is not None:
+        Started = time.perf_counter()
+
+    TotalArea = Polygon["Area"]
+    Raster = FreeSpaceRaster(Polygon, transect_length)
+
+    UnsampledArea = TotalArea
+    UnsampledProportion = 1.0
+    MaxUnsampledProportion = 1.0 - TargetSamplingProportion
+
+    Transects = np.empty((max(0, max_transects), 5))
+    Grid = TransectGeometry.TransectGrid(Polygon, transect_length, Transects)
+    Accepted = 0
+    Candidates = 0
+    EmptyBatches = 0
+    if Trace is not None:
+        Started = TransectProfile.Lap(Trace, "Setup", Started)
+
+    while ((UnsampledProportion > MaxUnsampledProportion) and
+           (Accepted < max_transects) and (EmptyBatches < MaxEmptyBatches)):
+
+        # Generate a batch of candidates from the viable free space
+        Sample = SampleViable(Raster, BatchSize, rng)
+        if Sample is None:
+            if Trace is not None:
+                TransectProfile.Count(Trace, "NoStartPoint")
+            break
+        x0, y0, bearing = Sample
+        x1, y1 = TransectGeometry.TransectEndpoints(x0, y0, bearing,
+                                                    transect_length)
+        Candidates += BatchSize
+        if Trace is not None:
+            Started = TransectProfile.Lap(Trace, "Sampling", Started)
+
+        # Test the candidates exactly
+        Keep = TransectGeometry.SegmentsWithinPolygon(Polygon, x0, y0, x1, y1)
+        Index = np.flatnonzero(Keep)
+        Keep[Index] = TransectGeometry.ClearOfGrid(
+            Grid, x0[Index], y0[Index], x1[Index], y1[Index])
+        Survivors = np.flatnonzero(Keep)
+        if Trace is not None:
+            TransectProfile.Count(Trace, "Exited",
+                                  BatchSize - len(Survivors))
+            Started = TransectProfile.Lap(Trace, "Containment", Started)
+
+        if len(Survivors) == 0:
+            EmptyBatches += 1
+            continue
+        EmptyBatches = 0
+
+        # Accept survivors one at a time
+        BatchStart = Accepted
+        Tested = 0
+        for i in Survivors:
+            Tested += 1
+            if (Accepted > BatchStart and not TransectGeometry.ClearOfGrid(
+                    Grid, x0[i], y0[i], x1[i], y1[i])[0]):
+                if Trace is not None:
+                    TransectProfile.Count(Trace, "Conflict")
+                continue
+
+            Transects[Accepted] = (x0[i], y0[i], x1[i], y1[i], bearing[i])
+            TransectGeometry.AddToGrid(Grid, Accepted)
+            Accepted += 1
+            BlockTransect(Raster, x0[i], y0[i], x1[i], y1[i])
+            if Trace is not None:
+                TransectProfile.Count(Trace, "Accepted")
+                Started = TransectProfile.Lap(Trace, "Buffer", Started)
+
+            UnsampledArea -= TransectGeometry.ErasedArea(Polygon, Grid,
+                                                         Accepted - 1)
+            UnsampledProportion = UnsampledArea / TotalArea
+            if Trace is not None:
+                Started = TransectProfile.Lap(Trace, "Erase", Started)
+
+            if ((UnsampledProportion <= MaxUnsampledProportion) or
+                    (Accepted == max_transects)):
+                break
+
+        if Trace is not None:
+            TransectProfile.Count(Trace, "Unused", len(Survivors) - Tested)
+
+    if Trace is not None and EmptyBatches == MaxEmptyBatches:
+        TransectProfile.Count(Trace, "TooSmall")
+
+    Stats = {"Candidates": Candidates,
+             "Accepted": Accepted,
+             "Exited": Candidates - Accepted,
+             "TotalArea": TotalArea,
+             "UnsampledArea": UnsampledArea,
+             "UnsampledProportion": UnsampledProportion}
+
+    return Transects[:Accepted].copy(), Stats
@@ -0,0 +1,110 @@
+# TransectSeed.py
+# Created: 10/17/2026
+# Reproducible random numbers for the trials of a run.
+#
+# A run has one Seed (an integer; fresh OS entropy when none is given), and
+# trial i of the run draws only from the stream SeedSequence(Seed,
+# spawn_key=(i,)), the same stream SeedSequence(Seed).spawn(n)[i] gives.
+# Streams depend only on Seed and the trial index, not on which worker
+# runs the trial or on the trials before it, so any trial can be drawn
+# again on its own from (Seed, Trial): a run keeps the index of its best
+# trial instead of its layout, and a checkpoint needs no RNG state.
+#
+# With Engine="gdb", the stream seeds the random module (bearings) and
+# arcpy.env.randomGenerator (CreateRandomPoints start points) before the
+# trial.
+# -----------------------------------------------------------------------------
+
+# Imports
+import random
+
+import numpy as np
+
+import TransectGeometry
+
+
+def RunSeed(Seed=None):
+    """
+    Returns Seed as an integer, or fresh OS entropy when Seed is None or "".
+    """
+
+    if Seed is None or Seed == "":
+        return int(np.random.SeedSequence().entropy)
+    return int(Seed)
+
+
+def PolygonSeed(Seed, Index):
+    """
+    Returns the seed of polygon Index of a batch seeded with Seed (an
+    integer drawn from the stream SeedSequence(Seed, spawn_key=(Index,))).
+    Trial i of the polygon draws from TrialStream(PolygonSeed(Seed, Index),
+    i), so RegenerateTrial and DrawTrial draw it again from that seed.
+
+    Dependencies:
+    import numpy as np
+    """
+
+    State = np.random.SeedSequence(int(Seed), spawn_key=(int(Index),)
+                                   ).generate_state(4, np.uint32)
+    return sum(int(Word) << (32 * i) for i, Word in enumerate(State))
+
+
+def TrialStream(Seed, Trial):
+    """
+    Returns the SeedSequence of trial Trial of the run seeded with Seed.
+
+    Dependencies:
+    import numpy as np
+    """
+
+    return np.random.SeedSequence(int(Seed), spawn_key=(int(Trial),))
+
+
+def TrialRNG(Seed, Trial):
+    """
+    Returns a NumPy Generator on the stream of Trial, or an unseeded one
+    when Seed is None.
+
+    Dependencies:
+    import numpy as np
+    """
+
+    if Seed is None:
+        return np.random.default_rng()
+    return np.random.default_rng(TrialStream(Seed, Trial))
+
+
+def SeedTrial(Seed, Trial, arcpy=None):
+    """
+    Seeds the random module and, when arcpy is given, its randomGenerator
+    environment (ACM599) from the stream of Trial, for Engine="gdb".
+
+    Dependencies:
+    import random
+    """
+
+    State = TrialStream(Seed, Trial).generate_state(2)
+    random.seed(int(State[0]))
+    if arcpy is not None:
+        arcpy.env.randomGenerator = "{} ACM599".format(
+            int(State[1]) % 2**31)
+
+
+def DrawTrial(Polygon, transect_length, max_transects, Seed, Trial,
+              TargetSamplingProportion=1.0, BatchSize=0, Sampler="uniform",
+              Trace=None, CellSize=0, Prefetch=0):
+    """
+    Draws trial Trial of the run seeded with Seed with
+    TransectGeometry.DrawTransects. The same arguments always draw the same
+    transects, so this also regenerates a trial recorded only by its index;
+    Prefetch does not change them.
+
+    Returns Transects and Stats as DrawTransects does.
+
+    Dependencies:
+    import TransectGeometry
+    """
+
+    return TransectGeometry.DrawTransects(
+        Polygon, transect_length, max_transects, TargetSamplingProportion,
+        TrialRNG(Seed, Trial), BatchSize, Sampler, Trace, CellSize, Prefetch)
@@ -0,0 +1,81 @@
+# TransectStopping.py
+# Created: 10/17/2026
+# Adaptive stopping rules for MaximizeNTransects.
+#
+# The best count of a run usually plateaus long before max_iterations is
+# spent. These rules look at the counts of the trials run so far and stop a
+# run when more trials are unlikely to pay off:
+#
+# Patience = stop after this many trials without a new best count
+# MinChance = stop when the estimated chance of beating the best count in
+#             the remaining trials falls below this probability
+# TimeBudget = stop after this many seconds of wall-clock time
+#
+# A value of 0 turns a rule off.
+# -----------------------------------------------------------------------------
+
+# Imports
+import numpy as np
+
+# Trials needed before MinChance is applied
+MIN_TRIALS = 20
+
+
+def ChanceOfImprovement(TrialCounts, Remaining):
+    """
+    Estimates the chance that at least one of Remaining more trials draws
+    more transects than the best of TrialCounts.
+
+    The upper tail of the count distribution is taken to fall off
+    geometrically: the share of trials reaching best + 1 is estimated as
+    the share reaching best times the ratio of the shares reaching best and
+    best - 1 (each with one pseudo-trial, so a lone best is not certain).
+
+    Dependencies:
+    import numpy as np
+    """
+
+    Counts = np.asarray(TrialCounts)
+    if Remaining <= 0:
+        return 0.0
+    if len(Counts) == 0:
+        return 1.0
+
+    Best = Counts.max()
+    AtBest = np.count_nonzero(Counts >= Best)
+    BelowBest = np.count_nonzero(Counts >= Best - 1)
+    Beyond = AtBest / (len(Counts) + 1.0) * AtBest / (BelowBest + 1.0)
+    return 1.0 - (1.0 - Beyond)**Remaining
+
+
+def StopReason(TrialCounts, Remaining, Elapsed, Patience=0, MinChance=0.0,
+               TimeBudget=0):
+    """
+    Returns why a run should stop before its next trial, or "" to go on.
+
+    TrialCounts = counts of the trials run so far, in order
+    Remaining = trials left in max_iterations
+    Elapsed = seconds since the run started
+    Patience, MinChance, TimeBudget = stopping rules (0 is off)
+
+    Dependencies:
+    import numpy as np
+    """
+
+    if TimeBudget and Elapsed >= TimeBudget:
+        return "time budget of {} s spent".format(TimeBudget)
+    if not len(TrialCounts):
+        return ""
+
+    Counts = np.asarray(TrialCounts)
+    SinceBest = len(Counts) - 1 - int(np.argmax(Counts))
+    if Patience and SinceBest >= Patience:
+        return "no improvement in {} trials".format(SinceBest)
+
+    if MinChance and len(Counts) >= MIN_TRIALS:
+        Chance = ChanceOfImprovement(Counts, Remaining)
+        if Chance < MinChance:
+            return ("chance of improving in the remaining {0} trials is "
+                    "{1:.3f}".format(Remaining, Chance))
+
+    return ""
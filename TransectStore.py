@@ -0,0 +1,203 @@
+# TransectStore.py
+# Created: 10/17/2026
+# Keeps the transects of every trial of a run in memory, for runs of
+# thousands of trials whose layouts are analyzed afterward.
+#
+# A store is a structure of arrays: one contiguous column per field
+# (float64 x0, y0, x1, y1 and bearing, int32 Trial and Order, the position
+# of the transect in its trial), grown by doubling, so appending a trial is
+# a few array copies and no Python object is made per transect. The
+# transects of a trial are contiguous; Offsets[i] is the first row of the
+# i-th trial appended and TrialIDs[i] its trial number, so the counts of
+# all trials are one np.diff and the layout of a trial is a slice.
+#
+# SaveStore writes each column as a .npy file in a directory, straight from
+# the array, and LoadStore opens them memory-mapped, so a saved store is
+# read only where it is used.
+# -----------------------------------------------------------------------------
+
+# Imports
+import os
+
+import numpy as np
+
+# Columns of a store, their types, and the columns of a transect array
+COLUMNS = [("x0", np.float64), ("y0", np.float64), ("x1", np.float64),
+           ("y1", np.float64), ("bearing", np.float64), ("Trial", np.int32),
+           ("Order", np.int32)]
+TRANSECT_COLUMNS = ["x0", "y0", "x1", "y1", "bearing"]
+
+# Rows and trials a new store has room for
+CAPACITY = 1024
+
+
+def NewStore(Capacity=CAPACITY):
+    """
+    Returns an empty store with room for Capacity transects.
+
+    The store is a dictionary with:
+    Columns = dictionary of the column arrays (their first Size rows used)
+    Size = number of transects
+    TrialIDs = trial number of each trial, in the order appended
+    Offsets = first row of each trial, and Size after the last one
+    Trials = number of trials
+
+    Dependencies:
+    import numpy as np
+    """
+
+    Capacity = max(1, int(Capacity))
+    return {"Columns": {Name: np.empty(Capacity, DataType)
+                        for Name, DataType in COLUMNS},
+            "Size": 0,
+            "TrialIDs": np.empty(Capacity, np.int64),
+            "Offsets": np.zeros(Capacity + 1, np.int64),
+            "Trials": 0}
+
+
+def _Grow(Array, Needed):
+    """
+    Returns Array, or a copy at least twice as long when it is short. A
+    read-only Array (a column of a loaded store) is always copied, even
+    for a trial with no transects.
+    """
+
+    if len(Array) >= Needed and Array.flags.writeable:
+        return Array
+    Grown = np.empty(max(Needed, 2 * len(Array)), Array.dtype)
+    Grown[:len(Array)] = Array
+    return Grown
+
+
+def AppendTrial(Store, Trial, Transects):
+    """
+    Appends the transects of trial Trial, an (n, 5) array of x0, y0, x1, y1
+    and bearing as TransectGeometry.DrawTransects returns, to Store.
+
+    Dependencies:
+    import numpy as np
+    """
+
+    Transects = np.asarray(Transects, dtype=np.float64).reshape(-1, 5)
+    First = Store["Size"]
+    Last = First + len(Transects)
+
+    Columns = Store["Columns"]
+    for Name in Columns:
+        Columns[Name] = _Grow(Columns[Name], Last)
+    for i, Name in enumerate(TRANSECT_COLUMNS):
+        Columns[Name][First:Last] = Transects[:, i]
+    Columns["Trial"][First:Last] = Trial
+    Columns["Order"][First:Last] = np.arange(len(Transects))
+
+    i = Store["Trials"]
+    Store["TrialIDs"] = _Grow(Store["TrialIDs"], i + 1)
+    Store["Offsets"] = _Grow(Store["Offsets"], i + 2)
+    Store["TrialIDs"][i] = Trial
+    Store["Offsets"][i + 1] = Last
+    Store["Size"] = Last
+    Store["Trials"] = i + 1
+
+
+def ExtendStore(Store, Other):
+    """
+    Appends every trial of store Other to Store, in the order they were
+    appended to Other.
+    """
+
+    for i in range(Other["Trials"]):
+        AppendTrial(Store, Other["TrialIDs"][i], TrialTransects(Other, i=i))
+
+
+def TrialCounts(Store):
+    """
+    Returns the trial numbers and the number of transects of each trial in
+    Store, in the order they were appended.
+
+    Dependencies:
+    import numpy as np
+    """
+
+    n = Store["Trials"]
+    return Store["TrialIDs"][:n], np.diff(Store["Offsets"][:n + 1])
+
+
+def BestTrial(Store):
+    """
+    Returns the trial number with the most transects (the first appended on
+    ties), or -1 when Store is empty.
+
+    Dependencies:
+    import numpy as np
+    """
+
+    TrialIDs, Counts = TrialCounts(Store)
+    if len(Counts) == 0:
+        return -1
+    return int(TrialIDs[np.argmax(Counts)])
+
+
+def TrialTransects(Store, Trial=None, i=None):
+    """
+    Returns the transects of trial Trial (or of the i-th trial appended)
+    as an (n, 5) array of x0, y0, x1, y1 and bearing.
+
+    Dependencies:
+    import numpy as np
+    """
+
+    if i is None:
+        TrialIDs, Counts = TrialCounts(Store)
+        Found = np.flatnonzero(TrialIDs == Trial)
+        if len(Found) == 0:
+            raise KeyError("Trial {} is not in the store".format(Trial))
+        i = Found[0]
+    First, Last = Store["Offsets"][i], Store["Offsets"][i + 1]
+    return np.column_stack([Store["Columns"][Name][First:Last]
+                            for Name in TRANSECT_COLUMNS]).reshape(-1, 5)
+
+
+# ------------------------------- Files ------------------------------------- #
+
+def SaveStore(Store, Directory):
+    """
+    Saves Store as one .npy file per column, TrialIDs and Offsets in
+    Directory, which is created if needed. The used rows of each array are
+    written from the array itself, without a copy.
+
+    Dependencies:
+    import numpy as np
+    import os
+    """
+
+    if not os.path.isdir(Directory):
+        os.makedirs(Directory)
+    Size, n = Store["Size"], Store["Trials"]
+    Arrays = dict((Name, Column[:Size])
+                  for Name, Column in Store["Columns"].items())
+    Arrays["TrialIDs"] = Store["TrialIDs"][:n]
+    Arrays["Offsets"] = Store["Offsets"][:n + 1]
+    for Name, Array in Arrays.items():
+        np.save(os.path.join(Directory, Name + ".npy"), Array)
+
+
+def LoadStore(Directory, MemoryMap=True):
+    """
+    Opens a store saved by SaveStore. With MemoryMap, the columns are
+    read-only memory maps of the files, read from disk only where they are
+    used; appending to the store copies them into memory first.
+
+    Dependencies:
+    import numpy as np
+    import os
+    """
+
+    Mode = "r" if MemoryMap else None
+    Columns = {Name: np.load(os.path.join(Directory, Name + ".npy"),
+                             mmap_mode=Mode)
+               for Name, DataType in COLUMNS}
+    TrialIDs = np.load(os.path.join(Directory, "TrialIDs.npy"))
+    Offsets = np.load(os.path.join(Directory, "Offsets.npy"))
+    return {"Columns": Columns, "Size": int(Offsets[-1]),
+            "TrialIDs": TrialIDs, "Offsets": Offsets,
+            "Trials": len(TrialIDs)}
@@ -0,0 +1,704 @@
+# TransectTools.py
+# Created: 10/17/2026
+# Core functions of the toolbox: LinearTransects (Random Transects),
+# MaximizeNTransects (Max Random Transects), OptimizeNTransects (which
+# improves one layout instead of drawing more) and the functions they share.
+# RandomTransects_v05.py and MaxRandomTransects_v05.py only read their tool
+# parameters and call these, and TransectCLI.py runs them from the command
+# line.
+#
+# Importing this module reads no parameters and starts no run, and arcpy is
+# only imported when a function needs it (TransectIO.GetArcpy), so other
+# scripts and worker processes can import it in a fraction of a second.
+# -----------------------------------------------------------------------------
+
+# Imports
+import json
+import os
+import random
+import time
+
+import numpy as np
+
+import TransectCache
+import TransectCheckpoint
+import TransectIO
+import TransectMask
+import TransectOptimize
+import TransectPipeline
+import TransectProfile
+import TransectSeed
+import TransectStopping
+import TransectStore
+import TransectTrials
+
+
+def LinearTransects(InputPolygon, transect_length, max_transects,
+                    TargetSamplingProportion, OutputTransects, WorkspaceGDB,
+                    Engine="memory", BatchSize=0, Sampler="uniform",
+                    Trace=None, CellSize=0, Trial=0, Seed=None,
+                    Pipeline=False):
+    """
+    Draws n_transects within InputPolygon and returns OutputTransects.
+
+    InputPolygon = polygon feature class with a single polygon
+    transect_length = desired length of transect segments,
+                    in linear units of the InputPolygon
+    max_transects = desired maximum number of transects to be drawn
+                *** This number may not be reached due to space constraints! ***
+    max_iterations = number to times to attempt drawing transects
+    OutputTransects = output line feature class
+    WorkspaceGDB = any geodatabase that has space for the intermediate files
+    Engine = "memory" draws the transects in memory and writes
+             OutputTransects once; "raster" does the same, filtering
+             transects on a mask of CellSize cells before the exact tests
+             (see TransectMask.py);
+             "gdb" draws each transect with geoprocessing tools in
+             WorkspaceGDB
+    BatchSize = with Engine="memory", draws and tests candidate transects
+                BatchSize at a time when above 0; max_transects then
+                counts accepted transects instead of attempts
+    Sampler = with Engine="memory", "freespace" draws candidates only
+              where a whole transect can still fit (see TransectRaster.py);
+              max_transects then counts accepted transects
+    Trace = trace from TransectProfile.NewTrace that receives the time of
+            each phase and the outcome of each transect (None = off)
+    CellSize = with Engine="raster", the cell size of the mask, in linear
+               units of the InputPolygon (transect_length /
+               TransectMask.CELLS_PER_TRANSECT if 0)
+    Trial = trial number written to the Trial field of OutputTransects
+    Seed = seed of the run; the transects are drawn from the random
+           stream of (Seed, Trial), so the same Seed and Trial draw the
+           same transects (TransectSeed.py). Unseeded when None.
+    Pipeline = with Engine="memory", BatchSize and the uniform Sampler, a
+               producer thread draws the next batches of candidates while
+               the current one is tested (TransectPipeline.py); the
+               transects drawn are the same. This can help only with a
+               spare CPU core. Engine="gdb" ignores it and keeps every
+               arcpy call on this thread, since arcpy is not thread-safe.
+
+    Dependencies:
+    import arcpy
+    import os
+    import random
+    import time
+    import TransectGeometry
+    import TransectIO
+    import TransectMask
+    import TransectProfile
+    import TransectSeed
+    """
+
+    Engine, CellSize = TransectMask.EngineCellSize(Engine, transect_length,
+                                                   CellSize)
+    if Engine == "memory":
+        return LinearTransectsInMemory(InputPolygon, transect_length,
+                                       max_transects, TargetSamplingProportion,
+                                       OutputTransects, BatchSize, Sampler,
+                                       Trace, CellSize, Trial, Seed,
+                                       Pipeline)
+    if Trace is not None:
+        Started = time.perf_counter()
+
+    arcpy = TransectIO.GetArcpy()
+
+    # Seed the bearings and CreateRandomPoints from the stream of this trial
+    if Seed is not None:
+        TransectSeed.SeedTrial(Seed, Trial, arcpy)
+
+    # --------------------- Sampling Zone Parameters ------------------------ #
+    
+    BoundaryLyr = os.path.join(WorkspaceGDB, "Boundary") 
+    arcpy.MakeFeatureLayer_management(InputPolygon, BoundaryLyr)
+    with arcpy.da.SearchCursor( BoundaryLyr, ["SHAPE@AREA"] ) as cursor:
+        TotalArea = [ row[0] for row in cursor ][0]
+    
+    # ----------------------Initialize 'while' loops ------------------------ #
+    
+    UnsampledArea = TotalArea
+    UnsampledZone = BoundaryLyr
+    
+    UnsampledProportion = 1.0
+    MaxUnsampledProportion = 1.0 - TargetSamplingProportion
+   
+    n = 0
+
+    # Accepted transects are appended to OutputTransects as they are drawn
+    Sink = TransectIO.OpenTransects(
+        OutputTransects, transect_length,
+        arcpy.Describe(InputPolygon).spatialReference)
+    if Trace is not None:
+        Started = TransectProfile.Lap(Trace, "Setup", Started)
+
+    
+
+    while (UnsampledProportion>MaxUnsampledProportion) and (n<max_transects):
+
+        # -------------------- Create Random Transect ----------------------- #
+
+        arcpy.AddMessage( "\tCreating transect {}...".format(n) )
+        
+        # Drop a random point
+        arcpy.AddMessage("\t\tCreating random start point...")
+        arcpy.CreateRandomPoints_management(WorkspaceGDB, "randpt",
+                                            UnsampledZone, "", 1)
+        Vertex = os.path.join(WorkspaceGDB, "randpt")
+
+        # Add fields x, y, distance, and bearing
+        arcpy.AddMessage("\t\tAdding attibutes to the point...")
+        arcpy.AddField_management(Vertex, "x", "DOUBLE")
+        arcpy.AddField_management(Vertex, "y", "DOUBLE")
+        arcpy.AddField_management(Vertex, "distance", "FLOAT")
+        arcpy.AddField_management(Vertex, "bearing", "FLOAT")
+
+        # Update attribute table with data for bearing distance tool
+        arcpy.AddMessage("\t\tGenerating a random bearing...")
+        with arcpy.da.UpdateCursor(Vertex, ["SHAPE@XY",
+                                            "x", "y",
+                                            "distance",
+                                            "bearing"]) as cursor:
+            for row in cursor:
+                row[1] = row[0][0]
+                row[2] = row[0][1]
+                row[3] = transect_length
+                row[4] = random.randint(1,360)
+                cursor.updateRow(row)
+                x0, y0, bearing = row[1], row[2], row[4]
+
+        # Create a table to feed to Bearing Distance to line tool
+        arcpy.AddMessage("\t\tSaving attributes as a table...")
+        arcpy.TableToTable_conversion(Vertex, WorkspaceGDB, "RandPtTable")
+        Table = os.path.join(WorkspaceGDB, "RandPtTable")
+        if Trace is not None:
+            Started = TransectProfile.Lap(Trace, "Sampling", Started)
+
+        # Generate transect
+        arcpy.AddMessage("\t\tDrawing transect line...")
+        Transect = os.path.join(WorkspaceGDB, "Transect")
+        arcpy.BearingDistanceToLine_management(Table, Transect,
+                                               x_field = 'x', y_field = 'y',
+                                               distance_field = 'distance',
+                                               bearing_field = 'bearing',
+                                               spatial_reference = Vertex )
+        if Trace is not None:
+            Started = TransectProfile.Lap(Trace, "Drawing", Started)
+
+        # ---------------------- Verify Transect ---------------------------- #
+        
+        # Check that Transect is completely contained in UnsampledZone
+        TransectLyr = os.path.join("in_memory", "transect_lyr")
+        arcpy.MakeFeatureLayer_management(Transect, TransectLyr)
+        arcpy.SelectLayerByLocation_management(TransectLyr,
+                                               "COMPLETELY_WITHIN",
+                                               UnsampledZone, '',
+                                               "NEW_SELECTION")
+        Inside = int( arcpy.GetCount_management(TransectLyr).getOutput(0) )
+        if Trace is not None:
+            Started = TransectProfile.Lap(Trace, "Containment", Started)
+        
+        if Inside == 1:
+        
+            with arcpy.da.SearchCursor( Transect, ["SHAPE@"] ) as cursor:
+                End = [ row[0].lastPoint for row in cursor ][0]
+            TransectIO.AppendTransects(Sink,
+                                       [[x0, y0, End.X, End.Y, bearing]],
+                                       Trial)
+            if Trace is not None:
+                TransectProfile.Count(Trace, "Accepted")
+            arcpy.AddMessage("\t\tFinished drawing transect {}".format(n) )
+
+            # ------------------ Update UnsampledZone ----------------------- #
+            
+            # Buffer transect by the transect length
+            arcpy.AddMessage("\t\tBuffering transect {}...".format(n) )
+            TransBuffer = os.path.join(WorkspaceGDB,
+                                       "Transect{}Buf".format(n) )
+            arcpy.Buffer_analysis(TransectLyr, TransBuffer, transect_length )
+            if Trace is not None:
+                Started = TransectProfile.Lap(Trace, "Buffer", Started)
+
+            # Erase buffer from UnsampledZone
+            arcpy.AddMessage(
+                "\t\tErasing transect buffer from unsampled zone..." )
+            UnsampledZone_Erase = os.path.join("in_memory",
+                                               "UnsampledZone{}".format(n))
+            arcpy.Erase_analysis(UnsampledZone, TransBuffer,
+                                 UnsampledZone_Erase, '')
+            arcpy.Delete_management(TransBuffer)
+            if UnsampledZone != BoundaryLyr:
+                arcpy.Delete_management(UnsampledZone)
+
+            # Get new UnsampledArea from the erased zone (reading
+            # UnsampledZone here lagged one transect behind)
+            with arcpy.da.SearchCursor( UnsampledZone_Erase,
+                                        ["SHAPE@AREA"] ) as cursor:
+                UnsampledArea = sum( row[0] for row in cursor )
+
+            # Update 'while' loop conditions
+            UnsampledProportion = UnsampledArea / TotalArea
+            UnsampledZone = UnsampledZone_Erase
+            if Trace is not None:
+                Started = TransectProfile.Lap(Trace, "Erase", Started)
+
+            n += 1
+
+        else:
+            arcpy.AddMessage("\t\t---------------------------------")
+            arcpy.AddMessage("\t\tTransect {} exited UnsampledZone.".format(n))
+            arcpy.AddMessage("\t\t---------------------------------")
+            if Trace is not None:
+                TransectProfile.Count(Trace, "Exited")
+
+            # If UnsampledArea is too small, escape the 'while' loop
+            if UnsampledArea < (2.0*transect_length):
+                n = max_transects
+                if Trace is not None:
+                    TransectProfile.Count(Trace, "TooSmall")
+            # Otherwise, try to draw the next transect.
+            else:
+                n += 1
+
+        # Clean up
+        arcpy.AddMessage("\t\tCleaning up workspace..." )
+        arcpy.Delete_management(Vertex)
+        arcpy.Delete_management(Table)
+        arcpy.Delete_management(Transect)
+
+        arcpy.AddMessage(
+            "\t\tUnsampled area: {0:.2f} m".format(UnsampledArea) )
+        arcpy.AddMessage(
+            "\t\tUnsampled proportion: {0:.3f}".format(UnsampledProportion) )
+        if Trace is not None:
+            Started = TransectProfile.Lap(Trace, "Cleanup", Started)
+
+    # ------------------------- END 'WHILE' LOOP ---------------------------- #
+
+
+    # Close OutputTransects and count features
+    Result = TransectIO.CloseTransects(Sink)
+    arcpy.AddMessage("\tTotal number of transects drawn: {}".format(Result) )
+    if Trace is not None:
+        TransectProfile.Lap(Trace, "Write", Started)
+
+    return OutputTransects
+
+
+def LinearTransectsInMemory(InputPolygon, transect_length, max_transects,
+                            TargetSamplingProportion, OutputTransects,
+                            BatchSize=0, Sampler="uniform", Trace=None,
+                            CellSize=0, Trial=0, Seed=None, Pipeline=False):
+    """
+    Draws the same transects as LinearTransects with the in-memory geometry
+    engine, or on a mask of CellSize cells when CellSize is above 0.
+    InputPolygon is read once and OutputTransects is written once; no
+    intermediate datasets are created.
+
+    Dependencies:
+    import time
+    import TransectCache
+    import TransectIO
+    import TransectPipeline
+    import TransectProfile
+    import TransectSeed
+    """
+
+    if Trace is not None:
+        Started = time.perf_counter()
+    TransectIO.AddMessage("\tReading InputPolygon...")
+    Rings, SpatialReference = TransectIO.ReadPolygon(InputPolygon)
+    Polygon = TransectCache.PreparedPolygon(Rings)
+    if Trace is not None:
+        TransectProfile.Lap(Trace, "Read", Started)
+
+    TransectIO.AddMessage("\tDrawing transects...")
+    Transects, Stats = TransectSeed.DrawTrial(
+        Polygon, transect_length, max_transects, Seed, Trial,
+        TargetSamplingProportion, BatchSize, Sampler, Trace, CellSize,
+        TransectPipeline.PREFETCH_DEPTH if Pipeline else 0)
+    if Trace is not None:
+        Started = time.perf_counter()
+    TransectIO.AddMessage("\t\tTransects that exited UnsampledZone: {}"
+                          .format(Stats["Exited"]) )
+    TransectIO.AddMessage(
+        "\t\tUnsampled area: {0:.2f} m".format(Stats["UnsampledArea"]) )
+    TransectIO.AddMessage("\t\tUnsampled proportion: {0:.3f}"
+                          .format(Stats["UnsampledProportion"]) )
+
+    TransectIO.AddMessage("\tWriting transects to OutputTransects...")
+    TransectIO.WriteTransects(OutputTransects, Transects, transect_length,
+                              SpatialReference, Trial=Trial)
+    if Trace is not None:
+        TransectProfile.Lap(Trace, "Write", Started)
+    TransectIO.AddMessage("\tTotal number of transects drawn: {}"
+                          .format(len(Transects)) )
+
+    return OutputTransects
+
+
+def RegenerateTrial(InputPolygon, transect_length, max_transects, Seed,
+                    Trial, OutputTransects, WorkspaceGDB="", Engine="memory",
+                    BatchSize=0, Sampler="uniform", CellSize=0):
+    """
+    Draws trial Trial of a MaximizeNTransects run seeded with Seed again,
+    on its own, and writes it to OutputTransects. With the same inputs and
+    Engine, BatchSize, Sampler and CellSize as the run, the transects are
+    the ones that trial drew (with Engine="gdb", as far as the geoprocessing
+    tools are deterministic for a given randomGenerator seed).
+
+    Returns OutputTransects.
+
+    Dependencies:
+    import TransectSeed
+    """
+
+    return LinearTransects(InputPolygon, transect_length, max_transects, 1.0,
+                           OutputTransects, WorkspaceGDB, Engine, BatchSize,
+                           Sampler, CellSize=CellSize, Trial=Trial,
+                           Seed=Seed)
+
+
+def MaximizeNTransects(InputPolygon, transect_length, max_transects,
+                       max_iterations, WorkspaceGDB, OutputTransects,
+                       Engine="memory", BatchSize=0, Sampler="uniform",
+                       Workers=1, Seed=None,
+                       Checkpoint="", Resume=False,
+                       CheckpointEvery=TransectCheckpoint.CHECKPOINT_EVERY,
+                       Patience=0, MinChance=0.0, TimeBudget=0, Profile="",
+                       CellSize=0, Store="", Pipeline=False, Cache=False):
+    """
+    Iterates LinearTransects function up to max_iterations times to draw as
+    as close to max_transects within InputPolygon as possible.
+
+    Engine, BatchSize, Sampler, CellSize = passed to LinearTransects
+    Workers = when above 1, runs the trials across Workers processes, each
+              with its own RNG stream (and its own scratch geodatabase with
+              Engine="gdb"), and keeps only the best trial
+    Seed = seed of the run (fresh entropy if None); trial i draws from the
+           random stream of (Seed, i) only, so RegenerateTrial can draw
+           any trial again on its own (TransectSeed.py)
+    Checkpoint = optional file that records progress every CheckpointEvery
+                 trials (every chunk of trials when Workers is above 1)
+    Resume = if True, continues the run recorded in Checkpoint; a
+             sequential run may be resumed with a larger max_iterations
+    Patience = stops after this many trials without a better count
+    MinChance = stops when the estimated chance of a better count in the
+                trials left falls below this probability
+    TimeBudget = stops after this many seconds
+    (Patience, MinChance and TimeBudget are off when 0; see
+    TransectStopping.py)
+    Profile = optional JSON file for the time spent in each phase and the
+              outcome counts of each trial run, and their summary
+              (TransectProfile.py)
+    Store = optional directory the transects of every trial are saved in,
+            for analysis after the run (TransectStore.py; not with
+            Engine="gdb"). Trials run before a resume are drawn again from
+            Seed.
+    Pipeline = in a sequential run, checkpoint records and Store appends
+               go to a writer thread (TransectPipeline.py) while the next
+               trials run. Trials are drawn without prefetching, which only
+               slowed them down. The counts and transects are the same.
+    Cache = with a Seed and an in-memory Engine, and without Checkpoint,
+            keeps the counts and best trial of the run in the result cache
+            (TransectCache.py), keyed by the polygon, the parameters that
+            change the trials and Seed. A run with the same key returns the
+            cached trials at once and only runs the trials after them, when
+            max_iterations is larger. Patience and MinChance count the
+            cached trials as well, as in a run without the cache;
+            TimeBudget only counts the time of this run.
+
+    Dependences:
+    import numpy as np
+    import TransectCache
+    import TransectCheckpoint
+    import TransectIO
+    import TransectMask
+    import TransectPipeline
+    import TransectProfile
+    import TransectSeed
+    import TransectStopping
+    import TransectStore
+    import TransectTrials
+    import time
+    """
+
+    Seeded = Seed is not None and Seed != ""
+    Seed = TransectSeed.RunSeed(Seed)
+    Engine, CellSize = TransectMask.EngineCellSize(Engine, transect_length,
+                                                   CellSize)
+    if Store and Engine == "gdb":
+        raise ValueError("Store keeps trials drawn in memory; it cannot be "
+                         "used with Engine=\"gdb\"")
+    if Workers > 1:
+        TransectIO.AddMessage("Running trials on {} workers..."
+                              .format(Workers))
+        return TransectTrials.MaximizeInParallel(
+            InputPolygon, transect_length, max_transects, max_iterations,
+            OutputTransects, Workers, Engine, BatchSize, Seed,
+            LinearTransects, Sampler, Checkpoint, Resume, Patience, MinChance,
+            TimeBudget, Profile, CellSize, Store, Cache and Seeded)
+
+    TransectIO.AddMessage("Initializing iterator...")
+    Started = time.time()
+    Stopped = False
+    i = 0
+    BestCount = 0
+    BestTrial = 0
+    BestTrialFC = os.path.join( WorkspaceGDB, "BestTrial" )
+    TrialFC = os.path.join( WorkspaceGDB, "Trial" )
+    TrialCounts = ["Counts"]
+
+    # The in-memory engine reads InputPolygon once and keeps the best trial
+    # in memory; the gdb engine draws each trial to TrialFC and keeps the
+    # best one in BestTrialFC, both in WorkspaceGDB, so that it can be
+    # renamed whatever workspace OutputTransects is in
+    Unrecorded = []
+    Improved = False
+    Traces = []
+    Trace = None
+    if Engine == "memory":
+        Rings, SpatialReference = TransectIO.ReadPolygon(InputPolygon)
+        Polygon = TransectCache.PreparedPolygon(Rings)
+        BestTransects = np.empty((0, 5))
+    AllTrials = TransectStore.NewStore() if Store else None
+
+    # Seeded in-memory runs are cached without max_iterations, so a run
+    # with more iterations only runs the trials after the cached ones
+    ResultKey = None
+    Cached = None
+    if Cache and Seeded and Engine == "memory" and not Checkpoint:
+        ResultKey = TransectCache.ResultKey(Rings, transect_length,
+                                            max_transects, Engine, BatchSize,
+                                            Sampler, CellSize, Seed)
+
+    # Continue from the last record of Checkpoint, with the Seed it was
+    # started with
+    if Checkpoint:
+        Parameters = {"InputPolygon": InputPolygon,
+                      "transect_length": transect_length,
+                      "max_transects": max_transects, "Engine": Engine,
+                      "BatchSize": BatchSize, "Sampler": Sampler,
+                      "CellSize": CellSize, "Workers": 1, "Seed": Seed}
+        Log, Parameters, Records = TransectCheckpoint.OpenCheckpoint(
+            Checkpoint, Parameters, Resume)
+        Seed = Parameters["Seed"]
+        for Record in Records:
+            TrialCounts.extend(Record["Counts"])
+            if "BestTrial" in Record:
+                BestCount = Record["BestCount"]
+                BestTrial = Record["BestTrial"]
+        if Records:
+            i = Records[-1]["Iteration"]
+            TransectIO.AddMessage("Resuming at iteration {0}, best count {1}"
+                                  .format(i, BestCount) )
+
+    # Or start after the trials a cached run with the same key ran
+    elif ResultKey is not None:
+        Cached = TransectCache.LoadResult(ResultKey)
+        if Cached is not None:
+            TrialCounts.extend(TransectCache.CachedCounts(
+                Cached["Counts"], max_transects, max_iterations))
+            i = len(TrialCounts) - 1
+            if i:
+                BestTrial = int(np.argmax(TrialCounts[1:]))
+                BestCount = TrialCounts[1 + BestTrial]
+            TransectIO.AddMessage("Found {0} cached trials, best count {1}"
+                                  .format(i, BestCount) )
+
+    # The in-memory best trial so far is drawn again from its index, unless
+    # it is cached, and the trials so far are drawn again for Store
+    if i and Engine == "memory":
+        if Cached is not None and Cached["BestTrial"] == BestTrial:
+            BestTransects = Cached["Best"]
+        elif BestCount:
+            BestTransects, Stats = TransectSeed.DrawTrial(
+                Polygon, transect_length, max_transects, Seed, BestTrial,
+                1.0, BatchSize, Sampler, CellSize=CellSize)
+        if AllTrials is not None:
+            for Trial in range(i):
+                Transects, Stats = TransectSeed.DrawTrial(
+                    Polygon, transect_length, max_transects, Seed, Trial,
+                    1.0, BatchSize, Sampler, CellSize=CellSize)
+                TransectStore.AppendTrial(AllTrials, Trial, Transects)
+    if i and BestCount == max_transects:
+        i = max_iterations
+
+    # Checkpoint records and Store appends go to a writer thread with
+    # Pipeline; messages and arcpy calls stay on this thread, since arcpy
+    # is not thread-safe
+    Writer = TransectPipeline.StartWriter() if Pipeline else None
+
+    while i < max_iterations and not Stopped:
+
+        TransectIO.AddMessage("\nIteration {0} of {1}"
+                              .format(i, max_iterations))
+        
+        # Runs Random Transect Tool
+        if Profile:
+            Trace = TransectProfile.NewTrace(i)
+            Traces.append(Trace)
+        TargetSamplingProportion = 1.0
+        if Engine == "memory":
+            Transects, Stats = TransectSeed.DrawTrial(
+                Polygon, transect_length, max_transects, Seed, i,
+                TargetSamplingProportion, BatchSize, Sampler, Trace,
+                CellSize)
+            TrialCount = len(Transects)
+            if AllTrials is not None:
+                TransectPipeline.Submit(Writer, TransectStore.AppendTrial,
+                                        AllTrials, i, Transects)
+        else:
+            Trial = LinearTransects(InputPolygon, transect_length,
+                                    max_transects, TargetSamplingProportion,
+                                    TrialFC, WorkspaceGDB, Engine,
+                                    Trace=Trace, Trial=i, Seed=Seed)
+            TrialCount = TransectIO.GetCount(Trial)
+        if Trace is not None:
+            Kept = time.perf_counter()
+        TransectIO.AddMessage(
+            "\n\tNumber of transects drawn in this iteration: {}"
+            .format(TrialCount) )
+        TrialCounts.append(TrialCount)
+
+        # Present trial becomes BestTrial
+        if TrialCount > BestCount:
+            TransectIO.AddMessage("\tBest count improved!")
+            BestCount = TrialCount
+            BestTrial = i
+            if Engine == "memory":
+                BestTransects = Transects
+            else:
+                TransectIO.AddMessage("\n\tWriting new BestTrial to file...")
+                TransectIO.Rename( Trial, BestTrialFC )
+            Improved = True
+        else:
+            TransectIO.AddMessage("\tBest count is unchanged.")
+            if Engine != "memory":
+                TransectIO.Delete( Trial )
+        TransectIO.AddMessage("\n\tCurrent highest count: {}"
+                              .format(BestCount) )
+        if Trace is not None:
+            TransectProfile.Lap(Trace, "BestTrial", Kept)
+        i += 1
+
+        # If PresentTrial equals maximum transect goal, close the 'while' loop.
+        if TrialCount == max_transects:
+            TransectIO.AddMessage("Maximum number of transects achieved!")
+            i = max_iterations
+
+        # Stop early when more trials are unlikely to improve the best count
+        Reason = TransectStopping.StopReason(
+            TrialCounts[1:], max_iterations - i, time.time() - Started,
+            Patience, MinChance, TimeBudget)
+        if Reason and i < max_iterations:
+            TransectIO.AddMessage("Stopping early: {}".format(Reason))
+            Stopped = True
+
+        # Record the trials since the last record
+        if Checkpoint:
+            Unrecorded.append(TrialCount)
+            if (len(Unrecorded) >= CheckpointEvery or i >= max_iterations or
+                    Stopped):
+                Record = {"Iteration": i, "Counts": Unrecorded}
+                if Improved:
+                    Record["BestCount"] = BestCount
+                    Record["BestTrial"] = BestTrial
+                TransectPipeline.Submit(Writer,
+                                        TransectCheckpoint.AppendRecord,
+                                        Log, Record)
+                Unrecorded = []
+                Improved = False
+
+    TransectPipeline.StopWriter(Writer)
+    if Checkpoint:
+        Log.close()
+    if AllTrials is not None:
+        TransectStore.SaveStore(AllTrials, Store)
+    if ResultKey is not None and (Cached is None or
+                                  len(TrialCounts) - 1 >
+                                  len(Cached["Counts"])):
+        TransectCache.SaveResult(ResultKey, TrialCounts[1:], BestTrial,
+                                 BestTransects)
+
+    # Copy the BestTrial to disc
+    if Engine == "memory":
+        TransectIO.WriteTransects(OutputTransects, BestTransects,
+                                  transect_length, SpatialReference,
+                                  Trial=BestTrial)
+    else:
+        TransectIO.CopyFeatures( BestTrialFC, OutputTransects )
+        TransectIO.Delete( BestTrialFC )
+    if Profile:
+        TransectProfile.ReportSummary(
+            TransectProfile.WriteProfile(Profile, Traces),
+            TransectIO.AddMessage)
+    TransectIO.AddMessage("\nSeed: {0}, best trial: {1}".format(Seed,
+                                                              BestTrial) )
+    TransectIO.AddMessage("Final transect count: {}".format(BestCount) )
+
+    return OutputTransects, TrialCounts
+
+
+def OptimizeNTransects(InputPolygon, transect_length, max_transects, Steps,
+                       OutputTransects, StartTransects="", Seed=None,
+                       BatchSize=0, Sampler="uniform", CellSize=0,
+                       TimeBudget=0, History=""):
+    """
+    Draws a layout of transects within InputPolygon, or reads one, and
+    improves it in place with TransectOptimize.OptimizeTransects instead of
+    drawing more trials, then writes the best layout to OutputTransects.
+
+    Steps = number of destroy-and-repair steps of the search
+    StartTransects = optional line feature class of transects that
+                     satisfy the constraints (e.g. the OutputTransects of
+                     LinearTransects or MaximizeNTransects) to start from;
+                     otherwise trial 0 of Seed is drawn as LinearTransects
+                     draws it, with BatchSize, Sampler and CellSize
+    Seed = seed of the run (fresh entropy if None); the search draws from
+           its own stream of Seed, apart from the trial it starts from
+    TimeBudget = stops the search after this many seconds (off when 0)
+    History = optional JSON file for the count, best count, temperature,
+              transects removed and inserted, acceptance and time of each
+              step of the search
+
+    Returns OutputTransects and the History of the search.
+
+    Dependencies:
+    import json
+    import numpy as np
+    import TransectCache
+    import TransectIO
+    import TransectOptimize
+    import TransectSeed
+    """
+
+    Seed = TransectSeed.RunSeed(Seed)
+    Rings, SpatialReference = TransectIO.ReadPolygon(InputPolygon)
+    Polygon = TransectCache.PreparedPolygon(Rings)
+    if StartTransects:
+        Transects = TransectIO.ReadTransects(StartTransects)
+    else:
+        Transects, Stats = TransectSeed.DrawTrial(
+            Polygon, transect_length, max_transects, Seed, 0, 1.0,
+            BatchSize, Sampler, CellSize=CellSize)
+    TransectIO.AddMessage("Optimizing {0} transects for {1} steps..."
+                          .format(len(Transects), Steps))
+
+    # The search draws from the first stream spawned from trial 0's stream,
+    # so it never repeats the random numbers of the starting layout
+    rng = np.random.default_rng(TransectSeed.TrialStream(Seed, 0).spawn(1)[0])
+    Best, Search = TransectOptimize.OptimizeTransects(
+        Polygon, transect_length, Transects, Steps, max_transects, rng,
+        TimeBudget=TimeBudget)
+
+    TransectIO.WriteTransects(OutputTransects, Best, transect_length,
+                              SpatialReference)
+    if History:
+        with open(History, "w") as f:
+            json.dump({"Seed": Seed, "Start": len(Transects),
+                       "Steps": dict((Field, Values.tolist())
+                                     for Field, Values in Search.items())},
+                      f)
+    TransectIO.AddMessage("\nSeed: {0}, transects: {1} before, {2} after"
+                          .format(Seed, len(Transects), len(Best)) )
+
+    return OutputTransects, Search
@@ -0,0 +1,489 @@
+# TransectTrials.py
+# Created: 10/17/2026
+# Runs the independent trials of MaximizeNTransects across a process pool.
+#
+# Trials are split into chunks that worker processes run one after another.
+# Each trial draws from the random stream of (Seed, trial index)
+# (TransectSeed.py), so no two trials share random numbers and a trial draws
+# the same transects whichever worker or chunk runs it. Each worker returns
+# only the counts of its trials and its best trial. The reducer keeps the
+# best trial overall (the earliest one on ties); with the in-memory engine,
+# workers return only the index of their best trial and the parent draws
+# the best trial overall again from it.
+#
+# With Engine="gdb" each worker process creates its own scratch file
+# geodatabase, so the fixed intermediate names used by LinearTransects
+# ("Boundary", "randpt", "RandPtTable", "Transect", "Transect{n}Buf") and
+# by the trials ("Trial") never collide between workers.
+# They share one temporary directory, removed when the run ends.
+#
+# With a checkpoint, each finished chunk is recorded with its counts and
+# best trial, and a resumed run only runs the chunks that have no record.
+#
+# With Profile, each chunk also returns a trace of each of its trials
+# (TransectProfile.py). With Store, in-memory chunks return the transects of
+# all their trials in a store (TransectStore.py), merged in trial order.
+#
+# With Cache, the trials of a cached run with the same key (TransectCache.py)
+# count as a finished chunk, and only the trials after them are run.
+# -----------------------------------------------------------------------------
+
+# Imports
+import concurrent.futures
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+import TransectCache
+import TransectCheckpoint
+import TransectIO
+import TransectProfile
+import TransectSeed
+import TransectStopping
+import TransectStore
+
+# Chunks per worker; more chunks stop sooner once max_transects is reached
+CHUNKS_PER_WORKER = 8
+
+# State of the current worker process, set by the pool initializers
+_Worker = {}
+
+
+# ------------------------------ Worker side -------------------------------- #
+
+def _InitMemoryWorker(Polygon, transect_length, max_transects, BatchSize,
+                      Sampler, Profile=False, CellSize=0, KeepAll=False):
+    """Stores the prepared polygon and trial parameters in the worker."""
+
+    _Worker.update(Polygon=Polygon, transect_length=transect_length,
+                   max_transects=max_transects, BatchSize=BatchSize,
+                   Sampler=Sampler, Profile=Profile, CellSize=CellSize,
+                   KeepAll=KeepAll)
+
+
+def _RunMemoryChunk(First, Last, Seed):
+    """
+    Runs trials First to Last - 1 of the run seeded with Seed with the
+    in-memory engine.
+
+    Returns First, the count of each trial, the index of the best trial in
+    the chunk, None (its transects are drawn again from its index) or,
+    with KeepAll, a store of the transects of every trial in the chunk
+    (TransectStore.py), and the trace of each trial (empty without
+    Profile).
+    """
+
+    max_transects = _Worker["max_transects"]
+    Kept = TransectStore.NewStore() if _Worker["KeepAll"] else None
+
+    Counts = []
+    Traces = []
+    Trace = None
+    BestTrial = -1
+    for Trial in range(First, Last):
+        if _Worker["Profile"]:
+            Trace = TransectProfile.NewTrace(Trial)
+            Traces.append(Trace)
+        Transects, Stats = TransectSeed.DrawTrial(
+            _Worker["Polygon"], _Worker["transect_length"], max_transects,
+            Seed, Trial, 1.0, _Worker["BatchSize"], _Worker["Sampler"],
+            Trace, _Worker["CellSize"])
+        Counts.append(len(Transects))
+        if Kept is not None:
+            TransectStore.AppendTrial(Kept, Trial, Transects)
+        if BestTrial < 0 or len(Transects) > max(Counts[:-1]):
+            BestTrial = Trial
+        if len(Transects) == max_transects:
+            break
+
+    return First, Counts, BestTrial, Kept, Traces
+
+
+def _InitGDBWorker(LinearTransects, InputPolygon, transect_length,
+                   max_transects, RunScratch, Profile=False):
+    """
+    Creates a scratch file geodatabase for this worker process, in a
+    directory of its own under RunScratch (which the parent removes).
+
+    Dependencies:
+    import arcpy
+    """
+
+    import arcpy
+
+    Scratch = tempfile.mkdtemp(prefix="worker_", dir=RunScratch)
+    arcpy.CreateFileGDB_management(Scratch, "scratch.gdb")
+    arcpy.env.overwriteOutput = True
+    _Worker.update(LinearTransects=LinearTransects, InputPolygon=InputPolygon,
+                   transect_length=transect_length,
+                   max_transects=max_transects, Profile=Profile,
+                   WorkspaceGDB=os.path.join(Scratch, "scratch.gdb"))
+
+
+def _RunGDBChunk(First, Last, Seed):
+    """
+    Runs trials First to Last - 1 of the run seeded with Seed with the
+    geodatabase engine in this worker's scratch geodatabase. LinearTransects
+    seeds CreateRandomPoints and the bearings of each trial from its stream.
+
+    Returns First, the count of each trial, the index and feature class
+    of the best trial in the chunk, and the trace of each trial.
+
+    Dependencies:
+    import arcpy
+    """
+
+    import arcpy
+
+    WorkspaceGDB = _Worker["WorkspaceGDB"]
+    max_transects = _Worker["max_transects"]
+    BestTrialFC = os.path.join(WorkspaceGDB, "BestTrial{}".format(First))
+
+    Counts = []
+    Traces = []
+    Trace = None
+    BestTrial = -1
+    for Trial in range(First, Last):
+        if _Worker["Profile"]:
+            Trace = TransectProfile.NewTrace(Trial)
+            Traces.append(Trace)
+        TrialFC = os.path.join(WorkspaceGDB, "Trial")
+        _Worker["LinearTransects"](_Worker["InputPolygon"],
+                                   _Worker["transect_length"], max_transects,
+                                   1.0, TrialFC, WorkspaceGDB, Engine="gdb",
+                                   Trace=Trace, Trial=Trial, Seed=Seed)
+        TrialCount = int( arcpy.GetCount_management(TrialFC).getOutput(0) )
+        Counts.append(TrialCount)
+        if BestTrial < 0 or TrialCount > max(Counts[:-1]):
+            BestTrial = Trial
+            arcpy.CopyFeatures_management(TrialFC, BestTrialFC)
+        arcpy.Delete_management(TrialFC)
+        if TrialCount == max_transects:
+            break
+
+    return First, Counts, BestTrial, BestTrialFC, Traces
+
+
+# ------------------------------ Parent side -------------------------------- #
+
+def _RemoveScratch(RunScratch, Finished):
+    """
+    Removes RunScratch, and the scratch directories of earlier runs that
+    the best trials in Finished (recorded by a checkpoint) were kept in.
+
+    Dependencies:
+    import os
+    import shutil
+    """
+
+    Directories = set([RunScratch])
+    for Result in Finished:
+        if isinstance(Result[3], str):
+            # RunScratch/worker_*/scratch.gdb/BestTrial*
+            Directories.add(os.path.dirname(os.path.dirname(
+                os.path.dirname(Result[3]))))
+    for Directory in Directories:
+        shutil.rmtree(Directory, ignore_errors=True)
+
+
+def _RedrawChunk(Polygon, transect_length, max_transects, Seed, First, n,
+                 BatchSize, Sampler, CellSize):
+    """
+    Draws trials First to First + n - 1 of the run seeded with Seed again.
+
+    Returns a store (TransectStore.py) of their transects, in trial order.
+
+    Dependencies:
+    import TransectSeed
+    import TransectStore
+    """
+
+    Store = TransectStore.NewStore()
+    for Trial in range(First, First + n):
+        Transects, Stats = TransectSeed.DrawTrial(
+            Polygon, transect_length, max_transects, Seed, Trial, 1.0,
+            BatchSize, Sampler, CellSize=CellSize)
+        TransectStore.AppendTrial(Store, Trial, Transects)
+    return Store
+
+
+def _CountsInOrder(Starts, Results):
+    """
+    Returns the counts of the chunks in Results that start at Starts[0],
+    Starts[1]... up to the first chunk not finished yet, in trial order.
+    """
+
+    ByStart = dict((Result[0], Result[1]) for Result in Results)
+    Counts = []
+    for First in Starts:
+        if First not in ByStart:
+            break
+        Counts.extend(ByStart[First])
+    return Counts
+
+
+def RunTrials(Workers, Initializer, InitArgs, RunChunk, max_transects,
+              max_iterations, Seed=None, Log=None, Finished=(),
+              Stopping=None, FirstTrial=0):
+    """
+    Runs max_iterations trials across Workers processes and reduces them.
+
+    Initializer, InitArgs = pool initializer and its arguments
+    RunChunk = function(First, Last, Seed) run in the workers, returning
+               First, Counts, BestTrial, Best, Traces
+    Seed = seed of the run, from which each trial draws its own stream
+           (TransectSeed.RunSeed)
+    Log = open checkpoint (TransectCheckpoint.OpenCheckpoint) that each
+          finished chunk is recorded in
+    Finished = results of chunks recorded by an earlier run with the same
+               Seed, which are not run again
+    Stopping = keyword arguments of TransectStopping.StopReason (Patience,
+               MinChance, TimeBudget), given the counts of the trials
+               finished so far in trial order, up to the first chunk still
+               running; once it gives a reason, chunks not started are
+               skipped
+    FirstTrial = first trial to split into chunks; the trials before it
+                 must be in Finished
+
+    Returns TrialCounts (one count per finished trial, in trial order),
+    BestTrial, BestCount and Best, the layout RunChunk returned for it (or,
+    when chunks return stores, the stores of all chunks run now merged in
+    trial order), and the Traces of the trials run now, in trial order.
+
+    Dependencies:
+    import concurrent.futures
+    import TransectCheckpoint
+    import TransectStopping
+    import time
+    """
+
+    Started = time.time()
+    ChunkSize = max(1, -(-(max_iterations - FirstTrial) //
+                         (Workers * CHUNKS_PER_WORKER)))
+    Bounds = [(First, min(max_iterations, First + ChunkSize))
+              for First in range(FirstTrial, max_iterations, ChunkSize)]
+
+    Results = list(Finished)
+    Done = set(Result[0] for Result in Results)
+    Reached = any(max(Result[1] or [0]) == max_transects
+                  for Result in Results)
+    Remaining = [(First, Last) for First, Last in Bounds
+                 if First not in Done and not Reached]
+    Starts = sorted(Done | set(First for First, Last in Bounds))
+
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=Workers, initializer=Initializer,
+            initargs=InitArgs) as Pool:
+        Futures = [Pool.submit(RunChunk, First, Last, Seed)
+                   for First, Last in Remaining]
+        for Future in concurrent.futures.as_completed(Futures):
+            if Future.cancelled():
+                continue
+            Results.append(Future.result())
+            TransectIO.AddMessage("\tFinished {0} of {1} trials"
+                                  .format(sum(len(r[1]) for r in Results),
+                                          max_iterations))
+            if Log is not None:
+                First, Counts, ChunkBestTrial, ChunkBest, Traces = Results[-1]
+                Record = {"Chunk": First, "Counts": Counts,
+                          "BestTrial": ChunkBestTrial}
+                if isinstance(ChunkBest, str):
+                    Record["Best"] = ChunkBest
+                TransectCheckpoint.AppendRecord(Log, Record)
+
+            # Once any trial reaches max_transects, or more trials are
+            # unlikely to improve the best count, skip chunks not started.
+            # The stopping rules see the counts in trial order, so only
+            # the chunks finished without a gap before them
+            Counts = _CountsInOrder(Starts, Results)
+            Reason = TransectStopping.StopReason(
+                Counts, max_iterations - len(Counts), time.time() - Started,
+                **(Stopping or {}))
+            if max(Results[-1][1] or [0]) == max_transects or Reason:
+                if Reason and len(Counts) < max_iterations:
+                    TransectIO.AddMessage("Stopping early: {}"
+                                          .format(Reason))
+                for Pending in Futures:
+                    Pending.cancel()
+
+    Results.sort(key=lambda Result: Result[0])
+    TrialCounts = []
+    AllTraces = []
+    BestTrial, BestCount, Best = -1, -1, None
+    Merged = None
+    for First, Counts, ChunkBestTrial, ChunkBest, Traces in Results:
+        TrialCounts.extend(Counts)
+        AllTraces.extend(Traces)
+        if Counts and max(Counts) > BestCount:
+            BestTrial, BestCount, Best = ChunkBestTrial, max(Counts), ChunkBest
+        if isinstance(ChunkBest, dict):
+            if Merged is None:
+                Merged = TransectStore.NewStore()
+            TransectStore.ExtendStore(Merged, ChunkBest)
+
+    if Merged is not None:
+        Best = Merged
+    return TrialCounts, BestTrial, BestCount, Best, AllTraces
+
+
+def MaximizeInParallel(InputPolygon, transect_length, max_transects,
+                       max_iterations, OutputTransects, Workers=None,
+                       Engine="memory", BatchSize=0, Seed=None,
+                       LinearTransects=None, Sampler="uniform", Checkpoint="",
+                       Resume=False,
+                       Patience=0, MinChance=0.0, TimeBudget=0, Profile="",
+                       CellSize=0, Store="", Cache=False):
+    """
+    Runs the trials of MaximizeNTransects across Workers processes and
+    writes the best trial to OutputTransects.
+
+    Workers = number of worker processes (all CPUs if None)
+    Engine = "memory" runs trials with TransectGeometry.DrawTransects;
+             "gdb" runs LinearTransects (required) in a scratch
+             geodatabase per worker
+    BatchSize, Sampler, CellSize = passed to DrawTransects
+                                   (Engine="memory" only)
+    Seed = seed of the run (fresh entropy if None); trial i draws from the
+           random stream of (Seed, i) whichever worker runs it
+    Checkpoint = optional file that each finished chunk of trials is
+                 recorded in
+    Resume = if True, runs only the chunks Checkpoint has no record of,
+             with the seed it was started with; max_iterations and Workers
+             must be unchanged
+    Patience, MinChance, TimeBudget = stopping rules, checked as chunks
+                                      finish (TransectStopping.py)
+    Profile = optional JSON file for the trace of each trial run and their
+              summary (TransectProfile.py)
+    Store = optional directory the transects of every trial are saved in
+            (TransectStore.py; Engine="memory" only). Trials recorded by
+            Checkpoint before a resume are drawn again from Seed.
+    Cache = with Engine="memory" and without Checkpoint, starts after the
+            trials of the cached run with the same key and caches the
+            result (see MaximizeNTransects)
+
+    Returns OutputTransects and TrialCounts, as MaximizeNTransects does.
+
+    Dependencies:
+    import multiprocessing
+    import shutil
+    import tempfile
+    import TransectCache
+    import TransectCheckpoint
+    import TransectIO
+    import TransectProfile
+    import TransectSeed
+    import TransectStore
+    """
+
+    if Workers is None:
+        Workers = multiprocessing.cpu_count()
+
+    # Trials draw from streams of Seed, so a checkpoint keeps it
+    Log, Finished = None, []
+    Seed = TransectSeed.RunSeed(Seed)
+    if Checkpoint:
+        Parameters = {"InputPolygon": InputPolygon,
+                      "transect_length": transect_length,
+                      "max_transects": max_transects,
+                      "max_iterations": max_iterations, "Engine": Engine,
+                      "BatchSize": BatchSize, "Sampler": Sampler,
+                      "CellSize": CellSize, "Workers": Workers,
+                      "Seed": Seed}
+        Log, Parameters, Records = TransectCheckpoint.OpenCheckpoint(
+            Checkpoint, Parameters, Resume)
+        Seed = Parameters["Seed"]
+        Finished = [(Record["Chunk"], Record["Counts"], Record["BestTrial"],
+                     Record.get("Best"), [])
+                    for Record in Records]
+        if Finished:
+            TransectIO.AddMessage("Resuming after {} recorded trials"
+                                  .format(sum(len(r[1]) for r in Finished)))
+    Stopping = {"Patience": Patience, "MinChance": MinChance,
+                "TimeBudget": TimeBudget}
+
+    if Engine == "memory":
+        Rings, SpatialReference = TransectIO.ReadPolygon(InputPolygon)
+        Polygon = TransectCache.PreparedPolygon(Rings)
+
+        # The trials of a cached run are one finished chunk
+        ResultKey, Cached, FirstTrial = None, None, 0
+        if Cache and not Checkpoint:
+            ResultKey = TransectCache.ResultKey(
+                Rings, transect_length, max_transects, Engine, BatchSize,
+                Sampler, CellSize, Seed)
+            Cached = TransectCache.LoadResult(ResultKey)
+        if Cached is not None:
+            Counts = TransectCache.CachedCounts(
+                Cached["Counts"], max_transects, max_iterations)
+            FirstTrial = len(Counts)
+            if Counts:
+                Finished = [(0, Counts, Counts.index(max(Counts)), None,
+                             [])]
+            TransectIO.AddMessage("Found {0} cached trials, best count {1}"
+                                  .format(FirstTrial, max(Counts or [0])))
+
+        # Trials finished before this run are drawn again for Store, into
+        # the store of their chunk, so RunTrials merges all in trial order
+        if Store:
+            Finished = [(First, Counts, ChunkBestTrial,
+                         _RedrawChunk(Polygon, transect_length, max_transects,
+                                      Seed, First, len(Counts), BatchSize,
+                                      Sampler, CellSize), Traces)
+                        for First, Counts, ChunkBestTrial, ChunkBest, Traces
+                        in Finished]
+
+        TrialCounts, BestTrial, BestCount, Best, Traces = RunTrials(
+            Workers, _InitMemoryWorker,
+            (Polygon, transect_length, max_transects, BatchSize, Sampler,
+             bool(Profile), CellSize, bool(Store)),
+            _RunMemoryChunk, max_transects, max_iterations, Seed, Log,
+            Finished, Stopping, FirstTrial)
+        if Store:
+            Kept = Best if Best is not None else TransectStore.NewStore()
+            TransectStore.SaveStore(Kept, Store)
+            Best = TransectStore.TrialTransects(Kept, BestTrial)
+        elif Cached is not None and Cached["BestTrial"] == BestTrial:
+            Best = Cached["Best"]
+        else:
+            Best, Stats = TransectSeed.DrawTrial(
+                Polygon, transect_length, max_transects, Seed, BestTrial,
+                1.0, BatchSize, Sampler, CellSize=CellSize)
+        if ResultKey is not None and (Cached is None or
+                                      len(TrialCounts) >
+                                      len(Cached["Counts"])):
+            TransectCache.SaveResult(ResultKey, TrialCounts, BestTrial, Best)
+        TransectIO.WriteTransects(OutputTransects, Best, transect_length,
+                                  SpatialReference, Trial=BestTrial)
+    else:
+        # The scratch geodatabases of the workers are removed once the best
+        # trial is copied out. A run with a checkpoint that fails keeps
+        # them, since its records point at the best trial of each chunk
+        RunScratch = tempfile.mkdtemp(prefix="transects_")
+        try:
+            TrialCounts, BestTrial, BestCount, Best, Traces = RunTrials(
+                Workers, _InitGDBWorker,
+                (LinearTransects, InputPolygon, transect_length,
+                 max_transects, RunScratch, bool(Profile)),
+                _RunGDBChunk, max_transects, max_iterations, Seed, Log,
+                Finished, Stopping)
+            TransectIO.CopyFeatures(Best, OutputTransects)
+        except BaseException:
+            if Log is None:
+                shutil.rmtree(RunScratch, ignore_errors=True)
+            raise
+        _RemoveScratch(RunScratch, Finished)
+
+    if Log is not None:
+        Log.close()
+    if Profile:
+        TransectProfile.ReportSummary(
+            TransectProfile.WriteProfile(Profile, Traces),
+            TransectIO.AddMessage)
+
+    TransectIO.AddMessage("\nSeed: {0}, best trial: {1}".format(Seed,
+                                                              BestTrial) )
+    TransectIO.AddMessage("Final transect count: {}".format(BestCount) )
+
+    return OutputTransects, ["Counts"] + TrialCounts
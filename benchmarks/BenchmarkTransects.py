@@ -0,0 +1,376 @@
+# BenchmarkTransects.py
+# Created: 10/17/2026
+# Measures how fast the in-memory engine places transects and how many it
+# places, on a fixed set of polygons, so that samplers and backends can be
+# compared and regressions caught.
+#
+# Fixtures are synthetic polygons of growing area and complexity (convex,
+# concave, holed, thousands of vertices) plus PrincetonFarmShp. Each
+# fixture is run with each configuration for a number of seeded trials, and
+# the harness reports candidates/s, accepted transects/s, rejection rate,
+# peak memory (tracemalloc, measured in a separate trial) and the
+# distribution of the final counts. Results are saved as JSON; --compare
+# reports the change from an earlier results file and fails when the
+# throughput of any run drops by more than --tolerance.
+#
+# --maximize also runs the trials of MaximizeNTransects with --seed, as
+# TransectSeed.DrawTrial draws them for a run with that Seed, up to
+# --max-trials, and reports the best count reached within each budget of
+# trials (1, 2, 5, 10, 20, 50...) and the time per trial, so changes to the
+# engine can be judged by the count a run reaches as well as by its speed.
+#
+# Usage:
+# python benchmarks/BenchmarkTransects.py --output results.json
+# python benchmarks/BenchmarkTransects.py --compare results.json
+# python benchmarks/BenchmarkTransects.py --maximize --max-trials 50
+# -----------------------------------------------------------------------------
+
+# Imports
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import TransectGeometry
+import TransectIO
+import TransectSeed
+
+PRINCETON_FARM = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "PrincetonFarmShp", "PrincetonFarm.shp")
+
+# Keyword arguments of TransectGeometry.DrawTransects for each configuration.
+# The sequential loop counts attempts toward max_transects, so it gets a
+# budget of attempts; the others fill the polygon. CellsPerTransect sets
+# CellSize from the transect_length of the fixture.
+CONFIGURATIONS = {"sequential": {"BatchSize": 0, "max_transects": 1000},
+                  "batched": {"BatchSize": 4096},
+                  "freespace": {"Sampler": "freespace"},
+                  "raster": {"CellsPerTransect": 10}}
+
+# max_transects of configurations that fill the polygon
+FILL = 10**6
+
+
+# ------------------------------- Fixtures ---------------------------------- #
+
+def _Circle(Radius, Vertices, Center=(0.0, 0.0)):
+    """Returns a (Vertices, 2) ring approximating a circle."""
+
+    Angle = np.linspace(0.0, 2.0 * np.pi, Vertices, endpoint=False)
+    return np.column_stack([Center[0] + Radius * np.cos(Angle),
+                            Center[1] + Radius * np.sin(Angle)])
+
+
+def Fixtures():
+    """
+    Returns the benchmark polygons as a dictionary of name to (Rings,
+    transect_length). Synthetic polygons use a fixed seed and meters.
+    """
+
+    rng = np.random.default_rng(2017)
+    Fixtures = {}
+
+    # Convex: a square and a large 64-gon
+    Fixtures["convex_square_1km"] = (
+        [np.array([[0, 0], [1000, 0], [1000, 1000], [0, 1000]], float)],
+        100.0)
+    Fixtures["convex_64gon_5km"] = ([_Circle(2500.0, 64)], 150.0)
+
+    # Concave: a comb whose teeth are about two transects wide, and a star
+    Comb = [[0, 0], [3000, 0]]
+    for x in range(3000, 0, -500):
+        Comb += [[x, 2000], [x - 250, 2000], [x - 250, 400], [x - 500, 400]]
+    Fixtures["concave_comb_3km"] = ([np.array(Comb, float)], 100.0)
+    Angle = np.linspace(0.0, 2.0 * np.pi, 24, endpoint=False)
+    Radius = np.where(np.arange(24) % 2 == 0, 2000.0, 900.0)
+    Fixtures["concave_star_4km"] = (
+        [np.column_stack([Radius * np.cos(Angle), Radius * np.sin(Angle)])],
+        150.0)
+
+    # Holed: a 3 km square with a grid of round holes (ponds)
+    Holes = [_Circle(150.0, 32, (x, y))[::-1]
+             for x in (600, 1500, 2400) for y in (600, 1500, 2400)]
+    Fixtures["holed_square_3km"] = (
+        [np.array([[0, 0], [3000, 0], [3000, 3000], [0, 3000]], float)] +
+        Holes, 100.0)
+
+    # Complex: a noisy 5000-vertex outline, like a digitized field boundary
+    Angle = np.linspace(0.0, 2.0 * np.pi, 5000, endpoint=False)
+    Radius = 2000.0 * (1.0 + 0.15 * np.sin(7 * Angle) +
+                       0.02 * rng.standard_normal(5000))
+    Fixtures["complex_5000_vertices"] = (
+        [np.column_stack([Radius * np.cos(Angle), Radius * np.sin(Angle)])],
+        100.0)
+
+    if os.path.exists(PRINCETON_FARM):
+        Rings, SpatialReference = TransectIO.ReadPolygon(PRINCETON_FARM)
+        Fixtures["princeton_farm"] = (Rings, 150.0)
+
+    return Fixtures
+
+
+# ------------------------------- Running ----------------------------------- #
+
+def RunBenchmark(Rings, transect_length, Configuration, Trials, Seed):
+    """
+    Runs Trials seeded trials of one fixture and configuration.
+
+    Returns a dictionary of throughput, rejection rate, peak memory and
+    count distribution.
+
+    Dependencies:
+    import numpy as np
+    import time
+    import tracemalloc
+    import TransectGeometry
+    """
+
+    Start = time.perf_counter()
+    Polygon = TransectGeometry.PreparePolygon(Rings)
+    PrepareSeconds = time.perf_counter() - Start
+
+    max_transects, Configuration = _Configure(Configuration,
+                                              transect_length)
+    Streams = np.random.SeedSequence(Seed).spawn(Trials + 1)
+    Counts, Candidates, Seconds = [], 0, 0.0
+    for Stream in Streams[:Trials]:
+        Start = time.perf_counter()
+        Transects, Stats = TransectGeometry.DrawTransects(
+            Polygon, transect_length, max_transects, 1.0,
+            np.random.default_rng(Stream), **Configuration)
+        Seconds += time.perf_counter() - Start
+        Counts.append(len(Transects))
+        Candidates += Stats["Candidates"]
+
+    # Peak memory of one more trial, traced apart from the timed trials
+    tracemalloc.start()
+    TransectGeometry.DrawTransects(Polygon, transect_length, max_transects,
+                                   1.0, np.random.default_rng(Streams[-1]),
+                                   **Configuration)
+    Current, Peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    Accepted = sum(Counts)
+    Values, Frequency = np.unique(Counts, return_counts=True)
+    return {"Vertices": int(len(Polygon["Vertices"])),
+            "Area": Polygon["Area"],
+            "transect_length": transect_length,
+            "max_transects": max_transects,
+            "Trials": Trials,
+            "PrepareSeconds": PrepareSeconds,
+            "Seconds": Seconds,
+            "Candidates": int(Candidates),
+            "Accepted": int(Accepted),
+            "CandidatesPerSecond": Candidates / Seconds,
+            "AcceptedPerSecond": Accepted / Seconds,
+            "RejectionRate": 1.0 - Accepted / max(Candidates, 1),
+            "PeakMemoryMB": Peak / 2.0**20,
+            "CountMean": float(np.mean(Counts)),
+            "CountStd": float(np.std(Counts)),
+            "CountMin": int(np.min(Counts)),
+            "CountMax": int(np.max(Counts)),
+            "CountHistogram": {str(v): int(f)
+                               for v, f in zip(Values, Frequency)}}
+
+
+def _Configure(Configuration, transect_length):
+    """
+    Returns max_transects and the DrawTransects keyword arguments of a
+    configuration for a fixture of transect_length.
+    """
+
+    Configuration = dict(Configuration)
+    max_transects = Configuration.pop("max_transects", FILL)
+    if "CellsPerTransect" in Configuration:
+        Configuration["CellSize"] = (transect_length /
+                                     Configuration.pop("CellsPerTransect"))
+    return max_transects, Configuration
+
+
+def Budgets(MaxTrials):
+    """Returns the trial budgets 1, 2, 5, 10, 20, 50... up to MaxTrials."""
+
+    Budgets = []
+    Scale = 1
+    while Scale <= MaxTrials:
+        Budgets.extend(b * Scale for b in (1, 2, 5) if b * Scale <= MaxTrials)
+        Scale *= 10
+    if Budgets[-1] != MaxTrials:
+        Budgets.append(MaxTrials)
+    return Budgets
+
+
+def RunMaximize(Rings, transect_length, Configuration, MaxTrials, Seed):
+    """
+    Runs trials 0 to MaxTrials - 1 of a MaximizeNTransects run seeded with
+    Seed on one fixture and configuration.
+
+    Returns a dictionary of the best count within each trial budget, the
+    trial of the best count, and the seconds per trial.
+
+    Dependencies:
+    import numpy as np
+    import time
+    import TransectGeometry
+    import TransectSeed
+    """
+
+    Polygon = TransectGeometry.PreparePolygon(Rings)
+    max_transects, Configuration = _Configure(Configuration,
+                                              transect_length)
+    Counts = []
+    Start = time.perf_counter()
+    for Trial in range(MaxTrials):
+        Transects, Stats = TransectSeed.DrawTrial(
+            Polygon, transect_length, max_transects, Seed, Trial, 1.0,
+            **Configuration)
+        Counts.append(len(Transects))
+    Seconds = time.perf_counter() - Start
+
+    Best = np.maximum.accumulate(Counts)
+    return {"transect_length": transect_length,
+            "max_transects": max_transects,
+            "Seed": Seed,
+            "Trials": MaxTrials,
+            "Seconds": Seconds,
+            "SecondsPerTrial": Seconds / MaxTrials,
+            "BestTrial": int(np.argmax(Counts)),
+            "BestByBudget": {str(b): int(Best[b - 1])
+                             for b in Budgets(MaxTrials)}}
+
+
+def Compare(Results, Baseline, Tolerance):
+    """
+    Prints the change in throughput and mean count from Baseline for every
+    run in both. Returns the runs whose accepted transects/s fell by more
+    than Tolerance (a fraction).
+    """
+
+    Slower = []
+    for Name, Run in sorted(Results["Runs"].items()):
+        if Name not in Baseline["Runs"]:
+            continue
+        Old = Baseline["Runs"][Name]
+        Speed = Run["AcceptedPerSecond"] / Old["AcceptedPerSecond"] - 1.0
+        Count = Run["CountMean"] - Old["CountMean"]
+        print("{0:<40} accepted/s {1:+7.1%}  mean count {2:+7.2f}"
+              .format(Name, Speed, Count))
+        if Speed < -Tolerance:
+            Slower.append(Name)
+
+    # Best counts of the same seeded trials only change with the engine
+    for Name, Run in sorted(Results.get("Maximize", {}).items()):
+        Old = Baseline.get("Maximize", {}).get(Name)
+        if Old is None or Old["Seed"] != Run["Seed"]:
+            continue
+        Budget = str(min(Run["Trials"], Old["Trials"]))
+        if Budget not in Run["BestByBudget"] or \
+                Budget not in Old["BestByBudget"]:
+            continue
+        print("{0:<40} s/trial {1:+7.1%}  best of {2} {3:+5d}".format(
+            Name, Run["SecondsPerTrial"] / Old["SecondsPerTrial"] - 1.0,
+            Budget, Run["BestByBudget"][Budget] -
+            Old["BestByBudget"][Budget]))
+    return Slower
+
+
+def main(Arguments=None):
+    """Runs the benchmarks from the command line."""
+
+    Parser = argparse.ArgumentParser(
+        description="Benchmarks transect placement throughput and quality")
+    Parser.add_argument("--output", default="",
+                        help="JSON file to save the results to")
+    Parser.add_argument("--fixtures", nargs="*",
+                        help="fixtures to run (all by default)")
+    Parser.add_argument("--configurations", nargs="*",
+                        choices=sorted(CONFIGURATIONS),
+                        default=sorted(CONFIGURATIONS),
+                        help="DrawTransects configurations to run")
+    Parser.add_argument("--trials", type=int, default=5,
+                        help="seeded trials per run")
+    Parser.add_argument("--seed", type=int, default=2017)
+    Parser.add_argument("--compare", default="",
+                        help="earlier results file to compare with")
+    Parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="largest allowed drop in accepted/s")
+    Parser.add_argument("--maximize", action="store_true",
+                        help="also run the seeded trials of "
+                        "MaximizeNTransects and report the best count "
+                        "per trial budget")
+    Parser.add_argument("--max-trials", type=int, default=50,
+                        help="trials of each --maximize run")
+    Arguments = Parser.parse_args(Arguments)
+
+    Results = {"Created": time.strftime("%Y-%m-%d %H:%M:%S"),
+               "Python": platform.python_version(),
+               "NumPy": np.__version__,
+               "Platform": platform.platform(),
+               "Seed": Arguments.seed,
+               "Trials": Arguments.trials,
+               "Runs": {}}
+    if Arguments.maximize:
+        Results["Maximize"] = {}
+
+    print("{0:<40} {1:>10} {2:>10} {3:>7} {4:>8} {5:>12}".format(
+        "run", "cand/s", "acc/s", "reject", "peak MB", "count"))
+    for Name, (Rings, transect_length) in sorted(Fixtures().items()):
+        if Arguments.fixtures and Name not in Arguments.fixtures:
+            continue
+        for Configuration in Arguments.configurations:
+            Run = RunBenchmark(Rings, transect_length,
+                               CONFIGURATIONS[Configuration],
+                               Arguments.trials, Arguments.seed)
+            Key = "{0}/{1}".format(Name, Configuration)
+            Results["Runs"][Key] = Run
+            print("{0:<40} {1:>10.0f} {2:>10.1f} {3:>7.3f} {4:>8.1f} "
+                  "{5:>6.1f}+-{6:<4.1f}".format(
+                      Key, Run["CandidatesPerSecond"],
+                      Run["AcceptedPerSecond"], Run["RejectionRate"],
+                      Run["PeakMemoryMB"], Run["CountMean"],
+                      Run["CountStd"]))
+
+    if Arguments.maximize:
+        print("\n{0:<40} {1:>8} {2}".format(
+            "maximize", "s/trial", "best count within 1, 2, 5... trials"))
+    for Name, (Rings, transect_length) in sorted(Fixtures().items()):
+        if not Arguments.maximize or (Arguments.fixtures and
+                                      Name not in Arguments.fixtures):
+            continue
+        for Configuration in Arguments.configurations:
+            Run = RunMaximize(Rings, transect_length,
+                              CONFIGURATIONS[Configuration],
+                              Arguments.max_trials, Arguments.seed)
+            Key = "{0}/{1}".format(Name, Configuration)
+            Results["Maximize"][Key] = Run
+            print("{0:<40} {1:>8.3f} {2}".format(
+                Key, Run["SecondsPerTrial"],
+                " ".join(str(Run["BestByBudget"][str(b)])
+                         for b in Budgets(Run["Trials"]))))
+
+    if Arguments.output:
+        with open(Arguments.output, "w") as f:
+            json.dump(Results, f, indent=2, sort_keys=True)
+
+    if Arguments.compare:
+        with open(Arguments.compare) as f:
+            Slower = Compare(Results, json.load(f), Arguments.tolerance)
+        if Slower:
+            print("Slower than {0}: {1}".format(Arguments.compare,
+                                                ", ".join(Slower)))
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+# test_TransectCheckpoint.py
+# Created: 10/17/2026
+# Checks that a sequential MaximizeNTransects run resumed from its
+# checkpoint (TransectCheckpoint.py), torn last line included, ends with the
+# same counts and best transects as the run left uninterrupted.
+#
+# Usage:
+# python -m pytest tests
+# -----------------------------------------------------------------------------
+
+# Imports
+import os
+import sys
+
+import numpy as np
+import pytest
+
+Root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, Root)
+
+import TransectIO
+import TransectTools
+
+PRINCETON_FARM = os.path.join(Root, "PrincetonFarmShp", "PrincetonFarm.shp")
+
+
+@pytest.mark.skipif(not os.path.exists(PRINCETON_FARM),
+                    reason="PrincetonFarmShp is not available")
+def test_ResumedRunMatchesUninterruptedRun(tmp_path):
+    """Resuming after the first record gives the uninterrupted result."""
+
+    TransectIO.UseArcpy(False)
+    Run = dict(InputPolygon=PRINCETON_FARM, transect_length=150.0,
+               max_transects=200, max_iterations=6, WorkspaceGDB="",
+               BatchSize=512, Seed=2017, CheckpointEvery=2)
+
+    Checkpoint = str(tmp_path / "run.ckpt")
+    Full, FullCounts = TransectTools.MaximizeNTransects(
+        OutputTransects=str(tmp_path / "full.shp"), Checkpoint=Checkpoint,
+        **Run)
+
+    # Keep the parameters and the first record, and tear the next one
+    with open(Checkpoint, "rb") as f:
+        Lines = f.readlines()
+    assert len(Lines) == 4
+    with open(Checkpoint, "wb") as f:
+        f.writelines(Lines[:2])
+        f.write(Lines[2][:len(Lines[2]) // 2])
+
+    Resumed, ResumedCounts = TransectTools.MaximizeNTransects(
+        OutputTransects=str(tmp_path / "resumed.shp"), Checkpoint=Checkpoint,
+        Resume=True, **Run)
+
+    assert ResumedCounts == FullCounts
+    assert np.array_equal(TransectIO.ReadTransects(Resumed),
+                          TransectIO.ReadTransects(Full))
@@ -0,0 +1,205 @@
+# test_TransectGeometry.py
+# Created: 10/17/2026
+# Checks the in-memory geometry engine (TransectGeometry.py) against exact
+# areas and brute-force counts, and its grid-indexed tests (PointsInPolygon,
+# SegmentsCrossBoundary, ClearOfGrid) against brute force over every edge
+# or transect on the benchmark fixtures.
+#
+# Usage:
+# python -m pytest tests
+# -----------------------------------------------------------------------------
+
+# Imports
+import os
+import sys
+
+import numpy as np
+import pytest
+
+Root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, Root)
+sys.path.insert(0, os.path.join(Root, "benchmarks"))
+
+import BenchmarkTransects
+import TransectGeometry
+
+_Fixtures = BenchmarkTransects.Fixtures()
+
+
+def _Square(Size):
+    """Returns a prepared square polygon of side Size at the origin."""
+
+    return TransectGeometry.PreparePolygon(
+        [np.array([[0, 0], [Size, 0], [Size, Size], [0, Size]], float)])
+
+
+def _Erased(Polygon, Transects, transect_length):
+    """Returns the area each of Transects erases, accepted in order."""
+
+    Transects = np.asarray(Transects, dtype=float)
+    Grid = TransectGeometry.TransectGrid(Polygon, transect_length, Transects)
+    Areas = []
+    for Row in range(len(Transects)):
+        TransectGeometry.AddToGrid(Grid, Row)
+        Areas.append(TransectGeometry.ErasedArea(Polygon, Grid, Row))
+    return Areas
+
+
+def _AllEdges(Polygon):
+    """Returns Polygon without its edge grid, so every edge is tested."""
+
+    return dict((Key, Value) for Key, Value in Polygon.items()
+                if Key != "CellEdges")
+
+
+def _Probes(Polygon, n, Length, rng):
+    """
+    Returns x0, y0, x1, y1 of n segments of Length: half start anywhere in
+    the bounding box of Polygon, half next to its vertices.
+    """
+
+    xmin, ymin, xmax, ymax = Polygon["BBox"]
+    x = rng.uniform(xmin - Length, xmax + Length, n)
+    y = rng.uniform(ymin - Length, ymax + Length, n)
+    Near = rng.integers(0, len(Polygon["Vertices"]), n // 2)
+    x[:n // 2] = Polygon["Vertices"][Near, 0] + rng.normal(0, Length / 10,
+                                                           n // 2)
+    y[:n // 2] = Polygon["Vertices"][Near, 1] + rng.normal(0, Length / 10,
+                                                           n // 2)
+    x1, y1 = TransectGeometry.TransectEndpoints(
+        x, y, rng.integers(1, 361, n).astype(np.float64), Length)
+    return x, y, x1, y1
+
+
+# --------------------------- Grid vs brute force --------------------------- #
+
+@pytest.mark.parametrize("Name", sorted(_Fixtures))
+def test_PointsInPolygonMatchesBruteForce(Name):
+    """The edge grid gives the even-odd result over every edge."""
+
+    Rings, transect_length = _Fixtures[Name]
+    Polygon = TransectGeometry.PreparePolygon(Rings)
+    x, y, x1, y1 = _Probes(Polygon, 20000, transect_length,
+                           np.random.default_rng(1))
+    Inside = TransectGeometry.PointsInPolygon(Polygon, x, y)
+    assert np.array_equal(
+        Inside, TransectGeometry.PointsInPolygon(_AllEdges(Polygon), x, y))
+    assert Inside.any() and not Inside.all()
+
+    # And a plain ray cast, one point at a time, on a few of them
+    ax, ay, bx, by = Polygon["Edges"].T
+    for i in range(0, len(x), 400):
+        Straddle = (ay > y[i]) != (by > y[i])
+        Cross = ax[Straddle] + ((y[i] - ay[Straddle]) *
+                                (bx[Straddle] - ax[Straddle]) /
+                                (by[Straddle] - ay[Straddle]))
+        assert Inside[i] == (np.count_nonzero(x[i] < Cross) % 2 == 1)
+
+
+@pytest.mark.parametrize("Name", sorted(_Fixtures))
+def test_SegmentsCrossBoundaryMatchesBruteForce(Name):
+    """The edge grid finds the same crossings as testing every edge."""
+
+    Rings, transect_length = _Fixtures[Name]
+    Polygon = TransectGeometry.PreparePolygon(Rings)
+    x0, y0, x1, y1 = _Probes(Polygon, 20000, transect_length,
+                             np.random.default_rng(2))
+    Cross = TransectGeometry.SegmentsCrossBoundary(Polygon, x0, y0, x1, y1)
+    assert np.array_equal(Cross, TransectGeometry.SegmentsCrossBoundary(
+        _AllEdges(Polygon), x0, y0, x1, y1))
+    assert Cross.any() and not Cross.all()
+
+
+@pytest.mark.parametrize("Name", sorted(_Fixtures))
+def test_ClearOfGridMatchesBruteForce(Name):
+    """The transect grid gives the same answer as every transect."""
+
+    Rings, transect_length = _Fixtures[Name]
+    Polygon = TransectGeometry.PreparePolygon(Rings)
+    Transects, Stats = TransectGeometry.DrawTransects(
+        Polygon, transect_length, 10**6, 1.0, np.random.default_rng(3),
+        BatchSize=1024)
+    Grid = TransectGeometry.TransectGrid(Polygon, transect_length,
+                                         Transects.copy())
+    for Row in range(len(Transects)):
+        TransectGeometry.AddToGrid(Grid, Row)
+
+    x0, y0, x1, y1 = _Probes(Polygon, 5000, transect_length,
+                             np.random.default_rng(4))
+    Clear = TransectGeometry.ClearOfGrid(Grid, x0, y0, x1, y1)
+    assert np.array_equal(Clear, TransectGeometry.ClearOfTransects(
+        x0, y0, x1, y1, Transects, transect_length))
+    assert Clear.any() and not Clear.all()
+
+
+# ------------------------------ Erased area -------------------------------- #
+
+def test_ErasedAreaOfBufferInside():
+    """A buffer inside the polygon erases (2 + pi) L^2."""
+
+    L = 50.0
+    Areas = _Erased(_Square(1000.0), [[400, 500, 450, 500, 90]], L)
+    assert Areas[0] == pytest.approx((2.0 + np.pi) * L * L, rel=1e-12)
+
+
+def test_ErasedAreaOfOverlappingBuffers():
+    """A parallel transect d away erases its buffer less the overlap."""
+
+    L, d = 50.0, 70.0
+    Areas = _Erased(_Square(1000.0), [[400, 500, 450, 500, 90],
+                                      [400, 500 + d, 450, 500 + d, 90]], L)
+    Lens = (2.0 * L * L * np.arccos(d / (2.0 * L)) -
+            d / 2.0 * np.sqrt(4.0 * L * L - d * d))
+    Overlap = L * (2.0 * L - d) + Lens
+    assert Areas[1] == pytest.approx((2.0 + np.pi) * L * L - Overlap,
+                                     rel=1e-12)
+
+
+@pytest.mark.parametrize("Hole", [False, True])
+def test_ErasedAreaClippedByEdge(Hole):
+    """
+    A buffer c from an edge loses the part beyond it, whether the edge is
+    on the outer ring or on a hole.
+    """
+
+    L, c = 50.0, 20.0
+    if Hole:
+        Rings = [np.array([[-500, -500], [1500, -500], [1500, 1500],
+                           [-500, 1500]], float),
+                 np.array([[-400, -400], [0, -400], [0, 1400],
+                           [-400, 1400]], float)]
+    else:
+        Rings = [np.array([[0, 0], [1000, 0], [1000, 1000], [0, 1000]],
+                          float)]
+    Transect = [c, 100, c, 150, 0]
+    Polygon = TransectGeometry.PreparePolygon(Rings)
+    Cut = L * (L - c) + L * L * np.arccos(c / L) - c * np.sqrt(L * L - c * c)
+    Areas = _Erased(Polygon, [Transect], L)
+    assert Areas[0] == pytest.approx((2.0 + np.pi) * L * L - Cut, rel=1e-12)
+
+
+@pytest.mark.parametrize("Name", ["princeton_farm", "concave_comb_3km"])
+def test_UnsampledAreaMatchesMonteCarlo(Name):
+    """
+    The unsampled area at the end of a run agrees with the share of random
+    points in the polygon that no buffer covers.
+    """
+
+    if Name not in _Fixtures:
+        pytest.skip("{} is not available".format(Name))
+    Rings, transect_length = _Fixtures[Name]
+    Polygon = TransectGeometry.PreparePolygon(Rings)
+    Transects, Stats = TransectGeometry.DrawTransects(
+        Polygon, transect_length, 10**6, 1.0, np.random.default_rng(2017),
+        BatchSize=1024)
+
+    rng = np.random.default_rng(1)
+    x, y = TransectGeometry.RandomPointsInPolygon(Polygon, 2 * 10**5, rng)
+    x0, y0, x1, y1 = Transects[:, :4].T
+    Expected = np.mean(np.concatenate([
+        np.min(TransectGeometry.PointSegmentDistance(
+            x[s:s + 10**4, None], y[s:s + 10**4, None], x0, y0, x1, y1),
+            axis=1) > transect_length
+        for s in range(0, len(x), 10**4)]))
+    Error = np.sqrt(Expected * (1.0 - Expected) / len(x))
+    assert abs(Stats["UnsampledProportion"] - Expected) < 4.0 * Error
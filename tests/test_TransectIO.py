@@ -0,0 +1,111 @@
+# test_TransectIO.py
+# Created: 10/17/2026
+# Checks the shapefile reader and writer of TransectIO.py used without
+# arcpy: small polygon shapefiles written here, null shapes included, and
+# transects written and read back.
+#
+# Usage:
+# python -m pytest tests
+# -----------------------------------------------------------------------------
+
+# Imports
+import os
+import struct
+import sys
+
+import numpy as np
+import pytest
+
+Root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, Root)
+
+import TransectGeometry
+import TransectIO
+
+# A 100 by 100 square, clockwise as shapefile exterior rings are
+SQUARE = np.array([[0.0, 0.0], [0.0, 100.0], [100.0, 100.0], [100.0, 0.0],
+                   [0.0, 0.0]])
+
+
+def _WritePolygons(Base, Shapes):
+    """
+    Writes Base.shp and Base.shx with one record per item of Shapes: a list
+    of rings for a polygon, or None for a null shape.
+    """
+
+    Records = []
+    for Shape in Shapes:
+        if Shape is None:
+            Records.append(struct.pack("<i", 0))
+            continue
+        Points = np.concatenate(Shape)
+        Parts = np.cumsum([0] + [len(Ring) for Ring in Shape[:-1]])
+        Records.append(
+            struct.pack("<i4d2i", 5, *(list(Points.min(axis=0)) +
+                                       list(Points.max(axis=0)) +
+                                       [len(Shape), len(Points)])) +
+            np.asarray(Parts, "<i4").tobytes() +
+            np.asarray(Points, "<f8").tobytes())
+
+    def Header(Length):
+        return (struct.pack(">7i", 9994, 0, 0, 0, 0, 0, Length // 2) +
+                struct.pack("<2i8d", 1000, 5, 0, 0, 100, 100, 0, 0, 0, 0))
+
+    Shp, Shx = [], []
+    Offset = 100
+    for Number, Record in enumerate(Records):
+        Shx.append(struct.pack(">2i", Offset // 2, len(Record) // 2))
+        Shp.append(struct.pack(">2i", Number + 1, len(Record) // 2) + Record)
+        Offset += 8 + len(Record)
+    with open(Base + ".shp", "wb") as f:
+        f.write(Header(Offset) + b"".join(Shp))
+    with open(Base + ".shx", "wb") as f:
+        f.write(Header(100 + 8 * len(Records)) + b"".join(Shx))
+
+
+def test_ReadPolygonSkipsNullShapes(tmp_path):
+    """The first shape that is not null is read."""
+
+    TransectIO.UseArcpy(False)
+    Base = str(tmp_path / "polygon")
+    _WritePolygons(Base, [None, [SQUARE], [SQUARE + 500.0]])
+
+    Rings, SpatialReference = TransectIO.ReadPolygon(Base + ".shp")
+    assert len(Rings) == 1
+    assert np.array_equal(Rings[0], SQUARE)
+
+
+def test_ReadPolygonWithOnlyNullShapes(tmp_path):
+    """A shapefile of null shapes raises an error that names it."""
+
+    TransectIO.UseArcpy(False)
+    Base = str(tmp_path / "empty")
+    _WritePolygons(Base, [None, None])
+
+    with pytest.raises(ValueError, match="empty.shp"):
+        TransectIO.ReadPolygon(Base + ".shp")
+
+
+def test_TransectsRoundTrip(tmp_path):
+    """Transects and their fields read back as they were written."""
+
+    TransectIO.UseArcpy(False)
+    Polygon = TransectGeometry.PreparePolygon([SQUARE * 10.0])
+    Transects, Stats = TransectGeometry.DrawTransects(
+        Polygon, 50.0, 10**6, 1.0, np.random.default_rng(2017),
+        BatchSize=256)
+    assert len(Transects) > 10
+    Output = str(tmp_path / "transects.shp")
+    WKT = 'LOCAL_CS["Test"]'
+    Ranks = np.arange(len(Transects))
+    TransectIO.WriteTransects(Output, Transects, 50.0, WKT,
+                              [("Rank", Ranks)], Trial=7)
+
+    Read = TransectIO.ReadTransects(Output)
+    assert np.allclose(Read[:, :4], Transects[:, :4], rtol=0, atol=1e-9)
+    assert np.allclose(Read[:, 4], Transects[:, 4], rtol=0, atol=1e-9)
+
+    Shapes, Attributes, ReadWKT = TransectIO.ReadShapefile(Output)
+    assert ReadWKT == WKT
+    assert np.all(Attributes["Trial"] == 7)
+    assert np.array_equal(Attributes["Rank"], Ranks)
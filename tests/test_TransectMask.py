@@ -0,0 +1,103 @@
+# test_TransectMask.py
+# Created: 10/17/2026
+# Checks that the raster engine (TransectMask.py) keeps the contract of the
+# other engines on the benchmark fixtures: every transect is completely
+# within the polygon and farther than transect_length from every other.
+# Also checks that the mask only decides the candidates the exact tests
+# agree on, and that its cache is bounded.
+#
+# Usage:
+# python -m pytest tests
+# -----------------------------------------------------------------------------
+
+# Imports
+import os
+import sys
+
+import numpy as np
+import pytest
+
+Root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, Root)
+sys.path.insert(0, os.path.join(Root, "benchmarks"))
+
+import BenchmarkTransects
+import TransectCache
+import TransectGeometry
+import TransectMask
+
+# Fixtures and cell sizes tested, coarse ones included
+CASES = [("complex_5000_vertices", 10.0), ("complex_5000_vertices", 25.0),
+         ("princeton_farm", 15.0)]
+
+_Fixtures = BenchmarkTransects.Fixtures()
+
+
+@pytest.mark.parametrize("Name, CellSize", CASES)
+def test_MaskTransectsWithinAndSpaced(Name, CellSize):
+    """Raster transects are within Polygon and spaced by transect_length."""
+
+    if Name not in _Fixtures:
+        pytest.skip("{} is not available".format(Name))
+    Rings, transect_length = _Fixtures[Name]
+    Polygon = TransectCache.PreparedPolygon(Rings, CacheDir=False)
+    Transects, Stats = TransectMask.DrawTransectsMask(
+        Polygon, transect_length, 10**6, 1.0, CellSize,
+        np.random.default_rng(2017))
+    assert len(Transects) > 0
+
+    x0, y0, x1, y1 = Transects[:, :4].T
+    assert TransectGeometry.SegmentsWithinPolygon(Polygon, x0, y0, x1,
+                                                  y1).all()
+    Distance = TransectGeometry.SegmentDistance(
+        x0[:, None], y0[:, None], x1[:, None], y1[:, None], x0, y0, x1, y1)
+    np.fill_diagonal(Distance, np.inf)
+    assert Distance.min() > transect_length
+
+
+@pytest.mark.parametrize("Name, CellSize", CASES)
+def test_MaskDecisionsAgreeWithExactTests(Name, CellSize):
+    """CLEAR candidates pass the exact tests and BLOCKED ones fail them."""
+
+    if Name not in _Fixtures:
+        pytest.skip("{} is not available".format(Name))
+    Rings, transect_length = _Fixtures[Name]
+    Polygon = TransectCache.PreparedPolygon(Rings, CacheDir=False)
+    rng = np.random.default_rng(2017)
+
+    # Stamp the transects of a partly filled run into a fresh mask
+    Transects, Stats = TransectMask.DrawTransectsMask(
+        Polygon, transect_length, 20, 1.0, CellSize, rng)
+    Mask = TransectMask.PolygonMask(Polygon, CellSize)
+    Cells = Mask["Cells"].copy()
+    for x0, y0, x1, y1, bearing in Transects:
+        TransectMask.StampBuffer(Mask, Cells, x0, y0, x1, y1,
+                                 transect_length)
+    Grid = TransectGeometry.TransectGrid(Polygon, transect_length,
+                                         Transects.copy())
+    for Row in range(len(Transects)):
+        TransectGeometry.AddToGrid(Grid, Row)
+
+    x0, y0 = TransectMask.RandomPointsInFree(Mask, Cells, 20000, rng)
+    bearing = rng.integers(1, 361, len(x0)).astype(np.float64)
+    x1, y1 = TransectGeometry.TransectEndpoints(x0, y0, bearing,
+                                                transect_length)
+    State = TransectMask.SegmentStates(Mask, Cells, x0, y0, x1, y1)
+    Valid = (TransectGeometry.SegmentsWithinPolygon(Polygon, x0, y0, x1, y1)
+             & TransectGeometry.ClearOfGrid(Grid, x0, y0, x1, y1))
+    assert Valid[State == TransectMask.CLEAR].all()
+    assert not Valid[State == TransectMask.BLOCKED].any()
+    assert (State == TransectMask.CLEAR).any()
+
+
+def test_MaskCacheIsBounded():
+    """Masks are keyed by the polygon's geometry and only the last kept."""
+
+    Polygon = TransectGeometry.PreparePolygon(
+        [np.array([[0.0, 0.0], [0.0, 100.0], [100.0, 100.0],
+                   [100.0, 0.0], [0.0, 0.0]])])
+    First = TransectMask.PolygonMask(Polygon, 10.0)
+    assert TransectMask.PolygonMask(dict(Polygon), 10.0) is First
+    for CellSize in range(1, TransectMask.MASK_CACHE_SIZE + 2):
+        TransectMask.PolygonMask(Polygon, float(CellSize))
+    assert len(TransectMask._Masks) == TransectMask.MASK_CACHE_SIZE
@@ -0,0 +1,81 @@
+# test_TransectOptimize.py
+# Created: 10/17/2026
+# Checks that the layouts OptimizeTransects (TransectOptimize.py) returns
+# keep the constraints of DrawTransects on the benchmark fixtures: every
+# transect within the polygon and farther than transect_length from every
+# other, no fewer transects than the start and no more than max_transects.
+#
+# Usage:
+# python -m pytest tests
+# -----------------------------------------------------------------------------
+
+# Imports
+import os
+import sys
+
+import numpy as np
+import pytest
+
+Root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, Root)
+sys.path.insert(0, os.path.join(Root, "benchmarks"))
+
+import BenchmarkTransects
+import TransectGeometry
+import TransectOptimize
+
+# Fixtures tested, and steps of each search
+NAMES = ["concave_comb_3km", "holed_square_3km", "princeton_farm"]
+STEPS = 200
+
+_Fixtures = BenchmarkTransects.Fixtures()
+
+
+def _AssertValid(Polygon, Transects, transect_length):
+    """Asserts that Transects are within Polygon and spaced."""
+
+    x0, y0, x1, y1 = Transects[:, :4].T
+    assert TransectGeometry.SegmentsWithinPolygon(Polygon, x0, y0, x1,
+                                                  y1).all()
+    Distance = TransectGeometry.SegmentDistance(
+        x0[:, None], y0[:, None], x1[:, None], y1[:, None], x0, y0, x1, y1)
+    np.fill_diagonal(Distance, np.inf)
+    assert Distance.min() > transect_length
+    assert np.allclose(np.hypot(x1 - x0, y1 - y0), transect_length)
+
+
+@pytest.mark.parametrize("Name", NAMES)
+def test_OptimizedLayoutIsValid(Name):
+    """The best layout is valid and holds at least the starting count."""
+
+    if Name not in _Fixtures:
+        pytest.skip("{} is not available".format(Name))
+    Rings, transect_length = _Fixtures[Name]
+    Polygon = TransectGeometry.PreparePolygon(Rings)
+    Start, Stats = TransectGeometry.DrawTransects(
+        Polygon, transect_length, 10**6, 1.0, np.random.default_rng(2017),
+        BatchSize=1024)
+
+    Best, History = TransectOptimize.OptimizeTransects(
+        Polygon, transect_length, Start, STEPS,
+        rng=np.random.default_rng(2017))
+    _AssertValid(Polygon, Best, transect_length)
+    assert len(Best) >= len(Start)
+    assert History["BestCount"][-1] == len(Best)
+
+
+def test_OptimizeStopsAtMaxTransects():
+    """The layout never holds more than max_transects."""
+
+    Rings, transect_length = _Fixtures["concave_comb_3km"]
+    Polygon = TransectGeometry.PreparePolygon(Rings)
+    Start, Stats = TransectGeometry.DrawTransects(
+        Polygon, transect_length, 10**6, 1.0, np.random.default_rng(2017),
+        BatchSize=1024)
+
+    Best, History = TransectOptimize.OptimizeTransects(
+        Polygon, transect_length, Start, STEPS, len(Start) + 1,
+        np.random.default_rng(2017))
+    _AssertValid(Polygon, Best, transect_length)
+    assert len(Best) <= len(Start) + 1
+    assert np.max(History["Count"]) <= len(Start) + 1
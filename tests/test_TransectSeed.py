@@ -0,0 +1,66 @@
+# test_TransectSeed.py
+# Created: 10/17/2026
+# Checks that seeded runs are reproducible (TransectSeed.py): the same Seed
+# draws the same trials, another Seed other ones, and RegenerateTrial draws
+# the best trial of a run again on its own.
+#
+# Usage:
+# python -m pytest tests
+# -----------------------------------------------------------------------------
+
+# Imports
+import os
+import sys
+
+import numpy as np
+import pytest
+
+Root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, Root)
+
+import TransectGeometry
+import TransectIO
+import TransectSeed
+import TransectTools
+
+PRINCETON_FARM = os.path.join(Root, "PrincetonFarmShp", "PrincetonFarm.shp")
+
+
+def test_SameSeedDrawsSameTrial():
+    """A trial depends on Seed and its index only."""
+
+    Polygon = TransectGeometry.PreparePolygon(
+        [np.array([[0, 0], [0, 1000], [1000, 1000], [1000, 0]], float)])
+    First = TransectSeed.DrawTrial(Polygon, 50.0, 10**6, 2017, 3,
+                                   BatchSize=256)[0]
+    TransectSeed.DrawTrial(Polygon, 50.0, 10**6, 2017, 4, BatchSize=256)
+    Again = TransectSeed.DrawTrial(Polygon, 50.0, 10**6, 2017, 3,
+                                   BatchSize=256)[0]
+    Other = TransectSeed.DrawTrial(Polygon, 50.0, 10**6, 2018, 3,
+                                   BatchSize=256)[0]
+    assert np.array_equal(First, Again)
+    assert not np.array_equal(First[:len(Other)], Other[:len(First)])
+
+
+@pytest.mark.skipif(not os.path.exists(PRINCETON_FARM),
+                    reason="PrincetonFarmShp is not available")
+def test_SeededRunIsReproducible(tmp_path):
+    """Two runs with one Seed agree, and the best trial can be redrawn."""
+
+    TransectIO.UseArcpy(False)
+    Run = dict(InputPolygon=PRINCETON_FARM, transect_length=150.0,
+               max_transects=200, max_iterations=4, WorkspaceGDB="",
+               BatchSize=512, Seed=2017)
+    First, FirstCounts = TransectTools.MaximizeNTransects(
+        OutputTransects=str(tmp_path / "first.shp"), **Run)
+    Second, SecondCounts = TransectTools.MaximizeNTransects(
+        OutputTransects=str(tmp_path / "second.shp"), **Run)
+    Best = TransectIO.ReadTransects(First)
+    assert SecondCounts == FirstCounts
+    assert np.array_equal(TransectIO.ReadTransects(Second), Best)
+
+    Counts = FirstCounts[1:]
+    Redrawn = TransectTools.RegenerateTrial(
+        PRINCETON_FARM, 150.0, 200, 2017, Counts.index(max(Counts)),
+        str(tmp_path / "redrawn.shp"), BatchSize=512)
+    assert np.array_equal(TransectIO.ReadTransects(Redrawn), Best)
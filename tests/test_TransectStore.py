@@ -0,0 +1,54 @@
+# test_TransectStore.py
+# Created: 10/17/2026
+# Checks that a store saved and loaded memory-mapped (TransectStore.py) can
+# be resumed: trials appended to it, empty ones included, are added in
+# memory and the saved files are left as they were.
+#
+# Usage:
+# python -m pytest tests
+# -----------------------------------------------------------------------------
+
+# Imports
+import os
+import sys
+
+import numpy as np
+import pytest
+
+Root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, Root)
+
+import TransectStore
+
+
+def _Transects(n, Trial):
+    """Returns n made-up transects for trial Trial."""
+
+    return np.arange(n * 5, dtype=np.float64).reshape(n, 5) + 100.0 * Trial
+
+
+@pytest.mark.parametrize("MemoryMap", [True, False])
+def test_ResumeLoadedStoreWithEmptyTrial(tmp_path, MemoryMap):
+    """Empty and other trials append to a loaded store; files unchanged."""
+
+    Store = TransectStore.NewStore()
+    for Trial, n in enumerate([3, 0, 2]):
+        TransectStore.AppendTrial(Store, Trial, _Transects(n, Trial))
+    Directory = str(tmp_path / "store")
+    TransectStore.SaveStore(Store, Directory)
+
+    Loaded = TransectStore.LoadStore(Directory, MemoryMap)
+    TransectStore.AppendTrial(Loaded, 3, np.empty((0, 5)))
+    TransectStore.AppendTrial(Loaded, 4, _Transects(4, 4))
+
+    TrialIDs, Counts = TransectStore.TrialCounts(Loaded)
+    assert TrialIDs.tolist() == [0, 1, 2, 3, 4]
+    assert Counts.tolist() == [3, 0, 2, 0, 4]
+    assert np.array_equal(TransectStore.TrialTransects(Loaded, 2),
+                          _Transects(2, 2))
+    assert np.array_equal(TransectStore.TrialTransects(Loaded, 4),
+                          _Transects(4, 4))
+    assert TransectStore.BestTrial(Loaded) == 4
+
+    Saved = TransectStore.LoadStore(Directory)
+    assert TransectStore.TrialCounts(Saved)[1].tolist() == [3, 0, 2]
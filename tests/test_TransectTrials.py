@@ -0,0 +1,94 @@
+# test_TransectTrials.py
+# Created: 10/17/2026
+# Checks that a resumed parallel run with Store (TransectTrials.py) saves
+# every trial's transects in trial order, the same as an uninterrupted run,
+# and that the stopping rules see the counts of a parallel run in trial
+# order whatever order its chunks finish in.
+#
+# Usage:
+# python -m pytest tests
+# -----------------------------------------------------------------------------
+
+# Imports
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+Root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, Root)
+
+import TransectIO
+import TransectStopping
+import TransectStore
+import TransectTrials
+
+PRINCETON_FARM = os.path.join(Root, "PrincetonFarmShp", "PrincetonFarm.shp")
+
+# Counts of the trials of _RunSlowFirstChunk
+COUNTS = [5, 1, 1, 9, 2, 3, 4, 1]
+
+
+def _RunSlowFirstChunk(First, Last, Seed):
+    """Returns the COUNTS of trials First to Last - 1, trial 0 last."""
+
+    if First == 0:
+        time.sleep(2.0)
+    Counts = COUNTS[First:Last]
+    return First, Counts, First + Counts.index(max(Counts)), None, []
+
+
+@pytest.mark.skipif(not os.path.exists(PRINCETON_FARM),
+                    reason="PrincetonFarmShp is not available")
+def test_ResumedStoreInTrialOrder(tmp_path):
+    """A resumed run's store holds trials 0 to n - 1 in order."""
+
+    TransectIO.UseArcpy(False)
+    Run = dict(InputPolygon=PRINCETON_FARM, transect_length=150.0,
+               max_transects=200, max_iterations=16, Workers=2,
+               BatchSize=512, Seed=2017)
+
+    # An uninterrupted run, and its checkpoint cut to the first chunks
+    # finished
+    Checkpoint = str(tmp_path / "run.ckpt")
+    TransectTrials.MaximizeInParallel(
+        OutputTransects=str(tmp_path / "full.shp"), Checkpoint=Checkpoint,
+        Store=str(tmp_path / "full"), **Run)
+    with open(Checkpoint, "rb") as f:
+        Lines = f.readlines()
+    with open(Checkpoint, "wb") as f:
+        f.writelines(Lines[:1 + (len(Lines) - 1) // 2])
+
+    TransectTrials.MaximizeInParallel(
+        OutputTransects=str(tmp_path / "resumed.shp"), Checkpoint=Checkpoint,
+        Resume=True, Store=str(tmp_path / "resumed"), **Run)
+
+    Full = TransectStore.LoadStore(str(tmp_path / "full"))
+    Resumed = TransectStore.LoadStore(str(tmp_path / "resumed"))
+    TrialIDs, Counts = TransectStore.TrialCounts(Resumed)
+    assert TrialIDs.tolist() == list(range(Run["max_iterations"]))
+    for Name in Full["Columns"]:
+        assert np.array_equal(Full["Columns"][Name], Resumed["Columns"][Name])
+
+
+def test_StoppingRulesSeeTrialOrder(monkeypatch):
+    """Chunks finishing out of order reach StopReason in trial order."""
+
+    Seen = []
+
+    def StopReason(TrialCounts, Remaining, Elapsed, **Stopping):
+        Seen.append(list(TrialCounts))
+        return ""
+
+    monkeypatch.setattr(TransectStopping, "StopReason", StopReason)
+    TrialCounts, BestTrial, BestCount, Best, Traces = (
+        TransectTrials.RunTrials(2, None, (), _RunSlowFirstChunk, 100,
+                                 len(COUNTS), Stopping={"Patience": 1}))
+
+    assert TrialCounts == COUNTS
+    assert (BestTrial, BestCount) == (3, 9)
+    assert Seen[0] == [] and Seen[-1] == COUNTS
+    for Counts in Seen:
+        assert Counts == COUNTS[:len(Counts)]